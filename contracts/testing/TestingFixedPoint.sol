@@ -3,11 +3,78 @@
 pragma solidity ^0.8.4;
 
 import "../../libraries/FixedPoint.sol";
+import "../../libraries/SignedFixedPoint.sol";
+import "../../libraries/LogExpMath.sol";
 
 contract TestingFixedPoint {
     using FixedPoint for uint256;
+    using SignedFixedPoint for int256;
 
     function intPowDownTest(uint256 base, uint256 exp) external pure returns (uint256) {
         return base.intPowDown(exp);
     }
+
+    function mulDown(uint256 a, uint256 b) external pure returns (uint256) {
+        return a.mulDown(b);
+    }
+
+    function mulUp(uint256 a, uint256 b) external pure returns (uint256) {
+        return a.mulUp(b);
+    }
+
+    function divDown(uint256 a, uint256 b) external pure returns (uint256) {
+        return a.divDown(b);
+    }
+
+    function divUp(uint256 a, uint256 b) external pure returns (uint256) {
+        return a.divUp(b);
+    }
+
+    function powDown(uint256 x, uint256 y) external pure returns (uint256) {
+        return x.powDown(y);
+    }
+
+    function powUp(uint256 x, uint256 y) external pure returns (uint256) {
+        return x.powUp(y);
+    }
+
+    function complement(uint256 x) external pure returns (uint256) {
+        return x.complement();
+    }
+
+    function mulDownMag(int256 a, int256 b) external pure returns (int256) {
+        return a.mulDownMag(b);
+    }
+
+    function mulUpMag(int256 a, int256 b) external pure returns (int256) {
+        return a.mulUpMag(b);
+    }
+
+    function divDownMag(int256 a, int256 b) external pure returns (int256) {
+        return a.divDownMag(b);
+    }
+
+    function divUpMag(int256 a, int256 b) external pure returns (int256) {
+        return a.divUpMag(b);
+    }
+
+    function exp(int256 x) external pure returns (int256) {
+        return LogExpMath.exp(x);
+    }
+
+    function ln(int256 a) external pure returns (int256) {
+        return LogExpMath.ln(a);
+    }
+
+    function log(int256 arg, int256 base) external pure returns (int256) {
+        return LogExpMath.log(arg, base);
+    }
+
+    function pow(uint256 x, uint256 y) external pure returns (uint256) {
+        return LogExpMath.pow(x, y);
+    }
+
+    function sqrt(uint256 x) external pure returns (uint256) {
+        return LogExpMath.sqrt(x);
+    }
 }
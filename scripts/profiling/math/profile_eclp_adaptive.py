@@ -0,0 +1,40 @@
+import random
+import time
+
+from tests.support.eclp import mimpl
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+NUM_STATES = 200
+
+PARAMS = {
+    "myparams1": mimpl.myparams1,
+    "myparams2_circle": mimpl.myparams2_circle,
+    "l=100": mimpl.Params.from_angle_degrees(D("0.99"), D("1.01"), D(-30), D(100)),
+    "l=20000": mimpl.Params.from_angle_degrees(D("0.5"), D("2"), D(-60), D(20000)),
+}
+
+
+def run(params, solver):
+    """from_x_y() and a small trade_x() at random states. Returns the time taken."""
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(NUM_STATES):
+        x, y = D(rng.randrange(1, 10**6)), D(rng.randrange(1, 10**6))
+        eclp = mimpl.ECLP.from_x_y(x, y, params, solver)
+        eclp.trade_x(D(rng.randrange(-1000, 1000)), mock=True)
+    return time.perf_counter() - start
+
+
+def main():
+    for name, params in PARAMS.items():
+        params.derived  # Not part of the measurement
+        exact = run(params, None)
+        print(f"{name}: QuantizedDecimal {exact / NUM_STATES * 1e6:.0f} us per state")
+        for rel_tolerance in (mimpl.ADAPTIVE_REL_TOLERANCE, 1e-8):
+            solver = mimpl.AdaptiveSolver(rel_tolerance=rel_tolerance)
+            adaptive = run(params, solver)
+            print(
+                f"  adaptive, rel_tolerance={rel_tolerance:g}: "
+                f"{adaptive / NUM_STATES * 1e6:.0f} us per state "
+                f"({exact / adaptive:.2f}x), counts {dict(solver.counts)}"
+            )
@@ -0,0 +1,44 @@
+import timeit
+
+import numpy as np
+
+from tests.support.eclp import mimpl
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+NUMBER = 5
+LADDER_SIZE = 50
+
+
+def main():
+    eclp = mimpl.ECLP.from_px_v(D(1), D(1_000_000), mimpl.myparams1)
+    # Depth ladder up to close to the exhaustion point in each direction.
+    dxs = [
+        (eclp.xmax - eclp.x) * (i + 1) / (LADDER_SIZE + 1) for i in range(LADDER_SIZE)
+    ]
+    dys = [
+        (eclp.ymax - eclp.y) * (i + 1) / (LADDER_SIZE + 1) for i in range(LADDER_SIZE)
+    ]
+
+    def scalar():
+        for dx in dxs:
+            eclp.trade_x(dx, mock=True)
+        for dy in dys:
+            eclp.trade_y(dy, mock=True)
+
+    for name, fn in {
+        "trade_x()/trade_y() with mock=True": scalar,
+        "quote_x()/quote_y()": lambda: (eclp.quote_x(dxs), eclp.quote_y(dys)),
+        "quote_x_float()/quote_y_float()": lambda: (
+            eclp.quote_x_float(dxs),
+            eclp.quote_y_float(dys),
+        ),
+    }.items():
+        seconds = timeit.timeit(fn, number=NUMBER) / NUMBER
+        print(f"{name}: {seconds * 1e3:.2f} ms per ladder of {2 * LADDER_SIZE}")
+
+    quotes = eclp.quote_x_float(dxs)
+    print(
+        f"float quotes: {quotes.exact.sum()} recomputed exactly, "
+        f"max relative error bound {np.max(quotes.error_bounds / np.abs(quotes.amounts)):.1e}, "
+        f"of the prices {np.max(quotes.price_error_bounds / np.abs(quotes.prices)):.1e}"
+    )
@@ -0,0 +1,37 @@
+import random
+import time
+
+from tests.support.eclp import mimpl
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+NUM_SWAPS = 2000
+
+
+def swap_simulation(params_factory, num_swaps: int = NUM_SWAPS, seed: int = 0):
+    """Alternating swaps in both directions, reading the price after each. params_factory is called per swap, like
+    code that converts params from another representation every time."""
+    rng = random.Random(seed)
+    eclp = mimpl.ECLP.from_px_v(D(1), D(1_000_000), params_factory())
+    for i in range(num_swaps):
+        eclp.params = params_factory()
+        amount = D(rng.randrange(1, 10_000))
+        if i % 2 == 0:
+            eclp.trade_x(amount)
+        else:
+            eclp.trade_y(amount)
+        eclp.px
+    return eclp
+
+
+def main():
+    params = mimpl.myparams1
+    for name, factory in {
+        "shared params": lambda: params,
+        "new params per swap": lambda: mimpl.Params(
+            params.alpha, params.beta, params.rx, params.ry, params.l
+        ),
+    }.items():
+        start = time.perf_counter()
+        eclp = swap_simulation(factory)
+        seconds = (time.perf_counter() - start) / NUM_SWAPS
+        print(f"{name}: {seconds * 1e6:.0f} µs/swap, final reserves {eclp.x}, {eclp.y}")
@@ -0,0 +1,74 @@
+import random
+import time
+
+import numpy as np
+
+from tests.support.eclp import mimpl
+from tests.support.eclp.tracker import (
+    LIQUIDITY,
+    SWAP_X,
+    SWAP_Y,
+    Event,
+    StateColumns,
+    track,
+)
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+NUM_EVENTS = 20_000
+LIQUIDITY_SHARE = 0.05
+
+
+def synthetic_events(n: int, seed: int = 0):
+    """Swaps in both directions, with joins and exits in between."""
+    rng = random.Random(seed)
+    for i in range(n):
+        if rng.random() < LIQUIDITY_SHARE:
+            yield Event(12 * i, LIQUIDITY, D(rng.randrange(-1_000, 1_000)) / 100)
+        else:
+            kind = rng.choice([SWAP_X, SWAP_Y])
+            yield Event(12 * i, kind, D(rng.randrange(-10_000, 10_000)))
+
+
+def from_scratch(events, eclp: mimpl.ECLP):
+    """Like track(), but recomputing r from the reserves with from_x_y() after every event."""
+    for event in events:
+        if event.kind == SWAP_X:
+            eclp.trade_x(event.amount)
+        elif event.kind == SWAP_Y:
+            eclp.trade_y(event.amount)
+        else:
+            eclp.update_liquidity(event.amount)
+        eclp.r = mimpl.ECLP.from_x_y(eclp.x, eclp.y, eclp.params).r
+
+
+def main():
+    events = list(synthetic_events(NUM_EVENTS))
+    eclp = mimpl.ECLP.from_px_v(D(1), D(1_000_000), mimpl.myparams1)
+
+    start = time.perf_counter()
+    from_scratch(events, mimpl.ECLP.from_x_y(eclp.x, eclp.y, eclp.params))
+    seconds = time.perf_counter() - start
+    print(f"from_x_y() after every event: {NUM_EVENTS / seconds:.0f} events/s")
+
+    reference = None
+    for name, solver in {
+        "tracker": None,
+        "tracker with AdaptiveSolver": mimpl.AdaptiveSolver(),
+    }.items():
+        tracked = mimpl.ECLP.from_x_y(eclp.x, eclp.y, eclp.params, solver)
+        start = time.perf_counter()
+        columns = StateColumns.concatenate(track(events, tracked))
+        seconds = time.perf_counter() - start
+        print(
+            f"{name}: {NUM_EVENTS / seconds:.0f} events/s, "
+            f"max drift at re-anchoring {np.nanmax(np.abs(columns.drift)):.1e}"
+        )
+        # The drift doesn't show errors in the reserves, since re-anchoring recomputes r from them.
+        if reference is None:
+            reference = columns
+            continue
+        reserve_error = max(
+            np.max(np.abs(columns.x - reference.x) / reference.x),
+            np.max(np.abs(columns.y - reference.y) / reference.y),
+        )
+        print(f"  max relative difference of the reserves {reserve_error:.1e}")
@@ -0,0 +1,58 @@
+import random
+import time
+
+from tests.support.g2clp import math_implementation as math_impl
+from tests.support.g2clp.swap_path import Pool2CLP, Swap, simulate_swaps
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+NUM_SWAPS = 100_000
+SQRT_ALPHA = D("0.97").sqrt()
+SQRT_BETA = D("1.02").sqrt()
+BALANCES = [D(10**7), D(10**7)]
+
+
+def random_swaps(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield Swap(rng.randrange(2), D(rng.randrange(1, 10_000)), rng.random() < 0.5)
+
+
+def main():
+    swaps = list(random_swaps(NUM_SWAPS))
+    for name, rederive_interval in {
+        "re-deriving the invariant before every swap (like the pool)": 1,
+        "re-deriving every 1000 swaps": 1000,
+        "carrying the invariant along": None,
+    }.items():
+        pool = Pool2CLP(BALANCES, SQRT_ALPHA, SQRT_BETA)
+        start = time.perf_counter()
+        for _ in simulate_swaps(swaps, pool, rederive_interval):
+            pass
+        seconds = time.perf_counter() - start
+        print(f"{name}: {NUM_SWAPS / seconds:.0f} swaps/s")
+
+    pool = Pool2CLP(BALANCES, SQRT_ALPHA, SQRT_BETA)
+    deltas = [b / 100 for b in BALANCES]
+    n = 10_000
+    for name, fn in {
+        "liquidityInvariantUpdate_fromscratch": math_impl.liquidityInvariantUpdate_fromscratch,
+        "liquidityInvariantUpdate": math_impl.liquidityInvariantUpdate,
+    }.items():
+        start = time.perf_counter()
+        for _ in range(n):
+            fn(BALANCES, SQRT_ALPHA, SQRT_BETA, pool.invariant, deltas, True)
+        seconds = time.perf_counter() - start
+        print(f"{name}: {seconds / n * 1e6:.1f} us per update")
+
+    validation = math_impl.quadratic_validation
+    for enabled in (True, False):
+        validation.enabled = enabled
+        start = time.perf_counter()
+        for _ in range(n):
+            math_impl.calculateInvariant(BALANCES, SQRT_ALPHA, SQRT_BETA)
+        seconds = time.perf_counter() - start
+        print(
+            f"calculateInvariant with validation {'on' if enabled else 'off'}: "
+            f"{seconds / n * 1e6:.1f} us"
+        )
+    validation.enabled = False
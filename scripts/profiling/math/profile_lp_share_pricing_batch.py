@@ -0,0 +1,85 @@
+import random
+import time
+from math import cos, pi, sin
+
+from tests.oracles import lp_share_pricing as math_implementation
+from tests.oracles import lp_share_pricing_batch as batch
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.types import VaultType
+
+NUM_TOKENS = 20
+NUM_POOLS = {
+    VaultType.BALANCER_CPMM: 100,
+    VaultType.BALANCER_2CLP: 1000,
+    VaultType.BALANCER_3CLP: 100,
+    VaultType.BALANCER_ECLP: 1000,
+}
+
+
+def random_pools(rng: random.Random):
+    for vault_type, n in NUM_POOLS.items():
+        for _ in range(n):
+            ids = D(rng.randrange(10**17, 10**19)) / 10**18
+            size = 3 if vault_type == VaultType.BALANCER_3CLP else 2
+            indices = tuple(rng.sample(range(NUM_TOKENS), size))
+            if vault_type == VaultType.BALANCER_CPMM:
+                params = batch.CPMMParams((D("0.6"), D("0.4")))
+            elif vault_type == VaultType.BALANCER_2CLP:
+                params = batch.TwoCLPParams(D("0.97").sqrt(), D("1.02").sqrt())
+            elif vault_type == VaultType.BALANCER_3CLP:
+                params = batch.ThreeCLPParams(D("0.99"))
+            else:
+                phi = rng.uniform(10, 80) / 360 * 2 * pi
+                eclp_params = math_implementation.ECLP_params(
+                    D("0.97"), D("1.03"), D(cos(phi)), D(sin(phi)), D(400)
+                )
+                derived = math_implementation.ECLP_derived_params(
+                    math_implementation.tau(eclp_params, eclp_params.alpha),
+                    math_implementation.tau(eclp_params, eclp_params.beta),
+                )
+                params = batch.ECLPParams(eclp_params, derived)
+            yield batch.PoolDescriptor(vault_type, params, ids, indices)
+
+
+def scalar(pools, prices):
+    result = []
+    for pool in pools:
+        pool_prices = [prices[i] for i in pool.token_indices]
+        if pool.vault_type == VaultType.BALANCER_CPMM:
+            price = math_implementation.price_bpt_CPMM(
+                pool.params.weights, pool.invariant_div_supply, pool_prices
+            )
+        elif pool.vault_type == VaultType.BALANCER_2CLP:
+            price = math_implementation.price_bpt_2clp(
+                *pool.params, pool.invariant_div_supply, pool_prices
+            )
+        elif pool.vault_type == VaultType.BALANCER_3CLP:
+            price = math_implementation.price_bpt_3CLP(
+                *pool.params, pool.invariant_div_supply, pool_prices
+            )
+        else:
+            price = math_implementation.price_bpt_ECLP(
+                *pool.params, pool.invariant_div_supply, pool_prices
+            )
+        result.append(price)
+    return result
+
+
+def main():
+    rng = random.Random(0)
+    # Stablecoin-like prices, so that most pools are in range.
+    prices = [D(rng.randrange(98, 103)) / 100 for _ in range(NUM_TOKENS)]
+    pools = list(random_pools(rng))
+
+    start = time.perf_counter()
+    expected = scalar(pools, prices)
+    scalar_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    result = batch.price_bpts(pools, prices)
+    batch_seconds = time.perf_counter() - start
+    assert result == expected
+    print(
+        f"{len(pools)} pools: scalar {scalar_seconds * 1e3:.0f} ms, "
+        f"price_bpts() {batch_seconds * 1e3:.0f} ms "
+        f"({scalar_seconds / batch_seconds:.1f}x)"
+    )
@@ -0,0 +1,21 @@
+import time
+
+from tests.support.pamm import Pamm, Params
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+NUM_REDEEMS = 200
+
+
+def main():
+    for incremental in [False, True]:
+        pamm = Pamm(Params(), incremental=incremental)
+        pamm.update_state(D(50_000), D(700_000), D(950_000))
+        start = time.perf_counter()
+        for _ in range(NUM_REDEEMS):
+            pamm.redeem(pamm.total_gyro_supply / 500)
+        seconds = (time.perf_counter() - start) / NUM_REDEEMS
+        info = pamm.anchor_cache_info()
+        print(
+            f"incremental={incremental}: {seconds * 1e6:.0f} µs/redeem, "
+            f"anchor cache hit rate {info.hit_rate:.2f}, final reserve {pamm.reserve_value}"
+        )
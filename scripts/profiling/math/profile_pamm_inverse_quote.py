@@ -0,0 +1,41 @@
+import timeit
+
+from tests.support.pamm import Pamm, Params
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+NUMBER = 20
+
+
+def bisect_amount_to_redeem(pamm: Pamm, redeem_amount: D) -> D:
+    """Baseline: bisect over compute_redeem_amount() until the amount is determined to the last decimal."""
+    lo, hi = D(0), pamm.total_gyro_supply
+    while hi - lo > D.from_scaled(1):
+        mid = (lo + hi) / 2
+        if pamm.compute_redeem_amount(mid) >= redeem_amount:
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def main():
+    pamm = Pamm(Params())
+    pamm.update_state(D(50_000), D(800_000), D(1_000_000))
+    # Targets in each region of the curve.
+    targets = [D(10_000), D(300_000), D(700_000)]
+
+    for name, fn in {
+        "bisection over compute_redeem_amount()": lambda: [
+            bisect_amount_to_redeem(pamm, r) for r in targets
+        ],
+        "compute_amount_to_redeem()": lambda: [
+            pamm.compute_amount_to_redeem(r) for r in targets
+        ],
+    }.items():
+        seconds = timeit.timeit(fn, number=NUMBER) / (NUMBER * len(targets))
+        print(f"{name}: {seconds * 1e6:.0f} µs/quote")
+
+    for r in targets:
+        amount = pamm.compute_amount_to_redeem(r)
+        error = pamm.compute_redeem_amount(amount) - r
+        print(f"target {r}: amount {amount}, error {error}")
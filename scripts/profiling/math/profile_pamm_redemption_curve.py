@@ -0,0 +1,29 @@
+import timeit
+
+from tests.support.pamm import Pamm, Params
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_decimal_array import QuantizedDecimalArray as DA
+
+NUMBER = 5
+NAMOUNTS = 500
+
+
+def main():
+    pamm = Pamm(Params())
+    pamm.update_state(D(50_000), D(800_000), D(1_000_000))
+    amounts = [D(1_000_000) * i / NAMOUNTS for i in range(NAMOUNTS)]
+    amounts_array = DA(amounts)
+
+    for name, fn in {
+        "compute_redeem_amount() per amount": lambda: [
+            pamm.compute_redeem_amount(a) for a in amounts
+        ],
+        "redemption_curve().compute_redeem_amounts()": lambda: pamm.redemption_curve().compute_redeem_amounts(
+            amounts_array
+        ),
+        "redemption_curve().compute_prices()": lambda: pamm.redemption_curve().compute_prices(
+            amounts_array
+        ),
+    }.items():
+        seconds = timeit.timeit(fn, number=NUMBER) / NUMBER
+        print(f"{name}: {seconds * 1e3:.1f} ms for {NAMOUNTS} amounts")
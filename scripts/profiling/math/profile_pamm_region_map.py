@@ -0,0 +1,30 @@
+import time
+
+from tests.support.pamm import Pamm, Params
+from tests.support.pamm_region_map import Grid, compute_region_map
+
+SCALAR_SAMPLE = 2000
+
+
+def main():
+    params = Params()
+    grid = Grid()
+    num_cells = grid.num_reserve_ratios * grid.num_redemption_levels
+
+    reserve_ratios, redemption_levels = grid.reserve_ratios, grid.redemption_levels
+    start = time.perf_counter()
+    for k in range(SCALAR_SAMPLE):
+        r = reserve_ratios[k % grid.num_reserve_ratios]
+        x = redemption_levels[k * 7 % grid.num_redemption_levels]
+        pamm = Pamm(params)
+        pamm.update_state(x, r * (1 - x), 1 - x)
+        pamm.compute_current_region()
+    seconds = (time.perf_counter() - start) / SCALAR_SAMPLE * num_cells
+    print(f"scalar Pamm.compute_current_region(): {seconds:.1f} s (extrapolated)")
+
+    start = time.perf_counter()
+    compute_region_map(params, grid)
+    print(f"compute_region_map(): {time.perf_counter() - start:.1f} s")
+    start = time.perf_counter()
+    compute_region_map(params, grid)
+    print(f"compute_region_map(), cached: {(time.perf_counter() - start) * 1e6:.0f} µs")
@@ -0,0 +1,50 @@
+import random
+import time
+
+from tests.support.libraries.fixed_point import int_pow_down, mul_down
+from tests.support.pamm_simulator import MINT, REDEEM, Event, simulate
+from tests.support.types import PammParams
+
+ONE = 10**18
+PARAMS = PammParams(ONE * 6 // 10, ONE * 3 // 10, ONE * 6 // 10, ONE * 999 // 1000)
+
+NUM_EVENTS = 1_000_000
+REDEEM_SHARE = 0.1
+MAX_GAP = 3600  # seconds
+
+
+def synthetic_events(n: int, seed: int = 0):
+    """Mostly mints, with redeems in between and gaps of up to an hour."""
+    rng = random.Random(seed)
+    timestamp = 0
+    for _ in range(n):
+        timestamp += rng.randrange(MAX_GAP)
+        kind = REDEEM if rng.random() < REDEEM_SHARE else MINT
+        yield Event(timestamp, kind, rng.randrange(1, 1_000) * ONE)
+
+
+def main():
+    blocks = 10_000
+    start = time.perf_counter()
+    level = ONE
+    for _ in range(blocks):
+        level = mul_down(level, PARAMS.outflow_memory)
+    seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    mul_down(ONE, int_pow_down(PARAMS.outflow_memory, blocks))
+    print(
+        f"decay over {blocks} blocks: {seconds * 1e3:.2f} ms block by block, "
+        f"{(time.perf_counter() - start) * 1e3:.3f} ms by repeated squaring"
+    )
+
+    start = time.perf_counter()
+    count = 0
+    for step in simulate(
+        synthetic_events(NUM_EVENTS), PARAMS, 10**9 * ONE, 10**9 * ONE
+    ):
+        count += 1
+    seconds = time.perf_counter() - start
+    print(
+        f"{count} events in {seconds:.1f} s ({count / seconds:.0f} events/s), "
+        f"final redemption level {step.redemption_level / ONE:.2f}"
+    )
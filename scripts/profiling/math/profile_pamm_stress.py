@@ -0,0 +1,27 @@
+import os
+import time
+
+from tests.support.pamm_stress import ScenarioDistribution, run_stress_test
+
+NUM_PATHS = 2000
+
+
+def main():
+    distribution = ScenarioDistribution()
+    for max_workers in sorted({0, os.cpu_count()}):
+        start = time.perf_counter()
+        for summary in run_stress_test(
+            distribution, NUM_PATHS, max_workers=max_workers
+        ):
+            pass
+        seconds = time.perf_counter() - start
+        print(
+            f"max_workers={max_workers}: {NUM_PATHS} paths in {seconds:.1f} s "
+            f"({NUM_PATHS / seconds:.0f} paths/s)"
+        )
+    for name, values in summary.percentiles().items():
+        print(name, {q: round(v, 4) for q, v in values.items()})
+    print(
+        "region occupancy",
+        {r.name: round(share, 3) for r, share in summary.region_occupancy().items()},
+    )
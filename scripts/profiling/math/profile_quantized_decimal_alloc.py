@@ -0,0 +1,40 @@
+import timeit
+import tracemalloc
+
+from tests.support.quantized_decimal import DecimalQuantizedDecimal as D
+
+NUMBER = 100_000
+
+
+def allocations(fn, number: int = 1_000) -> float:
+    """Number of memory blocks allocated per call of fn, excluding ones freed again."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        results = [fn() for _ in range(number)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del results
+    stats = after.compare_to(before, "filename")
+    return sum(stat.count_diff for stat in stats) / number
+
+
+def main():
+    x = D("1.5")
+    y = D("0.25")
+    ops = {
+        "D(0)": lambda: D(0),
+        "D(1)": lambda: D(1),
+        "D('1.5')": lambda: D("1.5"),
+        "D.from_scaled(n)": lambda: D.from_scaled(1500000000000000000),
+        "-x": lambda: -x,
+        "abs(x)": lambda: abs(x),
+        "x + y": lambda: x + y,
+        "x - y": lambda: x - y,
+        "x * y": lambda: x * y,
+        "x / y": lambda: x / y,
+    }
+    for name, fn in ops.items():
+        seconds = timeit.timeit(fn, number=NUMBER) / NUMBER
+        print(f"{name}: {seconds * 1e9:.0f} ns/op, {allocations(fn):.1f} blocks/op")
@@ -0,0 +1,47 @@
+import random
+import timeit
+
+from tests.support.quantized_decimal import DecimalQuantizedDecimal as D
+from tests.support.quantized_decimal_array import QuantizedDecimalArray
+from tests.support.quantized_decimal_int import QuantizedDecimal as IntD
+
+NUMBER = 100
+SIZE = 1_000
+
+
+def main():
+    r = random.Random(0)
+    xs = [r.randint(1, 10**24) for _ in range(SIZE)]
+    ys = [r.randint(1, 10**24) for _ in range(SIZE)]
+    scalars = [(D.from_scaled(x), D.from_scaled(y)) for x, y in zip(xs, ys)]
+    int_scalars = [(IntD.from_scaled(x), IntD.from_scaled(y)) for x, y in zip(xs, ys)]
+    a = QuantizedDecimalArray.from_scaled(xs)
+    b = QuantizedDecimalArray.from_scaled(ys)
+
+    for op_name, scalar_op, array_op in [
+        ("mul_down", lambda x, y: x * y, lambda: a * b),
+        ("div_up", lambda x, y: x.div_up(y), lambda: a.div_up(b)),
+        ("dot", None, lambda: a.dot(b)),
+    ]:
+        if scalar_op is None:
+            timings = {
+                "scalar loop": lambda: sum((x * y for x, y in scalars), D(0)),
+                "scalar loop (int backend)": lambda: sum(
+                    (x * y for x, y in int_scalars), IntD(0)
+                ),
+            }
+        else:
+            timings = {
+                "scalar loop": lambda: [scalar_op(x, y) for x, y in scalars],
+                "scalar loop (int backend)": lambda: [
+                    scalar_op(x, y) for x, y in int_scalars
+                ],
+            }
+        timings["QuantizedDecimalArray"] = array_op
+
+        print(f"{op_name} ({SIZE} elements)")
+        baseline = None
+        for name, fn in timings.items():
+            seconds = timeit.timeit(fn, number=NUMBER) / NUMBER
+            baseline = baseline or seconds
+            print(f"  {name}: {seconds * 1e3:.2f} ms ({baseline / seconds:.1f}x)")
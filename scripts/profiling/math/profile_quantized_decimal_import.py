@@ -0,0 +1,47 @@
+import statistics
+import subprocess
+import sys
+
+# Budget for importing each module on top of interpreter startup, in seconds. Off-chain tools import these, so they
+# should stay cheap. In particular, they must not pull in pytest (see quantized_decimal_approx.py). The array module
+# is dominated by importing numpy.
+IMPORT_BUDGETS = {
+    "tests.support.quantized_decimal": 0.1,
+    "tests.support.quantized_decimal_int": 0.1,
+    "tests.support.quantized_decimal_array": 0.3,
+}
+
+REPEAT = 7
+
+
+def startup_time(code: str) -> float:
+    """Median wall time of running `code` in a fresh interpreter."""
+    timings = []
+    for _ in range(REPEAT):
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import time; t = time.perf_counter(); "
+                + code
+                + "; print(time.perf_counter() - t)",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(float(result.stdout))
+    return statistics.median(timings)
+
+
+def main():
+    for module, budget in IMPORT_BUDGETS.items():
+        seconds = startup_time(
+            f"import sys, {module}; assert 'pytest' not in sys.modules"
+        )
+        print(f"import {module}: {seconds * 1e3:.1f} ms")
+        assert (
+            seconds <= budget
+        ), f"importing {module} takes {seconds:.3f}s, budget is {budget}s"
+    seconds = startup_time("import pytest")
+    print(f"import pytest (for reference): {seconds * 1e3:.1f} ms")
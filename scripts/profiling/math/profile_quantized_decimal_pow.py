@@ -0,0 +1,49 @@
+import timeit
+
+from tests.support.quantized_decimal import DecimalQuantizedDecimal as D
+from tests.support.quantized_decimal_100 import QuantizedDecimal as D3
+from tests.support.quantized_decimal_int import QuantizedDecimal as IntD
+
+NUMBER = 1_000
+
+
+def main():
+    # (base, exponent) pairs as they occur in LP share pricing: weighted products and cube roots.
+    args = [
+        ("0.1", "0.2"),
+        ("1.5", "0.5"),
+        ("2", "0.8"),
+        ("3", "0.333333333333333333"),
+        ("123456.789", "0.25"),
+    ]
+    values = [(D(x), D(y)) for x, y in args]
+    high_prec_values = [(D3(x), D3(y)) for x, y in args]
+    int_values = [(IntD(x), IntD(y)) for x, y in args]
+
+    for title, timings in [
+        (
+            "18 decimals",
+            {
+                "x ** y": lambda: [x**y for x, y in values],
+                "x.pow(y)": lambda: [x.pow(y) for x, y in values],
+                "x.pow(y, logexpmath=True)": lambda: [
+                    x.pow(y, logexpmath=True) for x, y in values
+                ],
+                "x.pow_down(y)": lambda: [x.pow_down(y) for x, y in values],
+                "x.pow(y) (int backend)": lambda: [x.pow(y) for x, y in int_values],
+            },
+        ),
+        (
+            "100 decimals",
+            {
+                "x ** y": lambda: [x**y for x, y in high_prec_values],
+                "x.pow(y)": lambda: [x.pow(y) for x, y in high_prec_values],
+            },
+        ),
+    ]:
+        print(title)
+        baseline = None
+        for name, fn in timings.items():
+            seconds = timeit.timeit(fn, number=NUMBER) / (NUMBER * len(args))
+            baseline = baseline or seconds
+            print(f"  {name}: {seconds * 1e6:.2f} µs/op ({baseline / seconds:.1f}x)")
@@ -0,0 +1,26 @@
+import timeit
+
+from tests.support.quantized_decimal import DecimalQuantizedDecimal as D
+from tests.support.quantized_decimal_int import QuantizedDecimal as IntD
+
+NUMBER = 10_000
+
+
+def main():
+    args = ["0.1", "0.5", "1.5", "2", "3", "10", "500", "123456.789"]
+    half = D("0.5")
+    values = [D(x) for x in args]
+    int_values = [IntD(x) for x in args]
+
+    timings = {
+        "x ** 0.5": lambda: [x**half for x in values],
+        "x.sqrt()": lambda: [x.sqrt() for x in values],
+        "x.sqrt(logexpmath=True)": lambda: [x.sqrt(logexpmath=True) for x in values],
+        "x.sqrt() (int backend)": lambda: [x.sqrt() for x in int_values],
+    }
+
+    baseline = None
+    for name, fn in timings.items():
+        seconds = timeit.timeit(fn, number=NUMBER) / (NUMBER * len(args))
+        baseline = baseline or seconds
+        print(f"{name}: {seconds * 1e6:.2f} µs/op ({baseline / seconds:.1f}x)")
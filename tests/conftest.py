@@ -5,18 +5,24 @@ from brownie.network import gas_price, priority_fee
 from brownie._config import CONFIG
 from hypothesis import settings
 
+from tests.support.g2clp import math_implementation as g2clp_math
+
 
 settings.register_profile("ci", max_examples=15)
 
 if "CI" in os.environ:
     settings.load_profile("ci")
 
+# Off by default for speed, but tests should catch inconsistent inputs to the 2CLP quadratic.
+g2clp_math.quadratic_validation.enabled = True
+
 
 pytest_plugins = [
     "tests.fixtures.coins",
     "tests.fixtures.deployments",
     "tests.fixtures.mainnet_initialization",
     "tests.fixtures.accounts",
+    "tests.support.quantized_decimal_approx",
 ]
 
 
@@ -24,7 +24,7 @@ def price_bpt_CPMM(
 ) -> D:
     prod = invariant_div_supply
     for i in range(len(weights)):
-        prod = prod * (underlying_prices[i] / weights[i]) ** weights[i]
+        prod = prod * (underlying_prices[i] / weights[i]).pow(weights[i])
     return prod
 
 
@@ -33,7 +33,7 @@ def price_bpt_two_asset_CPMM(
 ) -> D:
     second_term = (
         underlying_prices[0] * (weights[1]) / (weights[0] * underlying_prices[1])
-    ) ** weights[0]
+    ).pow(weights[0])
     third_term = underlying_prices[1] / weights[1]
     return invariant_div_supply * second_term * third_term
 
@@ -44,7 +44,7 @@ def price_bpt_CPMM_equal_weights(
     prod = D("1")
     for i in range(len(underlying_prices)):
         prod = prod * underlying_prices[i] / weight
-    prod = prod**weight
+    prod = prod.pow(weight)
     return prod * invariant_div_supply
 
 
@@ -57,7 +57,7 @@ def price_bpt_2clp(
     elif px / py >= sqrt_beta**2:
         return invariant_div_supply * py * (sqrt_beta - sqrt_alpha)
     else:
-        term = 2 * D(px * py) ** D(1 / 2) - px / sqrt_beta - py * sqrt_alpha
+        term = 2 * D(px * py).sqrt() - px / sqrt_beta - py * sqrt_alpha
         return term * invariant_div_supply
 
 
@@ -69,7 +69,7 @@ def price_bpt_3clp_representable(
     price_bpt_price_bpt_3CLP().
     """
     px, py, pz = (underlying_prices[0], underlying_prices[1], underlying_prices[2])
-    term = 3 * (px * py * pz) ** D(1 / 3) - (px + py + pz) * cbrt_alpha
+    term = 3 * (px * py * pz).pow(D(1 / 3)) - (px + py + pz) * cbrt_alpha
     return term * invariant_div_supply
 
 
@@ -126,7 +126,7 @@ def tau(params: ECLP_params, px: D) -> tuple[D, D]:
 
 
 def eta(pxc: D) -> tuple[D, D]:
-    z = D(1 + pxc**2) ** D(1 / 2)
+    z = D(1 + pxc**2).sqrt()
     vecx = pxc / z
     vecy = D(1) / z
     return (vecx, vecy)
@@ -174,7 +174,7 @@ def price_bpt_3CLP(
     # Relative prices of a pool that is arbitrage-free with the external market
     pXZPool, pYZPool = relativeEquilibriumPrices3CLP(alpha, pXZ, pYZ)
 
-    gamma = (pXZPool * pYZPool) ** (D(1) / 3)
+    gamma = (pXZPool * pYZPool).pow(D(1) / 3)
 
     # Absolute prices (short notation)
     px, py, pz = underlying_prices
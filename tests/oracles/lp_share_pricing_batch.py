@@ -0,0 +1,182 @@
+# Batch version of lp_share_pricing.py: prices the LP shares of many pools of different types against one vector of
+# underlying prices, like BatchVaultPriceOracle.fetchPricesUSD() does for the vaults in the reserve.
+#
+# Pools are grouped by VaultType and each group is priced in one go. 2CLP and ECLP groups are vectorized with
+# QuantizedDecimalArray, with the same operations as the scalar functions, so the results are bit-identical.
+# CPMM and 3CLP pricing takes fractional powers, which QuantizedDecimalArray doesn't have, so these groups call the
+# scalar functions for each pool.
+
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from tests.oracles.lp_share_pricing import (
+    ECLP_derived_params,
+    ECLP_params,
+    price_bpt_3CLP,
+    price_bpt_CPMM,
+)
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_decimal_array import QuantizedDecimalArray as DA
+from tests.support.types import VaultType
+
+
+class CPMMParams(NamedTuple):
+    weights: Tuple[D, ...]
+
+
+class TwoCLPParams(NamedTuple):
+    sqrt_alpha: D
+    sqrt_beta: D
+
+
+class ThreeCLPParams(NamedTuple):
+    root3_alpha: D
+
+
+class ECLPParams(NamedTuple):
+    params: ECLP_params
+    derived: ECLP_derived_params
+
+
+class PoolDescriptor(NamedTuple):
+    vault_type: int  # VaultType.BALANCER_*
+    # CPMMParams, TwoCLPParams, ThreeCLPParams or ECLPParams, respectively
+    params: NamedTuple
+    invariant_div_supply: D
+    # Positions of the pool's tokens, in pool order, in the price vector
+    token_indices: Tuple[int, ...]
+
+
+def construct_tokens_array(
+    pool_tokens: Iterable[Sequence[str]],
+) -> Tuple[List[str], List[Tuple[int, ...]]]:
+    """Sorted and deduplicated token addresses of all pools, like BatchVaultPriceOracle._constructTokensArray(), and
+    the token indices of each pool into it."""
+    pool_tokens = [list(tokens) for tokens in pool_tokens]
+    tokens = sorted({token for pool in pool_tokens for token in pool})
+    index = {token: i for i, token in enumerate(tokens)}
+    return tokens, [tuple(index[token] for token in pool) for pool in pool_tokens]
+
+
+def _gather(pools: List[PoolDescriptor], prices: DA, k: int) -> DA:
+    """Price of the k-th token of each pool."""
+    return prices[np.array([pool.token_indices[k] for pool in pools])]
+
+
+def _column(values: Iterable[D]) -> DA:
+    return DA(list(values))
+
+
+def _select(conditions: List[np.ndarray], choices: List[DA], default: DA) -> DA:
+    return DA.from_scaled(
+        np.select(conditions, [c.scaled for c in choices], default.scaled)
+    )
+
+
+def _price_cpmm(pools: List[PoolDescriptor], prices: DA) -> List[D]:
+    return [
+        price_bpt_CPMM(
+            pool.params.weights,
+            pool.invariant_div_supply,
+            [prices[i] for i in pool.token_indices],
+        )
+        for pool in pools
+    ]
+
+
+def _price_3clp(pools: List[PoolDescriptor], prices: DA) -> List[D]:
+    return [
+        price_bpt_3CLP(
+            pool.params.root3_alpha,
+            pool.invariant_div_supply,
+            [prices[i] for i in pool.token_indices],
+        )
+        for pool in pools
+    ]
+
+
+def _price_2clp(pools: List[PoolDescriptor], prices: DA) -> List[D]:
+    """price_bpt_2clp() for each pool."""
+    px, py = _gather(pools, prices, 0), _gather(pools, prices, 1)
+    sqrt_alpha = _column(pool.params.sqrt_alpha for pool in pools)
+    sqrt_beta = _column(pool.params.sqrt_beta for pool in pools)
+    ids = _column(pool.invariant_div_supply for pool in pools)
+
+    rel_price = px / py
+    below = ids * px * (1 / sqrt_alpha - 1 / sqrt_beta)
+    above = ids * py * (sqrt_beta - sqrt_alpha)
+    inside = ((px * py).sqrt() * 2 - px / sqrt_beta - py * sqrt_alpha) * ids
+    prices_bpt = _select(
+        [rel_price <= sqrt_alpha * sqrt_alpha, rel_price >= sqrt_beta * sqrt_beta],
+        [below, above],
+        inside,
+    )
+    return prices_bpt.tolist()
+
+
+def _mul_ainv(c: DA, s: DA, lam: DA, t: Tuple[DA, DA]) -> Tuple[DA, DA]:
+    """lp_share_pricing.mul_Ainv()"""
+    vecx = t[0] * lam * c + t[1] * s
+    vecy = -t[0] * lam * s + t[1] * c
+    return vecx, vecy
+
+
+def _price_eclp(pools: List[PoolDescriptor], prices: DA) -> List[D]:
+    """price_bpt_ECLP() for each pool."""
+    px, py = _gather(pools, prices, 0), _gather(pools, prices, 1)
+    alpha, beta, c, s, lam = (
+        _column(getattr(pool.params.params, name) for pool in pools)
+        for name in ("alpha", "beta", "c", "s", "lam")
+    )
+    tau_alpha = tuple(
+        _column(pool.params.derived.tau_alpha[k] for pool in pools) for k in (0, 1)
+    )
+    tau_beta = tuple(
+        _column(pool.params.derived.tau_beta[k] for pool in pools) for k in (0, 1)
+    )
+    ids = _column(pool.invariant_div_supply for pool in pools)
+
+    px_in_y = px / py
+    ainv_tau_alpha = _mul_ainv(c, s, lam, tau_alpha)
+    ainv_tau_beta = _mul_ainv(c, s, lam, tau_beta)
+    below = (ainv_tau_beta[0] - ainv_tau_alpha[0]) * px * ids
+    above = (ainv_tau_alpha[1] - ainv_tau_beta[1]) * py * ids
+
+    # tau(params, px_in_y), i.e., eta(zeta(params, px_in_y))
+    nd = (c * -1 / lam - s * px_in_y / lam, s * -1 + c * px_in_y)
+    pxc = -nd[1] / nd[0]
+    z = (pxc * pxc + 1).sqrt()
+    sub_vec = _mul_ainv(c, s, lam, (pxc / z, 1 / z))
+    vecx = ainv_tau_beta[0] - sub_vec[0]
+    vecy = ainv_tau_alpha[1] - sub_vec[1]
+    inside = (px * vecx + py * vecy) * ids
+
+    prices_bpt = _select([px_in_y < alpha, px_in_y > beta], [below, above], inside)
+    return prices_bpt.tolist()
+
+
+_GROUP_PRICERS: Dict[int, Callable[[List[PoolDescriptor], DA], List[D]]] = {
+    VaultType.BALANCER_CPMM: _price_cpmm,
+    VaultType.BALANCER_2CLP: _price_2clp,
+    VaultType.BALANCER_3CLP: _price_3clp,
+    VaultType.BALANCER_ECLP: _price_eclp,
+}
+
+
+def price_bpts(pools: Sequence[PoolDescriptor], prices: Sequence[D]) -> List[D]:
+    """LP share price of each pool, given the shared vector of underlying prices."""
+    prices = DA(list(prices))
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for i, pool in enumerate(pools):
+        if pool.vault_type not in _GROUP_PRICERS:
+            raise ValueError(f"unsupported vault type: {pool.vault_type}")
+        groups[pool.vault_type].append(i)
+
+    result: List[D] = [D(0)] * len(pools)
+    for vault_type, indices in groups.items():
+        group_prices = _GROUP_PRICERS[vault_type]([pools[i] for i in indices], prices)
+        for i, price in zip(indices, group_prices):
+            result[i] = price
+    return result
@@ -26,9 +26,9 @@ def price_bpt_CPMM(
 ) -> D:
     prod = convd(invariant_div_supply, D3)
     for i in range(len(weights)):
-        prod = prod * (
-            convd(underlying_prices[i], D3) / convd(weights[i], D3)
-        ) ** convd(weights[i], D3)
+        prod = prod * (convd(underlying_prices[i], D3) / convd(weights[i], D3)).pow(
+            convd(weights[i], D3)
+        )
     return convd(prod, D)
 
 
@@ -38,7 +38,7 @@ def price_bpt_two_asset_CPMM(
     second_term = (
         (convd(underlying_prices[0], D3) * convd(weights[1], D3))
         / (convd(weights[0], D3) * convd(underlying_prices[1], D3))
-    ) ** convd(weights[0], D3)
+    ).pow(convd(weights[0], D3))
     third_term = convd(underlying_prices[1], D3) / convd(weights[1], D3)
     return convd(invariant_div_supply * second_term * third_term, D)
 
@@ -49,7 +49,7 @@ def price_bpt_CPMM_equal_weights(
     prod = D3("1")
     for i in range(len(underlying_prices)):
         prod = prod * convd(underlying_prices[i], D3) / convd(weight, D3)
-    prod = prod ** convd(weight, D3)
+    prod = prod.pow(convd(weight, D3))
     return convd(prod * convd(invariant_div_supply, D3), D)
 
 
@@ -81,7 +81,7 @@ def price_bpt_2clp(
         )
     else:
         term = (
-            D3("2") * D3(px * py) ** D3(1 / 2)
+            D3("2") * D3(px * py).sqrt()
             - px / sqrt_beta_high_prec
             - py * sqrt_alpha_high_prec
         )
@@ -92,7 +92,7 @@ def price_bpt_3clp(
     cbrt_alpha: D, invariant_div_supply: D, underlying_prices: Iterable[D]
 ) -> D:
     px, py, pz = (underlying_prices[0], underlying_prices[1], underlying_prices[2])
-    term = 3 * (px * py * pz) ** D(1 / 3) - (px + py + pz) * cbrt_alpha
+    term = 3 * (px * py * pz).pow(D(1 / 3)) - (px + py + pz) * cbrt_alpha
     return term * invariant_div_supply
 
 
@@ -131,12 +131,10 @@ def scalar_prod(t1: tuple[D3, D3], t2: tuple[D3, D3]) -> D3:
 
 
 def mul_Ainv(params: ECLP_params, t: tuple[D, D]) -> tuple[D3, D3]:
-    vecx = convd(t[0], D3) * convd(params.lam, D3) * convd(params.c, D3) + convd(
-        t[1], D3
-    ) * convd(params.s, D3)
-    vecy = convd(-t[0], D3) * convd(params.lam, D3) * convd(params.s, D3) + convd(
-        t[1], D3
-    ) * convd(params.c, D3)
+    t0, t1 = convd(t[0], D3), convd(t[1], D3)
+    lam, c, s = convd(params.lam, D3), convd(params.c, D3), convd(params.s, D3)
+    vecx = t1.mul_add(s, t0 * lam * c)
+    vecy = t1.mul_add(c, -t0 * lam * s)
     return (vecx, vecy)
 
 
@@ -156,7 +154,7 @@ def tau(params: ECLP_params, px: D) -> tuple[D, D]:
 
 
 def eta(pxc: D) -> tuple[D, D]:
-    z = D(1 + pxc**2) ** D(1 / 2)
+    z = D(1 + pxc**2).sqrt()
     vecx = pxc / z
     vecy = D(1) / z
     return (vecx, vecy)
@@ -218,7 +216,7 @@ def price_bpt_3CLP(
     # Relative prices of a pool that is arbitrage-free with the external market
     pXZPool, pYZPool = relativeEquilibriumPrices3CLP(alpha_high_prec, pXZ, pYZ)
 
-    gamma = (convd(pXZPool, D3) * convd(pYZPool, D3)) ** (D3(1) / 3)
+    gamma = (convd(pXZPool, D3) * convd(pYZPool, D3)).pow(D3(1) / 3)
 
     # Absolute prices (short notation)
     value_factor = gamma * (
@@ -0,0 +1,85 @@
+import random
+from math import cos, pi, sin
+
+import pytest
+
+from tests.oracles import lp_share_pricing as math_implementation
+from tests.oracles import lp_share_pricing_batch as batch
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.types import VaultType
+
+TOKENS = [f"0x{i:040x}" for i in range(8)]
+
+
+def random_price(rng: random.Random) -> D:
+    return D(rng.randrange(10**12, 10**20)) / 10**16
+
+
+def random_pool(rng: random.Random, vault_type: int, prices):
+    """(descriptor, expected price from the scalar function)"""
+    ids = random_price(rng)
+    n = 3 if vault_type == VaultType.BALANCER_3CLP else 2
+    indices = tuple(rng.sample(range(len(prices)), n))
+    pool_prices = [prices[i] for i in indices]
+    if vault_type == VaultType.BALANCER_CPMM:
+        w = D(rng.randrange(5, 96)) / 100
+        params = batch.CPMMParams((w, 1 - w))
+        expected = math_implementation.price_bpt_CPMM(params.weights, ids, pool_prices)
+    elif vault_type == VaultType.BALANCER_2CLP:
+        alpha = D(rng.randrange(50, 99)) / 100
+        beta = D(rng.randrange(101, 200)) / 100
+        params = batch.TwoCLPParams(alpha.sqrt(), beta.sqrt())
+        expected = math_implementation.price_bpt_2clp(*params, ids, pool_prices)
+    elif vault_type == VaultType.BALANCER_3CLP:
+        params = batch.ThreeCLPParams(D(rng.randrange(90, 99)) / 100)
+        expected = math_implementation.price_bpt_3CLP(*params, ids, pool_prices)
+    else:
+        phi = rng.uniform(10, 80) / 360 * 2 * pi
+        eclp_params = math_implementation.ECLP_params(
+            D(rng.randrange(5, 99)) / 100,
+            D(rng.randrange(101, 2000)) / 100,
+            D(cos(phi)),
+            D(sin(phi)),
+            D(rng.randrange(1, 10_000)),
+        )
+        derived = math_implementation.ECLP_derived_params(
+            math_implementation.tau(eclp_params, eclp_params.alpha),
+            math_implementation.tau(eclp_params, eclp_params.beta),
+        )
+        params = batch.ECLPParams(eclp_params, derived)
+        expected = math_implementation.price_bpt_ECLP(
+            eclp_params, derived, ids, pool_prices
+        )
+    return batch.PoolDescriptor(vault_type, params, ids, indices), expected
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_price_bpts_matches_scalar(seed):
+    rng = random.Random(seed)
+    prices = [random_price(rng) for _ in TOKENS]
+    # Prices close together, so that all price regions of the 2CLP and ECLP pools occur.
+    prices[:3] = [D(1), D("1.02"), D("0.9")]
+    vault_types = [
+        VaultType.BALANCER_CPMM,
+        VaultType.BALANCER_2CLP,
+        VaultType.BALANCER_3CLP,
+        VaultType.BALANCER_ECLP,
+    ]
+    pools, expected = zip(
+        *(random_pool(rng, rng.choice(vault_types), prices) for _ in range(60))
+    )
+    assert batch.price_bpts(pools, prices) == list(expected)
+
+
+def test_unsupported_vault_type():
+    pool = batch.PoolDescriptor(VaultType.GENERIC, None, D(1), (0,))
+    with pytest.raises(ValueError):
+        batch.price_bpts([pool], [D(1)])
+
+
+def test_construct_tokens_array():
+    tokens, indices = batch.construct_tokens_array(
+        [[TOKENS[3], TOKENS[1]], [TOKENS[1], TOKENS[2], TOKENS[0]]]
+    )
+    assert tokens == TOKENS[:4]
+    assert indices == [(3, 1), (1, 2, 0)]
@@ -23,7 +23,7 @@ def isge(x: D, y: D, prec: D) -> bool:
     return isle(y, x, prec)
 
 
-def sqrt(x: D, prec=prec_internal) -> D:
+def sqrt(x: D, prec=prec_internal, logexpmath: bool = False) -> D:
     # The following check used to be an assertion before, but hypothesis kept hitting it, via the path through
     # compute_lower_redemption_threshold() via some of the precomputation steps. Making it a warning now. We know
     # this doesn't cause a problem in the grand scheme of things b/c the tests still go through.
@@ -32,4 +32,4 @@ def sqrt(x: D, prec=prec_internal) -> D:
     # assert x >= -prec  # In a real implementation, this assertion should just be some softer logging/reporting I guess.
     if x < 0:
         return D(0)
-    return x.sqrt()
+    return x.sqrt(logexpmath=logexpmath)
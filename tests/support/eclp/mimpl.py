@@ -1,13 +1,17 @@
+from collections import Counter
 from dataclasses import dataclass
 
 # noinspection PyPep8Naming
 from tests.support.quantized_decimal import QuantizedDecimal as D
-from functools import cached_property
-from math import cos, sin, pi
+from tests.support.quantized_decimal_array import QuantizedDecimalArray as DA
+from functools import cached_property, lru_cache
+from math import ceil, cos, isfinite, sin, pi
 
 # import dfuzzy
 # from dfuzzy import isle, isge
-from typing import Optional
+from typing import NamedTuple, Optional
+
+import numpy as np
 
 from tests.support.eclp.dfuzzy import (
     isclose,
@@ -43,7 +47,64 @@ def eta(pxc: D) -> Vector:
     return pxc / z, D(1) / z
 
 
-@dataclass
+@dataclass(frozen=True)
+class DerivedParams:
+    """Constants that only depend on the Params, computed once per distinct Params (see `compute_derived_params()`).
+
+    Each is computed with the same operations, in the same order, as the expression it stands for in the formulas
+    below, so using them doesn't change any results."""
+
+    c: D
+    s: D
+    # Entries of A and A^{-1}, as they appear in A_times() and Ainv_times().
+    c_over_l: D  # c / l
+    s_over_l: D  # s / l
+    c_times_l: D  # c * l
+    minus_s_times_l: D  # -s * l
+    tau_alpha: Vector
+    tau_beta: Vector
+    # Offsets and exhaustion points per unit of r, see ECLP.a, b, xmax and ymax.
+    ainv_x_tau_alpha: D  # Ainv_times_x(*tau_alpha)
+    ainv_y_tau_alpha: D  # Ainv_times_y(*tau_alpha)
+    ainv_x_tau_beta: D  # Ainv_times_x(*tau_beta)
+    ainv_y_tau_beta: D  # Ainv_times_y(*tau_beta)
+    # A . chi, where chi = (Ainv_times_x(*tau_beta), Ainv_times_y(*tau_alpha)), and |A . chi|^2 - 1. See
+    # ECLP.from_x_y().
+    achi: Vector
+    achi_norm2_minus_1: D
+    # Terms of the quadratic in ECLP._compute_y_for_x() and _compute_x_for_y(), with lambda underlined
+    # ls = 1 - 1 / l**2.
+    ls: D
+    s2_c2_ls2: D  # s**2 * c**2 * ls**2
+    minus_s_c_ls: D  # -s * c * ls
+    one_minus_ls_s2: D  # 1 - ls * s**2
+    one_minus_ls_c2: D  # 1 - ls * c**2
+
+    @cached_property
+    def floats(self) -> "DerivedParams":
+        """The same constants as floats, for the float64 computations below."""
+        return self._converted(float)
+
+    @cached_property
+    def scaled(self) -> "DerivedParams":
+        """The same constants as scaled ints, for the exact integer computations in AdaptiveSolver."""
+        return self._converted(lambda value: value.scaled)
+
+    def _converted(self, convert) -> "DerivedParams":
+        return DerivedParams(
+            **{
+                name: (
+                    tuple(map(convert, value))
+                    if isinstance(value, tuple)
+                    else convert(value)
+                )
+                for name, value in vars(self).items()
+                if name not in ("floats", "scaled")
+            }
+        )
+
+
+@dataclass(frozen=True)
 class Params:
     # Price bounds. alpha and beta in the writeup.
     # Require alpha < 1 < beta.
@@ -62,22 +123,27 @@ class Params:
     # λ in the writeup.
     l: D
 
-    # The matrices A and A^{-1} are kept implicitly. See the writeup, section 2.2, for what they are.
+    # The matrices A and A^{-1} are kept implicitly. See the writeup, section 2.2, for what they are. Their entries
+    # and everything else that only depends on the params are precomputed in `derived`.
 
     @staticmethod
     def from_angle_degrees(alpha: D, beta: D, phi: D, l: D):
         assert phi <= 0  # Not strictly required but catches a common mistake.
         return Params(alpha, beta, *angle2rotationpoint(phi * 2 * pi_d / 360), l)
 
+    @cached_property
+    def derived(self) -> DerivedParams:
+        return compute_derived_params(self.alpha, self.beta, self.rx, self.ry, self.l)
+
     # Shorthands:
 
-    @cached_property
+    @property
     def c(self):
-        return self.rx
+        return self.derived.c
 
-    @cached_property
+    @property
     def s(self):
-        return -self.ry
+        return self.derived.s
 
     def zeta(self, px: D):
         """Transform a price px of the transformed circle (i.e., the ellipse) into a price _pxc of the untransformed
@@ -101,39 +167,91 @@ class Params:
     # The following two are somewhat expensive to compute and we may therefore want to cache them in the solidity
     # implementation, too. A comparison should be done though.
 
-    @cached_property
+    @property
     def tau_alpha(self) -> Vector:
-        return self.tau(self.alpha)
+        return self.derived.tau_alpha
 
-    @cached_property
+    @property
     def tau_beta(self) -> Vector:
-        return self.tau(self.beta)
+        return self.derived.tau_beta
 
     def Ainv_times(self, x: D, y: D) -> Vector:
         """A^{-1} . (x, y), where '.' is matrix-vector multiplication and A is the transformation matrix."""
-        retx = self.c * self.l * x + self.s * y
-        rety = -self.s * self.l * x + self.c * y
-        return retx, rety
+        return self.Ainv_times_x(x, y), self.Ainv_times_y(x, y)
 
     # x and y coordinates of the above. These could be inlined in the final implementation.
     def Ainv_times_x(self, x: D, y: D) -> D:
-        return self.c * self.l * x + self.s * y
+        derived = self.derived
+        return derived.c_times_l * x + derived.s * y
 
     def Ainv_times_y(self, x: D, y: D) -> D:
-        return -self.s * self.l * x + self.c * y
+        derived = self.derived
+        return derived.minus_s_times_l * x + derived.c * y
 
     def A_times(self, x: D, y: D) -> Vector:
         """A . (x, y)."""
-        retx = self.c / self.l * x - self.s / self.l * y
-        rety = self.s * x + self.c * y
-        return retx, rety
+        return self.A_times_x(x, y), self.A_times_y(x, y)
 
     # x and y coordinates
     def A_times_x(self, x: D, y: D) -> D:
-        return self.c / self.l * x - self.s / self.l * y
+        derived = self.derived
+        return derived.c_over_l * x - derived.s_over_l * y
 
     def A_times_y(self, x: D, y: D) -> D:
-        return self.s * x + self.c * y
+        derived = self.derived
+        return derived.s * x + derived.c * y
+
+
+# Number of distinct params whose derived constants we keep. Simulations and hypothesis runs often recreate equal
+# Params, e.g., when converting from the Solidity structs.
+DERIVED_PARAMS_CACHE_SIZE = 1024
+
+
+# typed=True so that the same values at different precisions are different entries.
+@lru_cache(maxsize=DERIVED_PARAMS_CACHE_SIZE, typed=True)
+def compute_derived_params(alpha: D, beta: D, rx: D, ry: D, l: D) -> DerivedParams:
+    """Derived constants of Params(alpha, beta, rx, ry, l), shared by all instances with these values. Use
+    `compute_derived_params.cache_info()` for the number of hits and misses."""
+    c, s = rx, -ry
+    c_over_l, s_over_l = c / l, s / l
+    c_times_l, minus_s_times_l = c * l, -s * l
+
+    def A_times(x: D, y: D) -> Vector:
+        return c_over_l * x - s_over_l * y, s * x + c * y
+
+    def Ainv_times(x: D, y: D) -> Vector:
+        return c_times_l * x + s * y, minus_s_times_l * x + c * y
+
+    def tau(px: D) -> Vector:
+        d, n = A_times(D(-1), px)
+        return eta(-n / d)
+
+    tau_alpha, tau_beta = tau(alpha), tau(beta)
+    ainv_x_tau_alpha, ainv_y_tau_alpha = Ainv_times(*tau_alpha)
+    ainv_x_tau_beta, ainv_y_tau_beta = Ainv_times(*tau_beta)
+    achi = A_times(ainv_x_tau_beta, ainv_y_tau_alpha)
+    ls = 1 - 1 / l**2
+    return DerivedParams(
+        c=c,
+        s=s,
+        c_over_l=c_over_l,
+        s_over_l=s_over_l,
+        c_times_l=c_times_l,
+        minus_s_times_l=minus_s_times_l,
+        tau_alpha=tau_alpha,
+        tau_beta=tau_beta,
+        ainv_x_tau_alpha=ainv_x_tau_alpha,
+        ainv_y_tau_alpha=ainv_y_tau_alpha,
+        ainv_x_tau_beta=ainv_x_tau_beta,
+        ainv_y_tau_beta=ainv_y_tau_beta,
+        achi=achi,
+        achi_norm2_minus_1=scalarprod(*achi, *achi) - D(1),
+        ls=ls,
+        s2_c2_ls2=s**2 * c**2 * ls**2,
+        minus_s_c_ls=-s * c * ls,
+        one_minus_ls_s2=1 - ls * s**2,
+        one_minus_ls_c2=1 - ls * c**2,
+    )
 
 
 # For testing
@@ -145,6 +263,286 @@ def scalarprod(x1: D, y1: D, x2: D, y2: D) -> D:
     return x1 * x2 + y1 * y2
 
 
+# Quotes from ECLP.quote_x_float() and quote_y_float() are recomputed exactly where an error bound is larger than
+# this, relative to the amount or the price, respectively.
+FLOAT_QUOTE_REL_TOLERANCE = 1e-9
+
+
+class Quotes(NamedTuple):
+    amounts: (
+        DA  # What trade_x() or trade_y() returns, or 0 where the trade is not possible.
+    )
+    prices: DA  # px after each trade, or 0 where it is not possible.
+    valid: np.ndarray  # False where trade_x() or trade_y() would return None.
+
+
+class NegativeReserveError(AssertionError):
+    """A trade within the exhaustion points xmax/ymax resulted in a negative reserve due to rounding."""
+
+
+class FloatQuotes(NamedTuple):
+    amounts: np.ndarray
+    prices: np.ndarray
+    valid: np.ndarray
+    # Bounds on the absolute error of the amounts and prices, compared to Quotes.amounts and Quotes.prices.
+    error_bounds: np.ndarray
+    price_error_bounds: np.ndarray
+    exact: np.ndarray  # True where the quote was recomputed exactly.
+
+
+def _to_float(values: DA) -> np.ndarray:
+    return values.scaled.astype(float) / values.ONE
+
+
+# Running error analysis of the float64 versions of the ECLP formulas. Each e_* bounds the distance of a float64
+# value to the exact one, to first order, counting a relative error of u for each float operation and input
+# conversion, and an absolute error of ulp for each operation of the exact computation it is compared to. The
+# results are doubled to cover the second-order terms. With u = 2**-53 and ulp = 0, they bound the error to the
+# mathematically exact result; with u = 0 and ulp = 1e-18, they bound the rounding error of QuantizedDecimal.
+
+_FLOAT_U = 2.0**-53
+_DECIMAL_ULP = float(D.from_scaled(1))
+_ONE = D(1).scaled
+
+
+def _sqrt_error(dr, e_d, u: float, ulp: float):
+    """Error bound for dr = sqrt(max(d, 0)) given the error bound e_d of d."""
+    # |sqrt(a) - sqrt(b)| <= min(sqrt(|a - b|), |a - b| / sqrt(a)). dr is a numpy value, so e_d / 0 is inf (or nan,
+    # which fmin() ignores) rather than an exception.
+    return np.fmin(np.sqrt(e_d), e_d / dr) + u * dr + ulp
+
+
+def _float_other_reserve(
+    new, offset, other_offset, k, m, inner, divisor, r2, u: float, ulp: float
+):
+    """Other reserve from the quadratic in ECLP._compute_y_for_x() (or _compute_x_for_y(), with the respective
+    coefficients) in float64, and its error bound. Works on numpy arrays and on scalars.
+    """
+    p = new - offset
+    # The offsets are r times a constant, see _float_trade_terms().
+    e_p = 3 * u * abs(new) + 5 * u * abs(offset) + 2 * ulp
+    p2 = p * p
+    e_p2 = 2 * abs(p) * e_p + e_p**2 + u * p2 + ulp
+    t1 = k * p2
+    e_t1 = abs(k) * e_p2 + 3 * u * abs(t1) + ulp
+    t2 = inner * p2 - r2
+    e_t2 = abs(inner) * e_p2 + 3 * u * (abs(inner * p2) + r2) + 2 * ulp
+    t3 = divisor * t2
+    e_t3 = abs(divisor) * e_t2 + 3 * u * abs(t3) + ulp
+    d = t1 - t3
+    e_d = e_t1 + e_t3 + u * abs(d) + ulp
+    dr = np.sqrt(np.maximum(d, 0))
+    e_dr = _sqrt_error(dr, e_d, u, ulp)
+    n = m * p - dr
+    e_n = abs(m) * e_p + 3 * u * abs(m * p) + e_dr + u * abs(n) + ulp
+    other_new = n / divisor + other_offset
+    e_other_new = (
+        e_n / abs(divisor)
+        + 3 * u * abs(n / divisor)
+        + 5 * u * abs(other_offset)
+        + u * abs(other_new)
+        + 3 * ulp
+    )
+    return other_new, 2 * e_other_new
+
+
+def _float_price(
+    xs, ys, e_xs, e_ys, a, b, derived: DerivedParams, u: float, ulp: float
+):
+    """px from ECLP._compute_prices() in float64, and its error bound, given the error bounds of the reserves xs and
+    ys. a and b are the offsets, like from _float_trade_terms(), and derived must be DerivedParams.floats.
+    """
+    c_over_l, s_over_l, s, c = derived.c_over_l, derived.s_over_l, derived.s, derived.c
+    # The offsets are r times a constant.
+    xp = xs - a
+    e_xp = e_xs + 3 * u * abs(a) + u * abs(xp) + ulp
+    yp = ys - b
+    e_yp = e_ys + 3 * u * abs(b) + u * abs(yp) + ulp
+    num = c_over_l * xp - s_over_l * yp
+    e_num = (
+        abs(c_over_l) * e_xp
+        + abs(s_over_l) * e_yp
+        + 2 * u * (abs(c_over_l * xp) + abs(s_over_l * yp))
+        + u * abs(num)
+        + 2 * ulp
+    )
+    den = s * xp + c * yp
+    e_den = (
+        abs(s) * e_xp
+        + abs(c) * e_yp
+        + 2 * u * (abs(s * xp) + abs(c * yp))
+        + u * abs(den)
+        + 2 * ulp
+    )
+    pxc = num / den
+    # inf (or nan) if den may be 0, and the same for pd below.
+    e_pxc = (
+        (e_num + abs(pxc) * e_den) / np.maximum(abs(den) - e_den, 0)
+        + u * abs(pxc)
+        + ulp
+    )
+    pn = pxc * c_over_l + s
+    e_pn = (
+        abs(c_over_l) * e_pxc
+        + 2 * u * abs(pxc * c_over_l)
+        + u * (abs(s) + abs(pn))
+        + ulp
+    )
+    pd = pxc * -s_over_l + c
+    e_pd = (
+        abs(s_over_l) * e_pxc
+        + 2 * u * abs(pxc * s_over_l)
+        + u * (abs(c) + abs(pd))
+        + ulp
+    )
+    price = pn / pd
+    e_price = (
+        (e_pn + abs(price) * e_pd) / np.maximum(abs(pd) - e_pd, 0)
+        + u * abs(price)
+        + ulp
+    )
+    return price, 2 * e_price
+
+
+def _float_trade_amount(
+    dx, sum_p, d_old, q_old, residual, k_minus, m, divisor, u: float
+):
+    """Change of the other reserve in a trade from the quadratic in ECLP._compute_y_for_x() (or _compute_x_for_y())
+    in float64, and its error bound, without computing either reserve.
+
+    With p = reserve - offset, d(p) = k p^2 - divisor * (inner p^2 - r^2) and q = divisor * (other reserve - other
+    offset) - m p, the exact change is (m dx - (d_new - q_old^2) / (dr_new - q_old)) / divisor, where d_new - q_old^2 =
+    k_minus dx (p_new + p_old) + d_old - q_old^2 and k_minus = k - divisor * inner. q_old is about -dr_old, so nothing
+    cancels and the error scales with the trade rather than the reserves. The arguments are exact values rounded to
+    float64; sum_p is p_new + p_old and residual is d_old - q_old^2, which is 0 if the old reserves are on the curve.
+    """
+    t = k_minus * dx * sum_p
+    e_t = 5 * u * abs(t)
+    d_new = d_old + t
+    e_d_new = u * abs(d_old) + e_t + u * abs(d_new)
+    dr_new = np.sqrt(np.maximum(d_new, 0))
+    e_dr_new = _sqrt_error(dr_new, e_d_new, u, 0)
+    den = dr_new - q_old
+    e_den = e_dr_new + u * abs(q_old) + u * abs(den)
+    num = t + residual
+    e_num = e_t + u * abs(residual) + u * abs(num)
+    frac = num / den
+    # inf (or nan) if den may be 0.
+    den_min = np.maximum(abs(den) - e_den, 0)
+    e_frac = (e_num + abs(frac) * e_den) / den_min + u * abs(frac)
+    n = m * dx - frac
+    e_n = 3 * u * abs(m * dx) + e_frac + u * abs(n)
+    amount = n / divisor
+    e_amount = e_n / abs(divisor) + 2 * u * abs(amount)
+    return amount, 2 * e_amount
+
+
+def _float_trade_terms(derived: DerivedParams, r: float, trade_x: bool):
+    """Offsets of the token paid in and of the other token, and the inner factor and divisor of the quadratic, like
+    ECLP._trade_terms(), in float64. derived must be DerivedParams.floats."""
+    if trade_x:
+        return (
+            r * derived.ainv_x_tau_beta,
+            r * derived.ainv_y_tau_alpha,
+            derived.one_minus_ls_c2,
+            derived.one_minus_ls_s2,
+        )
+    return (
+        r * derived.ainv_y_tau_alpha,
+        r * derived.ainv_x_tau_beta,
+        derived.one_minus_ls_s2,
+        derived.one_minus_ls_c2,
+    )
+
+
+def _float_invariant(x, y, derived: DerivedParams, u: float, ulp: float):
+    """r from ECLP.from_x_y() in float64, and its error bound."""
+    derived = derived.floats
+    c_over_l, s_over_l, s, c = derived.c_over_l, derived.s_over_l, derived.s, derived.c
+    achi_x, achi_y = derived.achi
+    a = derived.achi_norm2_minus_1
+    atx = c_over_l * x - s_over_l * y
+    e_atx = 3 * u * (abs(c_over_l * x) + abs(s_over_l * y)) + u * abs(atx) + 2 * ulp
+    aty = s * x + c * y
+    e_aty = 3 * u * (abs(s * x) + abs(c * y)) + u * abs(aty) + 2 * ulp
+    b = atx * achi_x + aty * achi_y
+    e_b = (
+        abs(achi_x) * e_atx
+        + abs(achi_y) * e_aty
+        + 3 * u * (abs(atx * achi_x) + abs(aty * achi_y))
+        + u * abs(b)
+        + 2 * ulp
+    )
+    cc = atx * atx + aty * aty
+    e_cc = 2 * abs(atx) * e_atx + 2 * abs(aty) * e_aty + 3 * u * cc + 2 * ulp
+    d = b * b - a * cc
+    e_d = (
+        2 * abs(b) * e_b
+        + 3 * u * b * b
+        + abs(a) * e_cc
+        + 3 * u * abs(a * cc)
+        + u * abs(d)
+        + 2 * ulp
+    )
+    dr = np.sqrt(np.float64(max(d, 0.0)))
+    e_dr = _sqrt_error(dr, e_d, u, ulp)
+    r = (b + dr) / a
+    e_r = (e_b + e_dr) / abs(a) + 3 * u * abs(r) + ulp
+    return r, 2 * e_r
+
+
+def _float_invariant_lagrange(x, y, derived: DerivedParams):
+    """r from ECLP.from_x_y() in float64, and its error bound, like _float_invariant() but more precise for large l.
+
+    b^2 and a * cc are both about l^2 cc, so their difference, the discriminant, cancels. By Lagrange's identity, it
+    is (1 + delta) cc - (atx achi_y - aty achi_x)^2 instead, where delta = |achi|^2 - 1 - a is only due to the
+    rounding of the constants and is computed exactly.
+    """
+    u = _FLOAT_U
+    scaled = derived.scaled
+    achi_x_s, achi_y_s = scaled.achi
+    one_plus_delta = (
+        achi_x_s**2 + achi_y_s**2 - scaled.achi_norm2_minus_1 * _ONE
+    ) / _ONE**2
+    derived = derived.floats
+    c_over_l, s_over_l, s, c = derived.c_over_l, derived.s_over_l, derived.s, derived.c
+    achi_x, achi_y = derived.achi
+    a = derived.achi_norm2_minus_1
+    atx = c_over_l * x - s_over_l * y
+    e_atx = 3 * u * (abs(c_over_l * x) + abs(s_over_l * y)) + u * abs(atx)
+    aty = s * x + c * y
+    e_aty = 3 * u * (abs(s * x) + abs(c * y)) + u * abs(aty)
+    b = atx * achi_x + aty * achi_y
+    e_b = (
+        abs(achi_x) * e_atx
+        + abs(achi_y) * e_aty
+        + 3 * u * (abs(atx * achi_x) + abs(aty * achi_y))
+        + u * abs(b)
+    )
+    cc = atx * atx + aty * aty
+    e_cc = 2 * abs(atx) * e_atx + 2 * abs(aty) * e_aty + 3 * u * cc
+    cross = atx * achi_y - aty * achi_x
+    e_cross = (
+        abs(achi_y) * e_atx
+        + abs(achi_x) * e_aty
+        + 3 * u * (abs(atx * achi_y) + abs(aty * achi_x))
+        + u * abs(cross)
+    )
+    d = one_plus_delta * cc - cross * cross
+    e_d = (
+        abs(one_plus_delta) * e_cc
+        + 3 * u * abs(one_plus_delta * cc)
+        + 2 * abs(cross) * e_cross
+        + 3 * u * cross * cross
+        + u * abs(d)
+    )
+    dr = np.sqrt(np.float64(max(d, 0.0)))
+    e_dr = _sqrt_error(dr, e_d, u, 0)
+    r = (b + dr) / a
+    e_r = (e_b + e_dr) / abs(a) + 3 * u * abs(r)
+    return r, 2 * e_r
+
+
 @dataclass  # Mainly to get automatic repr()
 class ECLP:
     params: Params
@@ -152,29 +550,32 @@ class ECLP:
     y: D
     r: D
 
-    def __init__(self, params: Params):
+    def __init__(self, params: Params, solver: Optional["AdaptiveSolver"] = None):
         self.params = params
         self.x = D(0)
         self.y = D(0)
         # self.a = D(0)
         # self.b = D(0)
         self.r = D(0)
+        # If set, r in from_x_y() and the reserves in trades are computed by the solver.
+        self.solver = solver
 
     @staticmethod
-    def from_x_y(x: D, y: D, params: Params):
+    def from_x_y(x: D, y: D, params: Params, solver: Optional["AdaptiveSolver"] = None):
         """Initialize from real reserves x, y.
 
         Proposition 12."""
-        ret = ECLP(params)
+        ret = ECLP(params, solver)
         ret.x = x
         ret.y = y
+        if solver is not None:
+            r = solver.solve_invariant(params, x, y)
+            if r is not None:
+                ret.r = r
+                return ret
         at: Vector = params.A_times(x, y)
-        # NOTE: What are currently arguments to A_times() will probably be completely cached in the future.
-        achi: Vector = params.A_times(
-            params.Ainv_times_x(*params.tau_beta),
-            params.Ainv_times_y(*params.tau_alpha),
-        )
-        a = scalarprod(*achi, *achi) - D(1)
+        achi: Vector = params.derived.achi
+        a = params.derived.achi_norm2_minus_1
         b = scalarprod(*at, *achi)
         c = scalarprod(*at, *at)
         d = b**2 - a * c
@@ -196,12 +597,8 @@ class ECLP:
         taupx: Vector = params.tau(
             px
         )  # Compute these in one step b/c then we only need one square root.
-        ret.x = r * (
-            params.Ainv_times_x(*params.tau_beta) - params.Ainv_times_x(*taupx)
-        )
-        ret.y = r * (
-            params.Ainv_times_y(*params.tau_alpha) - params.Ainv_times_y(*taupx)
-        )
+        ret.x = r * (params.derived.ainv_x_tau_beta - params.Ainv_times_x(*taupx))
+        ret.y = r * (params.derived.ainv_y_tau_alpha - params.Ainv_times_y(*taupx))
         return ret
 
     @staticmethod
@@ -214,32 +611,31 @@ class ECLP:
         px = soft_clamp(px, params.alpha, params.beta, prec_input)
 
         taupx = params.tau(px)  # Somewhat expensive
-        xn = params.Ainv_times_x(*params.tau_beta) - params.Ainv_times_x(*taupx)
-        yn = params.Ainv_times_y(*params.tau_alpha) - params.Ainv_times_y(*taupx)
+        xn = params.derived.ainv_x_tau_beta - params.Ainv_times_x(*taupx)
+        yn = params.derived.ainv_y_tau_alpha - params.Ainv_times_y(*taupx)
         r = v / (px * xn + yn)
         return ECLP.from_px_r(px, r, params)
 
     # Offsets. Note that, in contrast to (say) virtual reserve offsets, these are *subtracted* from the real reserve.
     # Equivalently, we shift the curve up-right rather than down-left.
     # For the formulas see Proposition 7.
-    # For implementation: These are fast to compute. Caching them is probably not worth it, though this should be
-    # reviewed.
+    # For implementation: These are fast to compute given the offsets per unit of r, which only depend on the params.
     @property
     def a(self):
-        return self.r * self.params.Ainv_times_x(*self.params.tau_beta)
+        return self.r * self.params.derived.ainv_x_tau_beta
 
     @property
     def b(self):
-        return self.r * self.params.Ainv_times_y(*self.params.tau_alpha)
+        return self.r * self.params.derived.ainv_y_tau_alpha
 
     # Exhaustion points x^+, y^+. See Prop 7.
     @property
     def xmax(self):
-        return self.a - self.r * self.params.Ainv_times_x(*self.params.tau_alpha)
+        return self.a - self.r * self.params.derived.ainv_x_tau_alpha
 
     @property
     def ymax(self):
-        return self.b - self.r * self.params.Ainv_times_y(*self.params.tau_beta)
+        return self.b - self.r * self.params.derived.ainv_y_tau_beta
 
     @property
     def _pxc(self):
@@ -259,8 +655,10 @@ class ECLP:
     def px(self):
         """Current instantaneous price. See general theory at the beginning of section 2."""
         pxc = self._pxc
-        axx, ayx = self.params.A_times(D(1), D(0))
-        axy, ayy = self.params.A_times(D(0), D(1))
+        # Columns of A, i.e., A . (1, 0) and A . (0, 1).
+        derived = self.params.derived
+        axx, ayx = derived.c_over_l, derived.s
+        axy, ayy = -derived.s_over_l, derived.c
         return (pxc * axx + ayx) / (pxc * axy + ayy)
 
     @property
@@ -276,12 +674,9 @@ class ECLP:
     def pf_value(self):
         """Portfolio value. Proposition 10."""
         taupx = self._tau_px
-        nx = self.params.Ainv_times_x(*self.params.tau_beta) - self.params.Ainv_times_x(
-            *taupx
-        )
-        ny = self.params.Ainv_times_y(
-            *self.params.tau_alpha
-        ) - self.params.Ainv_times_y(*taupx)
+        derived = self.params.derived
+        nx = derived.ainv_x_tau_beta - self.params.Ainv_times_x(*taupx)
+        ny = derived.ainv_y_tau_alpha - self.params.Ainv_times_y(*taupx)
         return self.r * (self.px * nx + ny)
 
     def show_invariant_r(self):
@@ -336,26 +731,34 @@ class ECLP:
         if not nomaxvals and x > self.xmax:
             return None
 
+        if self.solver is not None:
+            y = self.solver.solve_other_reserve(self, x, self.y, trade_x=True)
+            if y is not None:
+                return self._check_reserve(y, nomaxvals)
+
         xp = x - self.a
 
-        ls = 1 - 1 / self.params.l**2  # λ underlined in the prop.
-        s = self.params.s
-        c = self.params.c
+        # With λ underlined in the prop as ls: s**2 c**2 ls**2, -s c ls, 1 - ls s**2 and 1 - ls c**2.
+        derived = self.params.derived
 
-        d = s**2 * c**2 * ls**2 * xp**2 - (1 - ls * s**2) * (
-            (1 - ls * c**2) * xp**2 - self.r**2
+        d = derived.s2_c2_ls2 * xp**2 - derived.one_minus_ls_s2 * (
+            derived.one_minus_ls_c2 * xp**2 - self.r**2
         )
         dr = sqrt(d)
-        yp = (-s * c * ls * xp - dr) / (1 - ls * s**2)
+        yp = (derived.minus_s_c_ls * xp - dr) / derived.one_minus_ls_s2
 
         y = yp + self.b
+        return self._check_reserve(y, nomaxvals)
 
+    @staticmethod
+    def _check_reserve(reserve: D, nomaxvals: bool) -> Optional[D]:
         # Sanity check
-        if y < 0:
-            assert nomaxvals  # Sanity check: We should only be able to reach this point if we didn't check for xmax above.
+        if reserve < 0:
+            # Sanity check: We should only be able to reach this point if we didn't check for xmax above.
+            if not nomaxvals:
+                raise NegativeReserveError(f"negative reserve {reserve}")
             return None
-
-        return y
+        return reserve
 
     def _compute_x_for_y(self, y: D, nomaxvals: bool = False) -> Optional[D]:
         if y < 0:
@@ -364,26 +767,166 @@ class ECLP:
         if not nomaxvals and y > self.ymax:
             return None
 
-        ls = 1 - 1 / self.params.l**2  # λ underlined in the prop.
-        s = self.params.s
-        c = self.params.c
+        if self.solver is not None:
+            x = self.solver.solve_other_reserve(self, y, self.x, trade_x=False)
+            if x is not None:
+                return self._check_reserve(x, nomaxvals)
+
+        # See _compute_y_for_x(). The roles of s and c are swapped.
+        derived = self.params.derived
 
         yp = y - self.b
 
-        d = s**2 * c**2 * ls**2 * yp**2 - (1 - ls * c**2) * (
-            (1 - ls * s**2) * yp**2 - self.r**2
+        d = derived.s2_c2_ls2 * yp**2 - derived.one_minus_ls_c2 * (
+            derived.one_minus_ls_s2 * yp**2 - self.r**2
         )
         dr = sqrt(d)
-        xp = (-s * c * ls * yp - dr) / (1 - ls * c**2)
+        xp = (derived.minus_s_c_ls * yp - dr) / derived.one_minus_ls_c2
 
         x = xp + self.a
+        return self._check_reserve(x, nomaxvals)
 
-        # Sanity check
-        if x < 0:
-            assert nomaxvals
-            return None
+    # Batch quotes. These evaluate trade_x(dx, mock=True) / trade_y(dy, mock=True) for arrays of trade sizes, computing
+    # everything that only depends on the current state (offsets, bounds, r**2) once.
+
+    def quote_x(self, dxs) -> Quotes:
+        """trade_x(dx, mock=True) and the price after the trade for each dx. Each element is exactly the scalar
+        result."""
+        return self._quote(DA(dxs), trade_x=True)
+
+    def quote_y(self, dys) -> Quotes:
+        """Like quote_x(), for trade_y()."""
+        return self._quote(DA(dys), trade_x=False)
 
-        return x
+    def quote_x_float(
+        self, dxs, rel_tolerance: float = FLOAT_QUOTE_REL_TOLERANCE
+    ) -> FloatQuotes:
+        """Approximate quote_x() in float64, with a bound on the error of each amount and price.
+
+        Elements whose bounds exceed rel_tolerance times the amount or the price, or for which float64 can't certify
+        that the new reserve is non-negative (close to the exhaustion points xmax/ymax), are recomputed exactly.
+        """
+        return self._quote_float(DA(dxs), True, rel_tolerance)
+
+    def quote_y_float(
+        self, dys, rel_tolerance: float = FLOAT_QUOTE_REL_TOLERANCE
+    ) -> FloatQuotes:
+        """Like quote_x_float(), for trade_y()."""
+        return self._quote_float(DA(dys), False, rel_tolerance)
+
+    def _trade_terms(self, trade_x: bool):
+        """Reserve, offset and exhaustion point of the token paid in, reserve and offset of the other token, and the
+        inner factor and divisor of the quadratic in _compute_y_for_x() or _compute_x_for_y(), respectively.
+        """
+        derived = self.params.derived
+        if trade_x:
+            inner, divisor = derived.one_minus_ls_c2, derived.one_minus_ls_s2
+            return self.x, self.a, self.xmax, self.y, self.b, inner, divisor
+        inner, divisor = derived.one_minus_ls_s2, derived.one_minus_ls_c2
+        return self.y, self.b, self.ymax, self.x, self.a, inner, divisor
+
+    def _valid_trades(self, news: DA, trade_x: bool) -> np.ndarray:
+        _, _, max_reserve, _, _, _, _ = self._trade_terms(trade_x)
+        return (news >= 0) & (news <= max_reserve)
+
+    def _compute_other_reserves(self, news: DA, trade_x: bool) -> DA:
+        """_compute_y_for_x() or _compute_x_for_y() for an array of new reserves, which must be valid. May be negative
+        (where the scalar version fails its sanity check)."""
+        _, offset, _, _, other_offset, inner, divisor = self._trade_terms(trade_x)
+        derived = self.params.derived
+        p = news - offset
+        p2 = p * p
+        d = p2 * derived.s2_c2_ls2 - (p2 * inner - self.r**2) * divisor
+        # Like sqrt() from dfuzzy, negative values are taken to be 0.
+        dr = DA.from_scaled(np.maximum(d.scaled, 0)).sqrt()
+        return (p * derived.minus_s_c_ls - dr) / divisor + other_offset
+
+    def _compute_prices(self, xs: DA, ys: DA) -> DA:
+        """px at the states (xs, ys), with the current r."""
+        derived = self.params.derived
+        xp, yp = xs - self.a, ys - self.b
+        pxc = (xp * derived.c_over_l - yp * derived.s_over_l) / (
+            xp * derived.s + yp * derived.c
+        )
+        return (pxc * derived.c_over_l + derived.s) / (
+            pxc * -derived.s_over_l + derived.c
+        )
+
+    def _quote(self, amounts: DA, trade_x: bool) -> Quotes:
+        own, _, _, other, _, _, _ = self._trade_terms(trade_x)
+        news = amounts + own
+        valid = self._valid_trades(news, trade_x)
+        other_news = DA.full(news.shape, 0)
+        other_news.scaled[valid] = self._compute_other_reserves(
+            news[valid], trade_x
+        ).scaled
+        valid &= other_news >= 0
+        xs, ys = (news, other_news) if trade_x else (other_news, news)
+        prices = DA.full(news.shape, 0)
+        prices.scaled[valid] = self._compute_prices(xs[valid], ys[valid]).scaled
+        out = other_news - other
+        out.scaled[~valid] = 0
+        return Quotes(out, prices, valid)
+
+    def _quote_float(
+        self, amounts: DA, trade_x: bool, rel_tolerance: float
+    ) -> FloatQuotes:
+        own, _, _, other, _, _, _ = self._trade_terms(trade_x)
+        derived = self.params.derived.floats
+        news = amounts + own
+        valid = self._valid_trades(news, trade_x)
+
+        u = _FLOAT_U
+        new = _to_float(news)
+        r = float(self.r)
+        offset, other_offset, inner, divisor = _float_trade_terms(derived, r, trade_x)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            other_new, e_other_new = _float_other_reserve(
+                new,
+                offset,
+                other_offset,
+                derived.s2_c2_ls2,
+                derived.minus_s_c_ls,
+                inner,
+                divisor,
+                r**2,
+                u,
+                _DECIMAL_ULP,
+            )
+            out = other_new - float(other)
+            error_bounds = e_other_new + 2 * (
+                2 * u * abs(float(other)) + u * np.abs(out)
+            )
+            # news is exact, so only its conversion counts.
+            if trade_x:
+                xs, ys, e_xs, e_ys = new, other_new, u * np.abs(new), e_other_new
+                a, b = offset, other_offset
+            else:
+                xs, ys, e_xs, e_ys = other_new, new, e_other_new, u * np.abs(new)
+                a, b = other_offset, offset
+            prices, price_error_bounds = _float_price(
+                xs, ys, e_xs, e_ys, a, b, derived, u, _DECIMAL_ULP
+            )
+
+        exact = valid & (
+            (error_bounds > rel_tolerance * np.abs(out))
+            | (price_error_bounds > rel_tolerance * np.abs(prices))
+            | (other_new - e_other_new < 0)
+            | ~np.isfinite(error_bounds)
+            | ~np.isfinite(price_error_bounds)
+        )
+        if exact.any():
+            quotes = self._quote(amounts[exact], trade_x)
+            out[exact] = _to_float(quotes.amounts)
+            prices[exact] = _to_float(quotes.prices)
+            error_bounds[exact] = u * np.abs(out[exact])
+            price_error_bounds[exact] = u * np.abs(prices[exact])
+            valid[exact] = quotes.valid
+        out[~valid] = 0
+        prices[~valid] = 0
+        error_bounds[~valid] = 0
+        price_error_bounds[~valid] = 0
+        return FloatQuotes(out, prices, valid, error_bounds, price_error_bounds, exact)
 
     def update_liquidity(self, dr, mock: bool = False):
         """Change the invariant by dr by adding or removing liquidity.
@@ -396,10 +939,9 @@ class ECLP:
 
         # TODO this code is duplicated a few times. May make sense to give it a name.
         taupx = self._tau_px
-        taupx1 = self.params.tau(self.px)  # DEBUG
         params = self.params
-        xn = params.Ainv_times_x(*params.tau_beta) - params.Ainv_times_x(*taupx)
-        yn = params.Ainv_times_y(*params.tau_alpha) - params.Ainv_times_y(*taupx)
+        xn = params.derived.ainv_x_tau_beta - params.Ainv_times_x(*taupx)
+        yn = params.derived.ainv_y_tau_alpha - params.Ainv_times_y(*taupx)
 
         dx, dy = dr * xn, dr * yn
         if not mock:
@@ -416,6 +958,176 @@ class ECLP:
         )
 
 
+# Tolerances of AdaptiveSolver: A result is accepted if its error bound is at most rel_tolerance * |result| +
+# abs_tolerance, where the result of a trade is the amount.
+ADAPTIVE_REL_TOLERANCE = 1e-12
+ADAPTIVE_ABS_TOLERANCE = 1e-15
+
+# Levels of AdaptiveSolver, from fastest to most precise.
+FLOAT64 = "float64"
+DECIMAL = "QuantizedDecimal"
+DECIMAL_100 = "QuantizedDecimal[100]"
+
+
+class AdaptiveSolver:
+    """Computes the invariant in ECLP.from_x_y() and the reserves after a trade in float64 where that is precise
+    enough, and otherwise escalates.
+
+    Each computation runs in float64 first, together with the error bound from the running error analysis above. If
+    the bound is within tolerance of the exact result, we use the float64 result. Otherwise, we bound the rounding
+    error of the QuantizedDecimal computation the same way and, if that is within tolerance, too, let the ECLP do its
+    usual computation. Otherwise (typically when the discriminant is close to 0), we compute in
+    QuantizedDecimal[100]. Escalations are counted per level in `counts`.
+
+    For trades, the tolerance is relative to the trade amount, i.e., the difference between the new and the old
+    reserve, since that's what the caller uses. float64 computes the amount itself rather than the new reserve (see
+    _float_trade_amount()), so its error scales with the trade. The float64 result is rounded up from the upper end
+    of its error interval and the QuantizedDecimal[100] result is rounded up, too, so neither pays the trader more
+    than the exact result.
+
+    Pass the solver to ECLP.from_x_y() or assign it to ECLP.solver."""
+
+    def __init__(
+        self,
+        rel_tolerance: float = ADAPTIVE_REL_TOLERANCE,
+        abs_tolerance: float = ADAPTIVE_ABS_TOLERANCE,
+    ):
+        self.rel_tolerance = rel_tolerance
+        self.abs_tolerance = abs_tolerance
+        self.counts = Counter()
+
+    @property
+    def escalation_rate(self) -> float:
+        """Share of computations that did not finish in float64."""
+        total = sum(self.counts.values())
+        return 1 - self.counts[FLOAT64] / total if total else 0.0
+
+    def _accept(self, value: float, bound: float) -> bool:
+        """Whether bound is within tolerance of value."""
+        return bound <= self.rel_tolerance * abs(value) + self.abs_tolerance
+
+    def _to_decimal(
+        self, value: float, bound: float, round_up: bool = False
+    ) -> Optional[D]:
+        """value as a D if it's precise enough, also counting the error of the conversion, o/w None. If round_up is
+        set, the result is an upper bound of the exact value."""
+        if not (isfinite(value) and isfinite(bound)):
+            return None
+        if not round_up:
+            scaled = round(value * _ONE)
+            bound += _FLOAT_U * abs(value) + _DECIMAL_ULP
+            return D.from_scaled(scaled) if self._accept(value, bound) else None
+        scaled = ceil((value + bound) * _ONE)
+        # The result is up to 2 * bound above the exact value, plus the rounding of value + bound and the conversion.
+        bound = 2 * bound + 3 * _FLOAT_U * abs(value) + _DECIMAL_ULP
+        return D.from_scaled(scaled) if self._accept(value, bound) else None
+
+    def solve_invariant(self, params: Params, x: D, y: D) -> Optional[D]:
+        """r for the reserves x, y, or None if the ECLP should use its QuantizedDecimal computation."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r, bound = _float_invariant(float(x), float(y), params.derived, _FLOAT_U, 0)
+            result = self._to_decimal(r, bound)
+            if result is None:
+                # Which form cancels less depends on the state, but for large l, it's usually this one.
+                result = self._to_decimal(
+                    *_float_invariant_lagrange(float(x), float(y), params.derived)
+                )
+            if result is not None:
+                self.counts[FLOAT64] += 1
+                return result
+            _, bound = _float_invariant(
+                float(x), float(y), params.derived, 0, _DECIMAL_ULP
+            )
+        if self._accept(r, bound):
+            self.counts[DECIMAL] += 1
+            return None
+        self.counts[DECIMAL_100] += 1
+        ret = ECLP.from_x_y(D[100](x), D[100](y), _high_precision_params(params))
+        return D(ret.r)
+
+    def solve_other_reserve(
+        self, eclp: ECLP, new: D, old: D, trade_x: bool
+    ) -> Optional[D]:
+        """The reserve of the other token when the reserve of the traded token is `new`, or None if the ECLP should
+        use its QuantizedDecimal computation. `old` is the current reserve of the other token, against which the
+        result is precise. `new` must be between 0 and the exhaustion point.
+        """
+        derived = eclp.params.derived.scaled
+        # The inputs of _float_trade_amount() as exact integers, scaled by powers of one, so they are rounded only
+        # once when converted to float.
+        one = _ONE
+        a, b = eclp.a.scaled, eclp.b.scaled
+        if trade_x:
+            own, offset, other_offset = eclp.x.scaled, a, b
+            inner, divisor = derived.one_minus_ls_c2, derived.one_minus_ls_s2
+        else:
+            own, offset, other_offset = eclp.y.scaled, b, a
+            inner, divisor = derived.one_minus_ls_s2, derived.one_minus_ls_c2
+        k, m, r = derived.s2_c2_ls2, derived.minus_s_c_ls, eclp.r.scaled
+        k_minus = k * one - divisor * inner
+        p_old = own - offset
+        dx = new.scaled - own
+        q_old = divisor * (old.scaled - other_offset) - m * p_old
+        d_old = k_minus * p_old**2 + divisor * r**2 * one
+        with np.errstate(invalid="ignore", divide="ignore"):
+            amount, bound = _float_trade_amount(
+                dx / one,
+                (2 * p_old + dx) / one,
+                d_old / one**4,
+                q_old / one**2,
+                (d_old - q_old**2) / one**4,
+                k_minus / one**2,
+                m / one,
+                divisor / one,
+                _FLOAT_U,
+            )
+            amount, bound = float(amount), float(bound)
+            result = self._to_decimal(amount, bound, round_up=True)
+            if result is not None:
+                self.counts[FLOAT64] += 1
+                return old + result
+            floats = eclp.params.derived.floats
+            offset_f, other_offset_f, inner_f, divisor_f = _float_trade_terms(
+                floats, float(eclp.r), trade_x
+            )
+            _, bound = _float_other_reserve(
+                float(new),
+                offset_f,
+                other_offset_f,
+                floats.s2_c2_ls2,
+                floats.minus_s_c_ls,
+                inner_f,
+                divisor_f,
+                float(eclp.r) ** 2,
+                0,
+                _DECIMAL_ULP,
+            )
+        if self._accept(amount, float(bound)):
+            self.counts[DECIMAL] += 1
+            return None
+        self.counts[DECIMAL_100] += 1
+        high_precision = ECLP(_high_precision_params(eclp.params))
+        high_precision.x, high_precision.y = D[100](eclp.x), D[100](eclp.y)
+        high_precision.r = D[100](eclp.r)
+        if trade_x:
+            other_new = high_precision._compute_y_for_x(D[100](new), nomaxvals=True)
+        else:
+            other_new = high_precision._compute_x_for_y(D[100](new), nomaxvals=True)
+        if other_new is None:
+            return None
+        result = D(other_new)
+        return result if result >= other_new else result + D.from_scaled(1)
+
+
+def _high_precision_params(params: Params) -> Params:
+    return Params(
+        *(
+            D[100](v)
+            for v in (params.alpha, params.beta, params.rx, params.ry, params.l)
+        )
+    )
+
+
 def mtest_rebuild_r(mm: ECLP):
     mm1 = ECLP.from_x_y(mm.x, mm.y, mm.params)
     print(mm.r, mm1.r)
@@ -0,0 +1,177 @@
+# Replay of swap and liquidity events against the ECLP model (see mimpl.py), e.g., for backtesting a vault.
+#
+# Trades don't change the invariant r and liquidity events change it by a known dr, so the tracker updates r and the
+# reserves in O(1) per event, with the semantics of ECLP.trade_x(), trade_y() and update_liquidity(), instead of
+# recomputing r from the reserves with ECLP.from_x_y() every time. Rounding makes the reserves drift away from the
+# curve of r over many events, so every reanchor_interval events, r is recomputed from the reserves and the relative
+# change is recorded as the drift.
+#
+# Events are streamed, and the state after each event is emitted in columnar chunks of float64 numpy arrays, so
+# traces can be larger than memory. Amounts are D. In CSV and JSONL files, they are decimal strings.
+
+import csv
+import json
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from tests.support.eclp.mimpl import ECLP, NegativeReserveError
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+SWAP_X = "swap_x"  # amount = dx paid into the pool (negative: taken out)
+SWAP_Y = "swap_y"  # amount = dy paid into the pool (negative: taken out)
+LIQUIDITY = "liquidity"  # amount = dr, positive for joins and negative for exits
+KINDS = (SWAP_X, SWAP_Y, LIQUIDITY)
+
+REANCHOR_INTERVAL = 1000
+CHUNK_SIZE = 10_000
+
+
+class Event(NamedTuple):
+    timestamp: int  # seconds
+    kind: str  # SWAP_X, SWAP_Y or LIQUIDITY
+    amount: D
+
+
+class StateColumns(NamedTuple):
+    """State after each of a run of events, one array per field."""
+
+    timestamp: np.ndarray  # int64
+    kind: np.ndarray  # int8, index into KINDS
+    ok: np.ndarray  # bool. False if the event was not possible and changed nothing.
+    # Changes of the reserves by the event, from the perspective of the pool like in ECLP.trade_x()
+    dx: np.ndarray
+    dy: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    r: np.ndarray
+    px: np.ndarray
+    # Relative change of r when re-anchoring after this event, nan if we didn't re-anchor.
+    drift: np.ndarray
+
+    @staticmethod
+    def concatenate(chunks: Iterable["StateColumns"]) -> "StateColumns":
+        chunks = list(chunks)
+        return StateColumns(
+            *(
+                np.concatenate([chunk[i] for chunk in chunks])
+                for i in range(len(StateColumns._fields))
+            )
+        )
+
+
+def _parse_event(row: dict) -> Event:
+    return Event(
+        timestamp=int(row["timestamp"]), kind=row["kind"], amount=D(row["amount"])
+    )
+
+
+def read_events_csv(path: str) -> Iterator[Event]:
+    """Events from a CSV file with columns timestamp, kind and amount."""
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            yield _parse_event(row)
+
+
+def read_events_jsonl(path: str) -> Iterator[Event]:
+    """Events from a file with one JSON object per line, with the same keys as the CSV columns."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield _parse_event(json.loads(line))
+
+
+def _apply(eclp: ECLP, event: Event) -> Optional[tuple]:
+    """(dx, dy) of the event, or None if it's not possible."""
+    if event.kind == LIQUIDITY:
+        if event.amount < -eclp.r:
+            return None
+        return eclp.update_liquidity(event.amount)
+    if event.kind not in (SWAP_X, SWAP_Y):
+        raise ValueError(f"unknown event kind: {event.kind}")
+    # trade_x() and trade_y() fail a sanity check for a negative reserve right at the exhaustion point.
+    try:
+        if event.kind == SWAP_X:
+            dy = eclp.trade_x(event.amount)
+            return None if dy is None else (event.amount, dy)
+        dx = eclp.trade_y(event.amount)
+        return None if dx is None else (dx, event.amount)
+    except NegativeReserveError:
+        return None
+
+
+def _float_px(eclp: ECLP) -> float:
+    """ECLP.px in float64 from the exact offset reserves, which is accurate to a few ulps and much faster."""
+    derived = eclp.params.derived.floats
+    xp, yp = float(eclp.x - eclp.a), float(eclp.y - eclp.b)
+    pxc = (derived.c_over_l * xp - derived.s_over_l * yp) / (
+        derived.s * xp + derived.c * yp
+    )
+    return (pxc * derived.c_over_l + derived.s) / (pxc * -derived.s_over_l + derived.c)
+
+
+class _Buffer:
+    def __init__(self):
+        self.rows: List[tuple] = []
+
+    def append(self, *row):
+        self.rows.append(row)
+
+    def flush(self) -> StateColumns:
+        columns = list(zip(*self.rows))
+        self.rows = []
+        return StateColumns(
+            np.array(columns[0], dtype=np.int64),
+            np.array(columns[1], dtype=np.int8),
+            np.array(columns[2], dtype=bool),
+            *(np.array(column, dtype=float) for column in columns[3:]),
+        )
+
+
+def track(
+    events: Iterable[Event],
+    eclp: ECLP,
+    reanchor_interval: int = REANCHOR_INTERVAL,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[StateColumns]:
+    """Replay events, which should be ordered by timestamp, against eclp, which is updated in place. Yields the state
+    after each event in chunks of chunk_size events.
+
+    If eclp has a solver (see mimpl.AdaptiveSolver), the trades and the re-anchoring use it. Re-anchoring recomputes r
+    from the reserves, so the drift doesn't show errors in the reserves themselves; compare the x and y columns with a
+    run without a solver for these."""
+    buffer = _Buffer()
+    for i, event in enumerate(events, 1):
+        changes = _apply(eclp, event)
+        drift = float("nan")
+        if i % reanchor_interval == 0:
+            r = ECLP.from_x_y(eclp.x, eclp.y, eclp.params, eclp.solver).r
+            drift = float((r - eclp.r) / eclp.r)
+            eclp.r = r
+        dx, dy = (0, 0) if changes is None else changes
+        buffer.append(
+            event.timestamp,
+            KINDS.index(event.kind),
+            changes is not None,
+            float(dx),
+            float(dy),
+            float(eclp.x),
+            float(eclp.y),
+            float(eclp.r),
+            _float_px(eclp),
+            drift,
+        )
+        if len(buffer.rows) == chunk_size:
+            yield buffer.flush()
+    if buffer.rows:
+        yield buffer.flush()
+
+
+def save_columns(path: str, chunks: Iterable[StateColumns]):
+    """Save the chunks from track() as one compressed npz file."""
+    np.savez_compressed(path, **StateColumns.concatenate(chunks)._asdict())
+
+
+def load_columns(path: str) -> StateColumns:
+    with np.load(path) as data:
+        return StateColumns(*(data[name] for name in StateColumns._fields))
@@ -1,6 +1,3 @@
-from http.client import INSUFFICIENT_STORAGE
-
-
 TOKEN_AND_AMOUNTS_LENGTH_DIFFER = "1"
 TOO_MUCH_SLIPPAGE = "2"
 EXCHANGER_NOT_FOUND = "3"
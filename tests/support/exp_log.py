@@ -0,0 +1,184 @@
+# Correctly rounded exp, ln and pow on scaled integers.
+#
+# All values are ints scaled by 10**decimals and results are truncated towards 0 like all other QuantizedDecimal
+# operations, i.e., they are what a perfect fixed-point implementation with that many decimals would return. Only ln()
+# can be negative; exp() and pow() are rounded down. This is the high-precision counterpart of the bit-exact
+# LogExpMath / FixedPoint.powDown() emulation in `tests/support/libraries`.
+#
+# We evaluate the series in fixed point with some guard digits, keeping track of a bound on the accumulated error. If
+# the result is not determined by that (the approximation is too close to a multiple of 10**-decimals), we retry with
+# more guard digits (Ziv's strategy). If even MAX_GUARD_DIGITS beyond the error are not enough, the exact result
+# almost certainly is that multiple (e.g., pow(4, 0.5) = 2) and we return it.
+#
+# Errors are raised as the `decimal` exceptions that the corresponding Decimal operation (followed by quantization)
+# would raise, so that QuantizedDecimal can pass them on.
+
+import decimal
+from functools import lru_cache
+
+INITIAL_GUARD_DIGITS = 12
+MAX_GUARD_DIGITS = 96
+
+# Integer exponents up to this are computed exactly by repeated multiplication.
+MAX_INTEGER_EXPONENT = 64
+
+# log10(e) < 0.4343; we use this to bound the number of digits of exp(x).
+_LOG10_E_UPPER = 0.4343
+
+
+@lru_cache(maxsize=None)
+def _ln2(prec: int) -> int:
+    """ln(2) scaled by 10**prec, with an error of less than 1."""
+    extra = 6
+    scale = 10 ** (prec + extra)
+    # ln(2) = 2 atanh(1/3)
+    total, _ = _atanh(scale // 3, scale)
+    return 2 * total // 10**extra
+
+
+def _atanh(z: int, scale: int) -> tuple[int, int]:
+    """atanh(z / scale) * scale and the number of terms, for |z| <= scale / 3. The error is at most 2.2 per term."""
+    if z < 0:
+        total, nterms = _atanh(-z, scale)
+        return -total, nterms
+    z_squared = z * z // scale
+    power = z
+    total = z
+    n = 1
+    while power != 0:
+        power = power * z_squared // scale
+        n += 2
+        total += power // n
+    return total, n // 2 + 1
+
+
+def _ln_fixed(x: int, prec: int) -> tuple[int, int]:
+    """ln(x / 10**prec) scaled by 10**prec, for x > 0, and a bound on the absolute error."""
+    scale = 10**prec
+    # Reduce to m = x / 2**k in [1/sqrt(2), sqrt(2)]. 2**(1/2) ≈ 1.41421 ≈ 99 / 70.
+    k = x.bit_length() - scale.bit_length()
+    m = x >> k if k >= 0 else x << -k
+    while 70 * m > 99 * scale:
+        k += 1
+        m = x >> k if k >= 0 else x << -k
+    while 99 * m < 70 * scale:
+        k -= 1
+        m = x >> k if k >= 0 else x << -k
+
+    z = (m - scale) * scale // (m + scale)
+    series, nterms = _atanh(z, scale)
+
+    extra = len(str(abs(k))) + 1
+    k_ln2 = k * _ln2(prec + extra) // 10**extra
+    return k_ln2 + 2 * series, 5 * nterms + 6
+
+
+def _exp_fixed(x: int, prec: int, x_error: int = 0) -> tuple[int, int]:
+    """exp(x / 10**prec) scaled by 10**prec, and a bound on the absolute error, where x has an absolute error of up to
+    `x_error` itself."""
+    scale = 10**prec
+    # Reduce to r = x - k ln(2) with |r| <= ln(2) / 2.
+    ln2 = _ln2(prec)
+    k = (2 * x + ln2) // (2 * ln2)
+    extra = len(str(abs(k))) + 1
+    r = x - k * _ln2(prec + extra) // 10**extra
+
+    term = scale
+    total = scale
+    n = 0
+    while term != 0:
+        n += 1
+        term = term * r // (scale * n)
+        total += term
+
+    error = 2 * n + 2 * x_error + 8
+    if k >= 0:
+        return total << k, error << k
+    return total >> -k, (error >> -k) + 2
+
+
+def _truncate(n: int, unit: int) -> int:
+    """n / unit, truncated towards 0."""
+    return n // unit if n >= 0 else -(-n // unit)
+
+
+def _round_toward_zero(f, decimals: int) -> int:
+    """Correctly truncated result of the kernel `f(prec) -> (approx, error)`."""
+    margin = INITIAL_GUARD_DIGITS
+    guard = margin
+    while True:
+        approx, error = f(decimals + guard)
+        unit = 10**guard
+        lo = _truncate(approx - error, unit)
+        hi = _truncate(approx + error, unit)
+        if lo == hi:
+            return hi
+        if error * 10**margin < unit:
+            # The error is small, so the result is very close to a multiple of 10**-decimals, which is the end of
+            # the interval further from 0.
+            if margin >= MAX_GUARD_DIGITS:
+                return hi if approx >= 0 else lo
+            margin *= 2
+        # Large results (e.g., exp(100)) have a large absolute error, so we size the guard digits relative to that.
+        guard = len(str(error)) + margin
+
+
+def _check_exp_argument(x: int, decimals: int, max_digits: int):
+    """Raise if exp(x / 10**decimals) scaled by 10**decimals would have more than `max_digits` digits."""
+    if x > 0 and x * _LOG10_E_UPPER > (max_digits - decimals + 1) * 10**decimals:
+        raise decimal.InvalidOperation("exp() result has too many digits")
+
+
+def exp(x: int, decimals: int, max_digits: int) -> int:
+    """exp(x / 10**decimals) scaled by 10**decimals, rounded down."""
+    if x == 0:
+        return 10**decimals
+    _check_exp_argument(x, decimals, max_digits)
+    return _round_toward_zero(
+        lambda prec: _exp_fixed(x * 10 ** (prec - decimals), prec), decimals
+    )
+
+
+def ln(x: int, decimals: int) -> int:
+    """ln(x / 10**decimals) scaled by 10**decimals for x > 0, truncated towards 0."""
+    if x <= 0:
+        raise decimal.InvalidOperation("ln() of non-positive number")
+    if x == 10**decimals:
+        return 0
+    return _round_toward_zero(
+        lambda prec: _ln_fixed(x * 10 ** (prec - decimals), prec), decimals
+    )
+
+
+def pow(x: int, y: int, decimals: int, max_digits: int) -> int:
+    """(x / 10**decimals) ** (y / 10**decimals) scaled by 10**decimals for x >= 0, rounded down."""
+    one = 10**decimals
+    if x < 0:
+        raise decimal.InvalidOperation("pow() of negative number")
+    if y == 0:
+        return one
+    if x == 0:
+        if y < 0:
+            raise decimal.DivisionByZero("pow() of zero with negative exponent")
+        return 0
+    if x == one:
+        return one
+    if y % one == 0 and abs(y) <= MAX_INTEGER_EXPONENT * one:
+        # Exact.
+        n = y // one
+        if n > 0:
+            if (x.bit_length() - one.bit_length() - 1) * n > 3.33 * max_digits:
+                raise decimal.InvalidOperation("pow() result has too many digits")
+            return x**n // one ** (n - 1)
+        return one ** (1 - n) // x**-n
+
+    def kernel(prec: int) -> tuple[int, int]:
+        log_x, log_error = _ln_fixed(x * 10 ** (prec - decimals), prec)
+        arg = log_x * y // one
+        arg_error = (log_error * abs(y) + one - 1) // one + 1
+        _check_exp_argument(
+            (arg - arg_error) // 10 ** (prec - decimals), decimals, max_digits
+        )
+        return _exp_fixed(arg, prec, arg_error)
+
+    return _round_toward_zero(kernel, decimals)
@@ -1,13 +1,36 @@
+from collections import Counter
+from math import isclose
 from operator import add, sub
 from typing import Iterable
 
-import pytest
 from tests.support.quantized_decimal import QuantizedDecimal as D
 
 _MAX_IN_RATIO = D("0.3")
 _MAX_OUT_RATIO = D("0.3")
 
 prec_convergence = D("1E-18")
+prec_proportionality = D("1E-9")
+
+
+class QuadraticValidation:
+    """Switch for the consistency check of b_square against b * b in calculateQuadratic(). It is off by default, so
+    that invariant computations don't pay for two float conversions per call; tests/conftest.py turns it on. `counts`
+    has the number of checks ("checked") and of inconsistent inputs ("mismatches")."""
+
+    def __init__(self, enabled: bool = False, raise_on_mismatch: bool = True):
+        self.enabled = enabled
+        self.raise_on_mismatch = raise_on_mismatch
+        self.counts = Counter()
+
+    def check(self, b: D, b_square: D):
+        self.counts["checked"] += 1
+        # Same tolerances as pytest.approx()
+        if not isclose(float(b * b), float(b_square), rel_tol=1e-6, abs_tol=1e-12):
+            self.counts["mismatches"] += 1
+            assert not self.raise_on_mismatch, "b_square doesn't match b * b"
+
+
+quadratic_validation = QuadraticValidation()
 
 
 def squareRoot(input: D):
@@ -40,7 +63,8 @@ def calculateQuadratic(a: D, b: D, b_square: D, c: D) -> D:
     This function should match _calculateQuadratic in GyroTwoMath.sol in both inputs and outputs
     when a > 0, b < 0, and c < 0
     """
-    assert float(b * b) == pytest.approx(float(b_square))
+    if quadratic_validation.enabled:
+        quadratic_validation.check(b, b_square)
     assert b_square - c * 4 * a >= 0
     numerator = -b + (b_square - c * 4 * a).sqrt()
     denominator = a.mul_up(D(2))
@@ -69,6 +93,45 @@ def liquidityInvariantUpdate_fromscratch(
     return calculateInvariant(map(op, balances, deltaBalances), sqrtAlpha, sqrtBeta)
 
 
+def liquidityInvariantUpdate(
+    balances: Iterable[D],
+    sqrtAlpha: D,
+    sqrtBeta: D,
+    lastInvariant: D,
+    deltaBalances: Iterable[D],
+    isIncreaseLiq: bool,
+) -> D:
+    """Proportional update of the invariant for joins and exits, i.e., when the balances change by the same factor.
+
+    At a fixed price, the real reserves are proportional to L (x = L * (1/sqrt(p) - 1/sqrt(beta)) and
+    y = L * (sqrt(p) - sqrt(alpha))), so dL = L * dx / x = L * dy / y, without a square root, in contrast to
+    liquidityInvariantUpdate_fromscratch(). We use the token whose real reserve is the larger share of its virtual
+    reserve, where the relative rounding error of the delta is smallest.
+
+    The deltas must be proportional to the balances, up to rounding; other deltas would give a wrong invariant. One
+    of the balances may be 0 (the price is at alpha or beta), but not both."""
+    x, y = balances
+    dx, dy = deltaBalances
+    assert x > 0 or y > 0, "empty pool"
+    # dx / x == dy / y, multiplied out. The deltas may be truncated to the last decimal, which changes the products
+    # by up to one ulp times the other balance.
+    ulp = D.from_scaled(1)
+    lhs, rhs = dx * y, dy * x
+    assert abs(lhs - rhs) <= prec_proportionality * max(
+        abs(lhs), abs(rhs)
+    ) + 2 * ulp * (x + y), "deltaBalances are not proportional to balances"
+    # x / (x + L / sqrt(beta)) >= y / (y + L * sqrt(alpha)), multiplied out
+    if x * (y + lastInvariant * sqrtAlpha) >= y * (x + lastInvariant / sqrtBeta):
+        diffInvariant = lastInvariant * dx / x
+    else:
+        diffInvariant = lastInvariant * dy / y
+    return (
+        lastInvariant + diffInvariant
+        if isIncreaseLiq
+        else lastInvariant - diffInvariant
+    )
+
+
 def calcOutGivenIn(
     balanceIn: D, balanceOut: D, amountIn: D, virtualParamIn: D, virtualParamOut: D
 ) -> D:
@@ -0,0 +1,119 @@
+# Sequences of swaps and liquidity updates against the 2CLP model (see math_implementation.py).
+#
+# The pool computes the invariant from the balances, which takes a square root, and derives the virtual parameters
+# from it before every swap. Swaps round in favor of the pool, so the invariant only grows by rounding, and joins and
+# exits change it proportionally (see liquidityInvariantUpdate()). Pool2CLP therefore carries the invariant and the
+# virtual parameters along and only re-derives them from the balances every rederive_interval swaps, if at all.
+
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from tests.support.g2clp.math_implementation import (
+    _MAX_IN_RATIO,
+    _MAX_OUT_RATIO,
+    calcInGivenOut,
+    calcOutGivenIn,
+    calculateInvariant,
+    calculateVirtualParameter0,
+    calculateVirtualParameter1,
+    liquidityInvariantUpdate,
+)
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+
+class Swap(NamedTuple):
+    token_in: int  # 0 or 1
+    amount: D  # paid in if given_in, o/w taken out
+    given_in: bool = True
+
+
+class SwapStep(NamedTuple):
+    swap: Swap
+    ok: bool  # False if the swap exceeded the max in/out ratio and changed nothing
+    amount_in: D
+    amount_out: D
+    balances: Tuple[D, D]  # after the swap
+
+
+@dataclass
+class Pool2CLP:
+    balances: List[D]
+    sqrt_alpha: D
+    sqrt_beta: D
+    invariant: Optional[D] = None  # computed from the balances if None
+    virtual_params: Tuple[D, D] = field(init=False)
+
+    def __post_init__(self):
+        self.balances = list(self.balances)
+        if self.invariant is None:
+            self.invariant = calculateInvariant(
+                self.balances, self.sqrt_alpha, self.sqrt_beta
+            )
+        self._update_virtual_params()
+
+    def _update_virtual_params(self):
+        self.virtual_params = (
+            calculateVirtualParameter0(self.invariant, self.sqrt_beta),
+            calculateVirtualParameter1(self.invariant, self.sqrt_alpha),
+        )
+
+    def rederive(self):
+        """Recompute the invariant from the balances, like the pool does before each swap."""
+        self.invariant = calculateInvariant(
+            self.balances, self.sqrt_alpha, self.sqrt_beta
+        )
+        self._update_virtual_params()
+
+    def swap(self, swap: Swap) -> Optional[Tuple[D, D]]:
+        """(amount in, amount out), or None if the swap exceeds the max in/out ratio."""
+        i, o = swap.token_in, 1 - swap.token_in
+        balance_in, balance_out = self.balances[i], self.balances[o]
+        virtual_in, virtual_out = self.virtual_params[i], self.virtual_params[o]
+        if swap.given_in:
+            if swap.amount > balance_in * _MAX_IN_RATIO:
+                return None
+            amount_in = swap.amount
+            amount_out = calcOutGivenIn(
+                balance_in, balance_out, amount_in, virtual_in, virtual_out
+            )
+        else:
+            if swap.amount > balance_out * _MAX_OUT_RATIO:
+                return None
+            amount_out = swap.amount
+            amount_in = calcInGivenOut(
+                balance_in, balance_out, amount_out, virtual_in, virtual_out
+            )
+        self.balances[i] += amount_in
+        self.balances[o] -= amount_out
+        return amount_in, amount_out
+
+    def update_liquidity(self, delta_balances: Iterable[D], is_increase: bool):
+        """Join (or exit if not is_increase) with balances changing proportionally."""
+        delta_balances = list(delta_balances)
+        self.invariant = liquidityInvariantUpdate(
+            self.balances,
+            self.sqrt_alpha,
+            self.sqrt_beta,
+            self.invariant,
+            delta_balances,
+            is_increase,
+        )
+        sign = 1 if is_increase else -1
+        self.balances = [b + sign * d for b, d in zip(self.balances, delta_balances)]
+        self._update_virtual_params()
+
+
+def simulate_swaps(
+    swaps: Iterable[Swap], pool: Pool2CLP, rederive_interval: Optional[int] = None
+) -> Iterator[SwapStep]:
+    """Apply swaps to pool, which is updated in place. If rederive_interval is set, the invariant is re-derived from
+    the balances every rederive_interval swaps; with rederive_interval=1, this is exactly what the pool does.
+    """
+    for n, swap in enumerate(swaps, 1):
+        if rederive_interval is not None and (n - 1) % rederive_interval == 0:
+            pool.rederive()
+        amounts = pool.swap(swap)
+        amount_in, amount_out = amounts if amounts is not None else (D(0), D(0))
+        yield SwapStep(
+            swap, amounts is not None, amount_in, amount_out, tuple(pool.balances)
+        )
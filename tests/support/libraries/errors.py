@@ -0,0 +1,42 @@
+# Solidity failure modes, for the bit-exact Python versions of our Solidity libraries in this package.
+#
+# - `require(condition, code)` reverts with one of the error codes from `Errors.sol` (see error_codes.py). We raise
+#   `Revert(code)`.
+# - Checked arithmetic that over- or underflows panics. We raise `OverflowError`.
+# - Division by zero panics. We let Python raise `ZeroDivisionError`.
+
+UINT256_MAX = 2**256 - 1
+INT256_MIN = -(2**255)
+INT256_MAX = 2**255 - 1
+
+
+class Revert(Exception):
+    """A revert with an error code. `args[0]` is the code, like in `brownie.reverts(code)`."""
+
+
+def require(condition: bool, code: str):
+    if not condition:
+        raise Revert(code)
+
+
+def checked_uint256(x: int) -> int:
+    if 0 <= x <= UINT256_MAX:
+        return x
+    raise OverflowError("uint256 over- or underflow")
+
+
+def checked_int256(x: int) -> int:
+    if INT256_MIN <= x <= INT256_MAX:
+        return x
+    raise OverflowError("int256 over- or underflow")
+
+
+def sdiv(a: int, b: int) -> int:
+    """Solidity signed division, which rounds towards 0 (unlike Python's `//`)."""
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def smod(a: int, b: int) -> int:
+    """Solidity signed modulo, which has the sign of `a` (unlike Python's `%`)."""
+    return a - b * sdiv(a, b)
@@ -0,0 +1,81 @@
+# Bit-exact Python version of libraries/FixedPoint.sol. Values are ints representing unsigned 18 decimal fixed point
+# numbers (uint256), like in Solidity, and overflows raise like Solidity's checked arithmetic (see errors.py).
+
+from tests.support import error_codes
+from tests.support.libraries import log_exp_math
+from tests.support.libraries.errors import checked_uint256, require
+
+ONE = 10**18
+MAX_POW_RELATIVE_ERROR = 10000  # 10^(-14)
+
+# Minimum base for the power function when the exponent is 'free' (larger than ONE).
+MIN_POW_BASE_FREE_EXPONENT = 7 * 10**17
+
+
+def abs_sub(a: int, b: int) -> int:
+    return a - b if a >= b else b - a
+
+
+def mul_down(a: int, b: int) -> int:
+    return checked_uint256(a * b) // ONE
+
+
+def mul_up(a: int, b: int) -> int:
+    product = checked_uint256(a * b)
+    if product == 0:
+        return 0
+    return (product - 1) // ONE + 1
+
+
+def square_up(a: int) -> int:
+    return mul_up(a, a)
+
+
+def square_down(a: int) -> int:
+    return mul_down(a, a)
+
+
+def div_down(a: int, b: int) -> int:
+    require(b != 0, error_codes.ZERO_DIVISION)
+    if a == 0:
+        return 0
+    return checked_uint256(a * ONE) // b
+
+
+def div_up(a: int, b: int) -> int:
+    require(b != 0, error_codes.ZERO_DIVISION)
+    if a == 0:
+        return 0
+    return (checked_uint256(a * ONE) - 1) // b + 1
+
+
+def pow_down(x: int, y: int) -> int:
+    """x^y, rounding down. The result is guaranteed to not be above the true value."""
+    raw = log_exp_math.pow(x, y)
+    max_error = checked_uint256(mul_up(raw, MAX_POW_RELATIVE_ERROR) + 1)
+    if raw < max_error:
+        return 0
+    return raw - max_error
+
+
+def pow_up(x: int, y: int) -> int:
+    """x^y, rounding up. The result is guaranteed to not be below the true value."""
+    raw = log_exp_math.pow(x, y)
+    max_error = checked_uint256(mul_up(raw, MAX_POW_RELATIVE_ERROR) + 1)
+    return checked_uint256(raw + max_error)
+
+
+def complement(x: int) -> int:
+    """1 - x, capped to 0 if x is larger than 1."""
+    return ONE - x if x < ONE else 0
+
+
+def int_pow_down(base: int, exp: int) -> int:
+    """base^exp where base is a fixed point number and exp is an integer, by repeated squaring."""
+    result = ONE
+    while exp > 0:
+        if exp % 2 == 1:
+            result = mul_down(result, base)
+        exp //= 2
+        base = mul_down(base, base)
+    return result
@@ -0,0 +1,18 @@
+# Bit-exact Python version of libraries/Flow.sol.
+
+from tests.support import error_codes
+from tests.support.libraries.errors import Revert
+from tests.support.libraries.fixed_point import int_pow_down, mul_down
+
+
+def update_flow(
+    flow_history: int, current_block: int, last_seen_block: int, memory_param: int
+) -> int:
+    """Exponential moving sum of the flow, decayed by `memory_param` per block since `last_seen_block`."""
+    if last_seen_block == current_block or flow_history == 0:
+        return flow_history
+    if last_seen_block < current_block:
+        block_difference = current_block - last_seen_block
+        memory_param_raised = int_pow_down(memory_param, block_difference)
+        return mul_down(flow_history, memory_param_raised)
+    raise Revert(error_codes.INVALID_ARGUMENT)
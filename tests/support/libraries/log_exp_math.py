@@ -0,0 +1,199 @@
+# Bit-exact Python version of libraries/LogExpMath.sol. All arguments and return values are ints representing 18
+# decimal fixed point numbers, like in Solidity. See the Solidity code for an explanation of the algorithms.
+
+from tests.support import error_codes
+from tests.support.libraries.errors import require, sdiv, smod
+
+ONE_18 = 10**18
+ONE_20 = 10**20
+ONE_36 = 10**36
+
+MAX_NATURAL_EXPONENT = 130 * 10**18
+MIN_NATURAL_EXPONENT = -41 * 10**18
+
+LN_36_LOWER_BOUND = ONE_18 - 10**17
+LN_36_UPPER_BOUND = ONE_18 + 10**17
+
+MILD_EXPONENT_BOUND = 2**254 // ONE_20
+
+# 18 decimal constants. a0 and a1 have no decimals.
+x0 = 128000000000000000000  # 2ˆ7
+a0 = 38877084059945950922200000000000000000000000000000000000  # eˆ(x0)
+x1 = 64000000000000000000  # 2ˆ6
+a1 = 6235149080811616882910000000  # eˆ(x1)
+
+# 20 decimal constants
+x2 = 3200000000000000000000  # 2ˆ5
+a2 = 7896296018268069516100000000000000  # eˆ(x2)
+x3 = 1600000000000000000000  # 2ˆ4
+a3 = 888611052050787263676000000  # eˆ(x3)
+x4 = 800000000000000000000  # 2ˆ3
+a4 = 298095798704172827474000  # eˆ(x4)
+x5 = 400000000000000000000  # 2ˆ2
+a5 = 5459815003314423907810  # eˆ(x5)
+x6 = 200000000000000000000  # 2ˆ1
+a6 = 738905609893065022723  # eˆ(x6)
+x7 = 100000000000000000000  # 2ˆ0
+a7 = 271828182845904523536  # eˆ(x7)
+x8 = 50000000000000000000  # 2ˆ-1
+a8 = 164872127070012814685  # eˆ(x8)
+x9 = 25000000000000000000  # 2ˆ-2
+a9 = 128402541668774148407  # eˆ(x9)
+x10 = 12500000000000000000  # 2ˆ-3
+a10 = 113314845306682631683  # eˆ(x10)
+x11 = 6250000000000000000  # 2ˆ-4
+a11 = 106449445891785942956  # eˆ(x11)
+
+# (x_n, a_n) pairs for the 20 decimal part of the decompositions in exp() and _ln().
+_EXP_TERMS = [
+    (x2, a2),
+    (x3, a3),
+    (x4, a4),
+    (x5, a5),
+    (x6, a6),
+    (x7, a7),
+    (x8, a8),
+    (x9, a9),
+]
+_LN_TERMS = _EXP_TERMS + [(x10, a10), (x11, a11)]
+
+
+def pow(x: int, y: int) -> int:
+    """x^y with unsigned 18 decimal fixed point base and exponent."""
+    if y == 0:
+        # We solve the 0^0 indetermination by making it equal one.
+        return ONE_18
+    if x == 0:
+        return 0
+
+    require(x < 2**255, error_codes.X_OUT_OF_BOUNDS)
+    require(y < MILD_EXPONENT_BOUND, error_codes.Y_OUT_OF_BOUNDS)
+
+    if LN_36_LOWER_BOUND < x < LN_36_UPPER_BOUND:
+        ln_36_x = _ln_36(x)
+        logx_times_y = sdiv(ln_36_x, ONE_18) * y + sdiv(
+            smod(ln_36_x, ONE_18) * y, ONE_18
+        )
+    else:
+        logx_times_y = _ln(x) * y
+    logx_times_y = sdiv(logx_times_y, ONE_18)
+
+    require(
+        MIN_NATURAL_EXPONENT <= logx_times_y <= MAX_NATURAL_EXPONENT,
+        error_codes.PRODUCT_OUT_OF_BOUNDS,
+    )
+    return exp(logx_times_y)
+
+
+def exp(x: int) -> int:
+    """e^x with signed 18 decimal fixed point exponent."""
+    require(
+        MIN_NATURAL_EXPONENT <= x <= MAX_NATURAL_EXPONENT, error_codes.INVALID_EXPONENT
+    )
+    if x < 0:
+        # Both operands are positive here, so `//` is Solidity's division.
+        return (ONE_18 * ONE_18) // exp(-x)
+
+    if x >= x0:
+        x -= x0
+        first_an = a0
+    elif x >= x1:
+        x -= x1
+        first_an = a1
+    else:
+        first_an = 1
+
+    x *= 100
+
+    product = ONE_20
+    for xn, an in _EXP_TERMS:
+        if x >= xn:
+            x -= xn
+            product = product * an // ONE_20
+
+    # Taylor series for the remainder, 12 terms. x >= 0 here, so all values are non-negative.
+    series_sum = ONE_20
+    term = x
+    series_sum += term
+    for n in range(2, 13):
+        term = term * x // ONE_20 // n
+        series_sum += term
+
+    return product * series_sum // ONE_20 * first_an // 100
+
+
+def log(arg: int, base: int) -> int:
+    """log_base(arg) with signed 18 decimal fixed point base and argument."""
+    if LN_36_LOWER_BOUND < base < LN_36_UPPER_BOUND:
+        log_base = _ln_36(base)
+    else:
+        log_base = _ln(base) * ONE_18
+
+    if LN_36_LOWER_BOUND < arg < LN_36_UPPER_BOUND:
+        log_arg = _ln_36(arg)
+    else:
+        log_arg = _ln(arg) * ONE_18
+
+    return sdiv(log_arg * ONE_18, log_base)
+
+
+def ln(a: int) -> int:
+    """Natural logarithm with signed 18 decimal fixed point argument."""
+    require(a > 0, error_codes.OUT_OF_BOUNDS)
+    if LN_36_LOWER_BOUND < a < LN_36_UPPER_BOUND:
+        return sdiv(_ln_36(a), ONE_18)
+    return _ln(a)
+
+
+def _ln(a: int) -> int:
+    if a < ONE_18:
+        return -_ln(sdiv(ONE_18 * ONE_18, a))
+
+    # a >= 1 from here on, so all values are non-negative.
+    sum_xn = 0
+    if a >= a0 * ONE_18:
+        a //= a0
+        sum_xn += x0
+    if a >= a1 * ONE_18:
+        a //= a1
+        sum_xn += x1
+
+    sum_xn *= 100
+    a *= 100
+
+    for xn, an in _LN_TERMS:
+        if a >= an:
+            a = a * ONE_20 // an
+            sum_xn += xn
+
+    # Taylor series for the remainder, 6 terms.
+    z = (a - ONE_20) * ONE_20 // (a + ONE_20)
+    z_squared = z * z // ONE_20
+    num = z
+    series_sum = num
+    for n in range(3, 12, 2):
+        num = num * z_squared // ONE_20
+        series_sum += num // n
+    series_sum *= 2
+
+    return (sum_xn + series_sum) // 100
+
+
+def _ln_36(x: int) -> int:
+    """ln(x) with 36 decimals, for x between LN_36_LOWER_BOUND and LN_36_UPPER_BOUND."""
+    x *= ONE_18
+
+    # z, and therefore all terms, are negative for x < 1, so we need Solidity's rounding towards 0 here.
+    z = sdiv((x - ONE_36) * ONE_36, x + ONE_36)
+    z_squared = z * z // ONE_36
+    num = z
+    series_sum = num
+    for n in range(3, 16, 2):
+        num = sdiv(num * z_squared, ONE_36)
+        series_sum += sdiv(num, n)
+
+    return series_sum * 2
+
+
+def sqrt(x: int) -> int:
+    return pow(x, ONE_18 // 2)
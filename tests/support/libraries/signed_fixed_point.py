@@ -0,0 +1,58 @@
+# Bit-exact Python version of libraries/SignedFixedPoint.sol. Values are ints representing signed 18 decimal fixed
+# point numbers (int256), like in Solidity, and overflows raise like Solidity's checked arithmetic (see errors.py).
+#
+# Note: The `{mul,div}_{up,down}_mag()` functions do *not* round up or down, respectively, in a signed fashion (like
+# ceil and floor operations), but *in absolute value* or in *magnitude*, i.e., towards 0.
+
+from tests.support import error_codes
+from tests.support.libraries.errors import checked_int256, require, sdiv
+
+ONE = 10**18
+MAX_POW_RELATIVE_ERROR = 10000  # 10^(-14)
+
+# Minimum base for the power function when the exponent is 'free' (larger than ONE).
+MIN_POW_BASE_FREE_EXPONENT = 7 * 10**17
+
+
+def mul_down_mag(a: int, b: int) -> int:
+    """This rounds towards 0, i.e., down *in absolute value*!"""
+    return sdiv(checked_int256(a * b), ONE)
+
+
+def mul_up_mag(a: int, b: int) -> int:
+    """This rounds away from 0, i.e., up *in absolute value*!"""
+    product = checked_int256(a * b)
+    if product > 0:
+        return (product - 1) // ONE + 1
+    if product < 0:
+        return sdiv(product + 1, ONE) - 1
+    return 0
+
+
+def div_down_mag(a: int, b: int) -> int:
+    """Rounds towards 0, i.e., down in absolute value."""
+    require(b != 0, error_codes.ZERO_DIVISION)
+    if a == 0:
+        return 0
+    return sdiv(checked_int256(a * ONE), b)
+
+
+def div_up_mag(a: int, b: int) -> int:
+    """Rounds away from 0, i.e., up in absolute value."""
+    require(b != 0, error_codes.ZERO_DIVISION)
+    if b < 0:
+        b = checked_int256(-b)
+        a = checked_int256(-a)
+    if a == 0:
+        return 0
+    a_inflated = checked_int256(a * ONE)
+    if a_inflated > 0:
+        return (a_inflated - 1) // b + 1
+    return sdiv(a_inflated + 1, b) - 1
+
+
+def complement(x: int) -> int:
+    """1 - x, capped to 0 if x is larger than 1 (or negative)."""
+    if x >= ONE or x <= 0:
+        return 0
+    return ONE - x
@@ -1,10 +1,13 @@
 from dataclasses import dataclass
 from enum import Enum
-from functools import cached_property
-from typing import Optional, Tuple, Union
+from functools import cached_property, lru_cache
+from typing import Iterable, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
 
 from tests.support.dfuzzy import isge, isle, prec_input, sqrt
 from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_decimal_array import QuantizedDecimalArray as DA
 
 
 class Region(Enum):
@@ -52,85 +55,134 @@ _pieces2region_rules = [
 ]
 
 
+@dataclass(frozen=True)
+class DerivedParams:
+    """Values that only depend on the Params, like `PrimaryAMMV1.createDerivedParams()`."""
+
+    target_utilization_ceiling: D
+    ba_threshold_region_I: D  # b_a^{I/II}
+    ba_threshold_region_II: D  # b_a^{II/III}
+    xl_threshold_at_threshold_I: D  # x_L^{I/II}
+    xl_threshold_at_threshold_II: D  # x_L^{II/III}
+    ba_threshold_II_hl: D  # ba^{h/l}
+    xu_threshold_II_hl: D  # x_U^{h/l}
+    xl_threshold_II_hl: D  # x_L^{h/l}
+    ba_threshold_III_hl: D  # ba^{H/L}
+    slope_threshold_III_HL: D  # α^{H/L}
+    xl_threshold_III_HL: D  # x_L^{H/L}
+
+
 @dataclass
 class Params:
-    decay_slope_lower_bound: D = D("0.6")  # ᾱ
+    decay_slope_lower_bound: D = D("0.6")  # ᾱ
     stable_redeem_threshold_upper_bound: D = D("0.3")  # x̄_U
     target_reserve_ratio_floor: D = D("0.6")  # θ̄
 
     @cached_property
+    def derived(self) -> DerivedParams:
+        return compute_derived_params(
+            self.decay_slope_lower_bound,
+            self.stable_redeem_threshold_upper_bound,
+            self.target_reserve_ratio_floor,
+        )
+
+    @property
     def target_utilization_ceiling(self):
-        return 1 - self.target_reserve_ratio_floor
+        return self.derived.target_utilization_ceiling
 
-    @cached_property
+    @property
     def ba_threshold_region_I(self):  # b_a^{I/II}
-        return compute_relative_reserve_for_xu(
-            self.stable_redeem_threshold_upper_bound, D(1), self
-        )
+        return self.derived.ba_threshold_region_I
 
-    @cached_property
+    @property
     def ba_threshold_region_II(self):  # b_a^{II/III}
-        return compute_relative_reserve_for_xu(D(0), D(1), self)
+        return self.derived.ba_threshold_region_II
 
-    @cached_property
+    @property
     def xl_threshold_at_threshold_I(self):  # x_L^{I/II}
-        ba = self.ba_threshold_region_I
-        xu = self.stable_redeem_threshold_upper_bound
-        alpha = self.decay_slope_lower_bound
-        return compute_lower_redemption_threshold(ba, D(1), alpha, xu)
+        return self.derived.xl_threshold_at_threshold_I
 
-    @cached_property
+    @property
     def xl_threshold_at_threshold_II(self):  # x_L^{II/III}
-        ba = self.ba_threshold_region_II
-        xu = D(0)
-        alpha = self.decay_slope_lower_bound
-        return compute_lower_redemption_threshold(ba, D(1), alpha, xu)
+        return self.derived.xl_threshold_at_threshold_II
 
-    @cached_property
+    @property
     def ba_threshold_II_hl(self):  # ba^{h/l}
-        denom = 2 * self.decay_slope_lower_bound
-        num = self.target_utilization_ceiling**2
-        return D(1) - num / denom  # type: ignore
+        return self.derived.ba_threshold_II_hl
 
-    @cached_property
+    @property
     def xu_threshold_II_hl(self):  # x_U^{h/l}
-        ba = self.ba_threshold_II_hl
-        alpha = self.decay_slope_lower_bound
-        return compute_upper_redemption_threshold(
-            ba,
-            D(1),
-            alpha,
-            self.stable_redeem_threshold_upper_bound,
-            self.target_utilization_ceiling,
-        )
+        return self.derived.xu_threshold_II_hl
 
-    @cached_property
+    @property
     def xl_threshold_II_hl(self):  # x_L^{h/l}
-        # TODO check if we can just replace this by D(1)
-        return compute_lower_redemption_threshold(
-            self.ba_threshold_II_hl,
-            D(1),
-            self.decay_slope_lower_bound,
-            self.xu_threshold_II_hl,
-        )
+        return self.derived.xl_threshold_II_hl
 
-    @cached_property
+    @property
     def ba_threshold_III_hl(self):  # ba^{H/L}
-        return (D(1) + self.target_reserve_ratio_floor) / 2
+        return self.derived.ba_threshold_III_hl
 
-    @cached_property
+    @property
     def slope_threshold_III_HL(self):  # α^{H/L}
-        ba = self.ba_threshold_III_hl
-        return compute_slope(
-            ba, D(1), self.target_reserve_ratio_floor, self.decay_slope_lower_bound
-        )
+        return self.derived.slope_threshold_III_HL
 
-    @cached_property
+    @property
     def xl_threshold_III_HL(self):  # x_L^{H/L}
-        # TODO check if we can just replace this by D(1)
-        return compute_lower_redemption_threshold(
-            self.ba_threshold_III_hl, D(1), self.slope_threshold_III_HL, D(0)
-        )
+        return self.derived.xl_threshold_III_HL
+
+
+# Number of parameter sets whose derived params we keep. Sweeps and hypothesis runs revisit the same ones a lot.
+DERIVED_PARAMS_CACHE_SIZE = 1024
+
+
+# typed=True so that the same values at different precisions (e.g., D and D[38]) are different entries.
+@lru_cache(maxsize=DERIVED_PARAMS_CACHE_SIZE, typed=True)
+def compute_derived_params(alpha_bar: D, xu_bar: D, theta_bar: D) -> DerivedParams:
+    """Derived params for Params(alpha_bar, xu_bar, theta_bar), shared by all instances with these values. Use
+    `compute_derived_params.cache_info()` for the number of hits and misses."""
+    params = Params(alpha_bar, xu_bar, theta_bar)
+    theta = 1 - theta_bar
+
+    ba_threshold_region_I = compute_relative_reserve_for_xu(xu_bar, D(1), params)
+    ba_threshold_region_II = compute_relative_reserve_for_xu(D(0), D(1), params)
+    xl_threshold_at_threshold_I = compute_lower_redemption_threshold(
+        ba_threshold_region_I, D(1), alpha_bar, xu_bar
+    )
+    xl_threshold_at_threshold_II = compute_lower_redemption_threshold(
+        ba_threshold_region_II, D(1), alpha_bar, D(0)
+    )
+
+    ba_threshold_II_hl = D(1) - theta.mul_div_down(theta, 2 * alpha_bar)
+    xu_threshold_II_hl = compute_upper_redemption_threshold(
+        ba_threshold_II_hl, D(1), alpha_bar, xu_bar, theta
+    )
+    # TODO check if we can just replace this by D(1)
+    xl_threshold_II_hl = compute_lower_redemption_threshold(
+        ba_threshold_II_hl, D(1), alpha_bar, xu_threshold_II_hl
+    )
+
+    ba_threshold_III_hl = (D(1) + theta_bar) / 2
+    slope_threshold_III_HL = compute_slope(
+        ba_threshold_III_hl, D(1), theta_bar, alpha_bar
+    )
+    # TODO check if we can just replace this by D(1)
+    xl_threshold_III_HL = compute_lower_redemption_threshold(
+        ba_threshold_III_hl, D(1), slope_threshold_III_HL, D(0)
+    )
+
+    return DerivedParams(
+        target_utilization_ceiling=theta,
+        ba_threshold_region_I=ba_threshold_region_I,
+        ba_threshold_region_II=ba_threshold_region_II,
+        xl_threshold_at_threshold_I=xl_threshold_at_threshold_I,
+        xl_threshold_at_threshold_II=xl_threshold_at_threshold_II,
+        ba_threshold_II_hl=ba_threshold_II_hl,
+        xu_threshold_II_hl=xu_threshold_II_hl,
+        xl_threshold_II_hl=xl_threshold_II_hl,
+        ba_threshold_III_hl=ba_threshold_III_hl,
+        slope_threshold_III_HL=slope_threshold_III_HL,
+        xl_threshold_III_HL=xl_threshold_III_HL,
+    )
 
 
 def compute_relative_reserve_for_xu(
@@ -143,8 +195,8 @@ def compute_relative_reserve_for_xu(
     yz = ya - xu
     target_usage = 1 - params.target_reserve_ratio_floor
     if 1 - alpha * yz >= params.target_reserve_ratio_floor:
-        return ya - alpha / 2 * yz**2
-    return ya - target_usage * yz + target_usage**2 / (2 * alpha)
+        return ya - alpha.mul_div_down(yz**2, 2)
+    return ya - target_usage * yz + target_usage.mul_div_down(target_usage, 2 * alpha)
 
 
 def compute_lower_redemption_threshold(ba: D, ya: D, alpha: D, xu: D):
@@ -180,7 +232,7 @@ def compute_slope_unconstrained(ba: D, ya: D, theta_bar: D) -> D:
         return 2 * (1 - ra) / ya
     else:
         # TODO Highway to the rounding error danger zone if ba/ya ≈ theta_floor
-        return theta**2 / (2 * (ba - theta_bar * ya))
+        return theta.mul_div_down(theta, 2 * (ba - theta_bar * ya))
 
 
 def compute_slope(ba: D, ya: D, theta_bar: D, alpha_bar: D) -> D:
@@ -199,12 +251,33 @@ def compute_fixed_reserve(x: D, ba: D, ya: D, alpha: D, xu: D, xl: D) -> D:
     return rl * (ya - x)
 
 
-def compute_reserve(x: D, ba: D, ya: D, params: Params) -> D:
-    if ba / ya > 1:
-        return ba - x
-    if ba / ya <= params.target_reserve_ratio_floor:
-        return ba - ba / ya * x
+def _piecewise(x: DA, xu: D, xl: D, lower, middle, upper) -> DA:
+    """Evaluate the functions `lower`, `middle` and `upper` on the elements of x with x <= xu, xu < x <= xl and
+    x > xl, respectively."""
+    in_lower = x <= xu
+    in_middle = ~in_lower & (x <= xl)
+    in_upper = ~(in_lower | in_middle)
+    scaled = np.empty(x.shape, dtype=object)
+    for mask, f in [(in_lower, lower), (in_middle, middle), (in_upper, upper)]:
+        if mask.any():
+            scaled[mask] = f(x[mask]).scaled
+    return type(x).from_scaled(scaled)
+
+
+def compute_fixed_reserves(x: DA, ba: D, ya: D, alpha: D, xu: D, xl: D) -> DA:
+    """compute_fixed_reserve() for an array of redemption levels x."""
+    half_alpha = alpha / 2
+    rl = 1 - alpha * (xl - xu)
 
+    def middle(x: DA) -> DA:
+        d = x - xu
+        return -x + ba + d * d * half_alpha
+
+    return _piecewise(x, xu, xl, lambda x: -x + ba, middle, lambda x: (-x + ya) * rl)
+
+
+def compute_curve_parameters(ba: D, ya: D, params: Params) -> Tuple[D, D, D]:
+    """Slope alpha and redemption thresholds xu, xl of the reserve curve with anchor point (ba, ya)."""
     alpha = compute_slope(
         ba,
         ya,
@@ -219,6 +292,16 @@ def compute_reserve(x: D, ba: D, ya: D, params: Params) -> D:
         params.target_utilization_ceiling,
     )
     xl = compute_lower_redemption_threshold(ba, ya, alpha, xu)
+    return alpha, xu, xl
+
+
+def compute_reserve(x: D, ba: D, ya: D, params: Params) -> D:
+    if ba / ya > 1:
+        return ba - x
+    if ba / ya <= params.target_reserve_ratio_floor:
+        return ba - ba / ya * x
+
+    alpha, xu, xl = compute_curve_parameters(ba, ya, params)
     return compute_fixed_reserve(x, ba, ya, alpha, xu, xl)
 
 
@@ -298,17 +381,7 @@ def compute_price(x: D, ba: D, ya: D, params: Params) -> D:
     if ba <= ya * params.target_reserve_ratio_floor:
         return ba / ya
 
-    alpha = compute_slope(
-        ba, ya, params.target_reserve_ratio_floor, params.decay_slope_lower_bound
-    )
-    xu = compute_upper_redemption_threshold(
-        ba,
-        ya,
-        alpha,
-        params.stable_redeem_threshold_upper_bound,
-        params.target_utilization_ceiling,
-    )
-    xl = compute_lower_redemption_threshold(ba, ya, alpha, xu)
+    alpha, xu, xl = compute_curve_parameters(ba, ya, params)
     if x <= xu:
         return D(1)
     elif x <= xl:
@@ -317,12 +390,173 @@ def compute_price(x: D, ba: D, ya: D, params: Params) -> D:
         return D(1) - alpha * (xl - xu)
 
 
+@dataclass
+class RedemptionCurve:
+    """Redemption amounts and marginal prices of a fixed Pamm state as functions of the redeemed amount.
+
+    Everything that only depends on the state (the anchor point and the curve parameters) is computed once; the
+    amounts are then evaluated as a QuantizedDecimalArray. Each result is exactly that of the corresponding scalar
+    function, i.e., `Pamm.compute_redeem_amount()` and `compute_price()` at the redemption level after redeeming.
+    """
+
+    params: Params
+    reserve_value: D
+    redemption_level: D
+    total_gyro_supply: D
+    # Price of all redemptions if the reserve ratio is >= 1 or at most the floor. In these cases, there is no anchor.
+    fixed_price: Optional[D] = None
+    ba: Optional[D] = None
+    ya: Optional[D] = None
+
+    @cached_property
+    def curve_parameters(self) -> Tuple[D, D, D]:  # alpha, xu, xl
+        return compute_curve_parameters(self.ba, self.ya, self.params)
+
+    def _piecewise(self, x: DA, lower, middle, upper) -> DA:
+        _, xu, xl = self.curve_parameters
+        return _piecewise(x, xu, xl, lower, middle, upper)
+
+    def compute_reserves(self, x: DA) -> DA:
+        """compute_reserve() for an array of redemption levels x."""
+        ba, ya = self.ba, self.ya
+        if ba / ya > 1:
+            return -x + ba
+        if ba / ya <= self.params.target_reserve_ratio_floor:
+            return -(x * (ba / ya)) + ba
+
+        return compute_fixed_reserves(x, ba, ya, *self.curve_parameters)
+
+    def compute_redeem_amounts(self, amounts: Union[DA, Iterable]) -> DA:
+        amounts = DA(amounts)
+        if self.fixed_price is not None:
+            return amounts * self.fixed_price
+        next_reserves = self.compute_reserves(amounts + self.redemption_level)
+        return -next_reserves + self.reserve_value
+
+    def compute_prices(self, amounts: Union[DA, Iterable]) -> DA:
+        """Marginal redemption prices after redeeming each of the amounts."""
+        amounts = DA(amounts)
+        if self.fixed_price is not None:
+            return DA.full(amounts.shape, self.fixed_price)
+        ba, ya = self.ba, self.ya
+        if ba >= ya:
+            return DA.full(amounts.shape, 1)
+        if ba <= ya * self.params.target_reserve_ratio_floor:
+            return DA.full(amounts.shape, ba / ya)
+
+        alpha, xu, xl = self.curve_parameters
+        lowest_price = 1 - alpha * (xl - xu)
+        return self._piecewise(
+            amounts + self.redemption_level,
+            lambda x: DA.full(x.shape, 1),
+            lambda x: -((x - xu) * alpha) + 1,
+            lambda x: DA.full(x.shape, lowest_price),
+        )
+
+    def compute_amount(self, redeem_amount: D) -> D:
+        """Inverse of the redeem amount: the GYD amount that has to be redeemed to receive `redeem_amount`.
+
+        This solves for the redemption level at which the reserve has decreased by `redeem_amount` in closed form,
+        using that the reserve is linear or quadratic in it within each region of the curve. Only if that puts the
+        solution on the wrong side of a region boundary (which can happen by rounding close to it), we bisect.
+        """
+        if self.fixed_price is not None:
+            amount = redeem_amount / self.fixed_price
+        else:
+            amount = self._solve_reserve(self.reserve_value - redeem_amount)
+            amount -= self.redemption_level
+        if not D(0) <= amount <= self.total_gyro_supply:
+            raise ValueError("redeem amount out of range")
+        return amount
+
+    def _solve_reserve(self, b: D) -> D:
+        """Redemption level x with compute_reserve(x, ba, ya) = b, for the non-fixed-price case."""
+        ba, ya = self.ba, self.ya
+        if ba / ya > 1:
+            return ba - b
+        if ba / ya <= self.params.target_reserve_ratio_floor:
+            return (ba - b) / (ba / ya)
+
+        alpha, xu, xl = self.curve_parameters
+        if b >= ba - xu:
+            return ba - b
+        if b > compute_fixed_reserve(xl, ba, ya, alpha, xu, xl):
+            # b = ba - x + alpha / 2 (x - xu)^2. We want the smaller root d = x - xu, in the numerically stable form.
+            # Like compute_fixed_reserve(), we use alpha / 2 rounded.
+            c = ba - xu - b
+            discriminant = 1 - 4 * (alpha / 2) * c
+            if discriminant >= 0:
+                x = xu + 2 * c / (1 + discriminant.sqrt())
+                if xu <= x <= xl:
+                    return x
+            return self._bisect_reserve(b, xu, xl)
+        rl = 1 - alpha * (xl - xu)
+        x = ya - b / rl
+        if x >= xl:
+            return x
+        return self._bisect_reserve(b, xu, ya)
+
+    def _bisect_reserve(self, b: D, lo: D, hi: D) -> D:
+        """Smallest x in [lo, hi] (up to the last decimal) with compute_reserve(x) <= b. The reserve is decreasing in x."""
+        while hi - lo > D.from_scaled(1):
+            mid = (lo + hi) / 2
+            if compute_reserve(mid, self.ba, self.ya, self.params) <= b:
+                hi = mid
+            else:
+                lo = mid
+        return hi
+
+
+def compute_redemption_curves(
+    curves: Iterable[RedemptionCurve], amounts: Union[DA, Iterable]
+) -> Tuple[DA, DA]:
+    """Redeem amounts and marginal prices for several states. Element [i, j] of each is for curves[i] and
+    amounts[j]."""
+    amounts = DA(amounts)
+    redeem_amounts, prices = [], []
+    for curve in curves:
+        redeem_amounts.append(curve.compute_redeem_amounts(amounts).scaled)
+        prices.append(curve.compute_prices(amounts).scaled)
+    shape = (len(redeem_amounts),) + amounts.shape
+    return (
+        DA.from_scaled(np.array(redeem_amounts, dtype=object).reshape(shape)),
+        DA.from_scaled(np.array(prices, dtype=object).reshape(shape)),
+    )
+
+
+class AnchorCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    # Of the curve parameters (alpha, xu, xl) of the anchor, which are cached with it
+    curve_hits: int = 0
+    curve_misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
 class Pamm:
-    def __init__(self, params: Params):
+    def __init__(self, params: Params, incremental: bool = False):
+        """If `incremental`, redeem() keeps the anchor of the state before the redemption instead of reconstructing
+        it from the new state. This is valid because a redemption moves the state along its redemption curve: ya is
+        unchanged and so is ba, up to the rounding of the reconstruction. Other state changes (update_state() or
+        assigning the attributes) always reconstruct it."""
         self.params = params
+        self.incremental = incremental
         self.redemption_level = D(0)
         self.total_gyro_supply = D(0)
         self.reserve_value = D(0)
+        # State, as in _state(), for which _anchor was computed, its normalized anchor reserve value and the curve
+        # parameters (alpha, xu, xl) of the anchor, if computed yet.
+        self._anchor_state: Optional[Tuple[D, ...]] = None
+        self._anchor: Optional[D] = None
+        self._curve_parameters: Optional[Tuple[D, D, D]] = None
+        self._anchor_hits = 0
+        self._anchor_misses = 0
+        self._curve_hits = 0
+        self._curve_misses = 0
 
     def _is_in_first_region(self, scaled_reserve: D, scaled_redemption: D) -> bool:
         return scaled_reserve >= compute_fixed_reserve(
@@ -385,18 +619,90 @@ class Pamm:
             return reserve_ratio * amount
 
         ya = self.total_gyro_supply + self.redemption_level
-        ba_normalized = self._compute_normalized_anchor_reserve_value()
+        ba_normalized = self._get_normalized_anchor_reserve_value()
         ba = ba_normalized * ya
 
-        # todo maybe use the computed region information to avoid some of the calculations in `compute_reserve()`.
-        # We can use info regarding case I-III and H/L because they don't depend on x.
-        # (We can't use info on i-iii because they depend on x)
-        # Not clear to me how much benefit this brings
-        next_reserve_value = compute_reserve(
-            self.redemption_level + amount, ba, ya, self.params
-        )
+        # Like compute_reserve(), but with the curve parameters cached with the anchor. These only depend on (ba, ya)
+        # and take two square roots, which is most of the time of a quote at a known anchor.
+        x = self.redemption_level + amount
+        if ba / ya > 1:
+            next_reserve_value = ba - x
+        elif ba / ya <= self.params.target_reserve_ratio_floor:
+            next_reserve_value = ba - ba / ya * x
+        else:
+            alpha, xu, xl = self._get_curve_parameters(ba, ya)
+            next_reserve_value = compute_fixed_reserve(x, ba, ya, alpha, xu, xl)
         return self.reserve_value - next_reserve_value
 
+    def redemption_curve(self) -> RedemptionCurve:
+        """The redemption curve of the current state, to evaluate many redemption amounts at once."""
+        reserve_ratio = self.reserve_value / self.total_gyro_supply
+        curve = RedemptionCurve(
+            self.params,
+            self.reserve_value,
+            self.redemption_level,
+            self.total_gyro_supply,
+        )
+        if reserve_ratio >= 1:
+            curve.fixed_price = D(1)
+        elif isle(reserve_ratio, self.params.target_reserve_ratio_floor, prec_input):
+            curve.fixed_price = reserve_ratio
+        else:
+            curve.ya = self.total_gyro_supply + self.redemption_level
+            curve.ba = self._get_normalized_anchor_reserve_value() * curve.ya
+            if curve.params.target_reserve_ratio_floor < curve.ba / curve.ya <= 1:
+                curve.curve_parameters = self._get_curve_parameters(curve.ba, curve.ya)
+        return curve
+
+    def compute_amount_to_redeem(self, redeem_amount: D) -> D:
+        """GYD amount to redeem to receive `redeem_amount`, i.e., the inverse of `compute_redeem_amount()`."""
+        return self.redemption_curve().compute_amount(redeem_amount)
+
+    def _state(self) -> Tuple[D, ...]:
+        """Everything the anchor depends on: the state and the values of the params, which may be reassigned or
+        changed in place."""
+        return (
+            self.redemption_level,
+            self.reserve_value,
+            self.total_gyro_supply,
+            self.params.decay_slope_lower_bound,
+            self.params.stable_redeem_threshold_upper_bound,
+            self.params.target_reserve_ratio_floor,
+        )
+
+    def _get_normalized_anchor_reserve_value(self) -> D:
+        """_compute_normalized_anchor_reserve_value(), cached until the state or the params change. Repeated quotes
+        at the same state, like a quote followed by the redemption, reuse it."""
+        state = self._state()
+        if self._anchor_state == state:
+            self._anchor_hits += 1
+            return self._anchor
+        self._anchor_misses += 1
+        self._anchor = self._compute_normalized_anchor_reserve_value()
+        self._anchor_state = state
+        self._curve_parameters = None
+        return self._anchor
+
+    def _get_curve_parameters(self, ba: D, ya: D) -> Tuple[D, D, D]:
+        """compute_curve_parameters() of the anchor (ba, ya) from _get_normalized_anchor_reserve_value(), cached
+        with it."""
+        if self._curve_parameters is not None:
+            self._curve_hits += 1
+            return self._curve_parameters
+        self._curve_misses += 1
+        self._curve_parameters = compute_curve_parameters(ba, ya, self.params)
+        return self._curve_parameters
+
+    def anchor_cache_info(self) -> AnchorCacheInfo:
+        """Hits and misses of the anchor cache and of the curve parameters cached with it, like
+        `functools.lru_cache`'s cache_info()."""
+        return AnchorCacheInfo(
+            self._anchor_hits,
+            self._anchor_misses,
+            self._curve_hits,
+            self._curve_misses,
+        )
+
     def _compute_normalized_anchor_reserve_value(self) -> D:
         """Assume that the reserve ratio b/y is in the open inverval (theta_floor, 1) (incl. a margin for errors).
         These edge cases are handled by `_compute_redeem_amount()`"""
@@ -428,31 +734,30 @@ class Pamm:
             return (
                 scaled_reserve
                 + scaled_redemption
-                - alpha_min * (scaled_redemption - xu_max) ** 2 / 2
+                - alpha_min.mul_div_down((scaled_redemption - xu_max) ** 2, 2)
             )
 
         if region == Region.CASE_I_iii:
             lh = one - (one - xu_max) * used_ratio  # type: ignore
-            return lh + used_ratio**2 / (2 * alpha_min)
+            return lh + used_ratio.mul_div_down(used_ratio, 2 * alpha_min)
 
         if region == Region.CASE_II_H:
-            delta = alpha_min * (used_ratio / alpha_min + scaled_supply / 2) ** 2 / 2
+            delta = alpha_min.mul_div_down(
+                (used_ratio / alpha_min + scaled_supply / 2) ** 2, 2
+            )
             return one - delta
 
         if region == Region.CASE_II_L:
             p = theta * (theta / (2 * alpha_min) + scaled_supply)
-            d = (
-                theta**2
-                * 2
-                / alpha_min
+            d = 2 * (
+                theta.mul_div_down(theta, alpha_min)
                 * (scaled_reserve - theta_floor * scaled_supply)
             )
             return one - p + sqrt(d)
 
         if region == Region.CASE_III_H:
             delta = (scaled_supply - scaled_reserve) / (
-                1
-                - (scaled_redemption**2)  # exploit that the scaled value of ya is 1.
+                1 - (scaled_redemption**2)  # exploit that the scaled value of ya is 1.
             )
             return one - delta
 
@@ -476,7 +781,7 @@ class Pamm:
             prec_input,
         ):
             return None
-        return self._compute_normalized_anchor_reserve_value() * (
+        return self._get_normalized_anchor_reserve_value() * (
             self.total_gyro_supply + self.redemption_level
         )
 
@@ -512,12 +817,14 @@ class Pamm:
             # case II
             if self._is_in_second_subcase(scaled_reserve, scaled_redemption):
                 # case h
-                if scaled_supply - scaled_reserve <= alpha_min / 2 * scaled_supply**2:
+                if scaled_supply - scaled_reserve <= alpha_min.mul_div_down(
+                    scaled_supply**2, 2
+                ):
                     return Region.CASE_i
                 return Region.CASE_II_H
 
-            if scaled_reserve - theta_floor * scaled_supply >= theta**2 / (
-                2 * alpha_min
+            if scaled_reserve - theta_floor * scaled_supply >= theta.mul_div_down(
+                theta, 2 * alpha_min
             ):
                 return Region.CASE_i
             return Region.CASE_II_L
@@ -527,6 +834,15 @@ class Pamm:
 
         return Region.CASE_III_L
 
+    def compute_current_region(self) -> Region:
+        """Region of the current state, with CASE_high and CASE_low for the cases where the price is fixed."""
+        reserve_ratio = self.reserve_value / self.total_gyro_supply
+        if reserve_ratio >= 1:
+            return Region.CASE_high
+        if isle(reserve_ratio, self.params.target_reserve_ratio_floor, prec_input):
+            return Region.CASE_low
+        return self._compute_normalized_current_region()
+
     def _compute_current_region_ext(self):
         """Extended reconstructed region. For testing only."""
         reserve_ratio = self.reserve_value / self.total_gyro_supply
@@ -540,13 +856,105 @@ class Pamm:
     def redeem(self, amount: D) -> D:
         if amount == 0:
             return D(0)
+        state = self._state()
         redeem_amount = self.compute_redeem_amount(amount)
         self.redemption_level += amount
         self.total_gyro_supply -= amount
         self.reserve_value -= redeem_amount
+        if self.incremental and self._anchor_state == state:
+            self._anchor_state = self._state()
         return redeem_amount
 
     def update_state(self, redemption_level: D, reserve_value: D, total_gyro_supply: D):
         self.redemption_level = redemption_level
         self.reserve_value = reserve_value
         self.total_gyro_supply = total_gyro_supply
+
+
+def compute_current_regions(
+    params: Params, redemption_level: DA, reserve_value: DA, total_gyro_supply: DA
+) -> np.ndarray:
+    """Pamm.compute_current_region() for arrays of states, as an array of Region values (see Region.value). The
+    arguments are broadcast against each other.
+
+    The checks are the same as in `_compute_normalized_current_region()`, evaluated on all states at once, and each
+    element is exactly the scalar result."""
+    reserve_ratio = reserve_value / total_gyro_supply
+    ya = total_gyro_supply + redemption_level
+    scaled_redemption = redemption_level / ya
+    scaled_reserve = reserve_value / ya
+    scaled_supply = total_gyro_supply / ya
+    shape = scaled_reserve.shape
+
+    xu_max = params.stable_redeem_threshold_upper_bound
+    alpha_min = params.decay_slope_lower_bound
+    theta_floor = params.target_reserve_ratio_floor
+    theta = params.target_utilization_ceiling
+
+    def is_above_curve(ba: D, alpha: D, xu: D, xl: D) -> np.ndarray:
+        return scaled_reserve >= compute_fixed_reserves(
+            scaled_redemption, ba, D(1), alpha, xu, xl
+        )
+
+    high = reserve_ratio >= 1
+    low = ~high & (reserve_ratio - theta_floor <= prec_input)  # isle()
+
+    region_I = is_above_curve(
+        params.ba_threshold_region_I,
+        alpha_min,
+        xu_max,
+        params.xl_threshold_at_threshold_I,
+    )
+    case_i = scaled_redemption <= xu_max
+    case_ii = reserve_ratio <= -((scaled_redemption - xu_max) * alpha_min) + 1
+    regions_I = np.where(
+        case_i,
+        Region.CASE_i.value,
+        np.where(case_ii, Region.CASE_I_ii.value, Region.CASE_I_iii.value),
+    )
+
+    region_II = is_above_curve(
+        params.ba_threshold_region_II,
+        alpha_min,
+        D(0),
+        params.xl_threshold_at_threshold_II,
+    )
+    if params.ba_threshold_II_hl >= params.ba_threshold_region_I:
+        case_h = np.zeros(shape, dtype=bool)
+    elif params.ba_threshold_II_hl <= params.ba_threshold_region_II:
+        case_h = np.ones(shape, dtype=bool)
+    else:
+        case_h = is_above_curve(
+            params.ba_threshold_II_hl,
+            alpha_min,
+            params.xu_threshold_II_hl,
+            params.xl_threshold_II_hl,
+        )
+    case_h_i = -scaled_reserve + scaled_supply <= (
+        scaled_supply * scaled_supply
+    ).mul_div_down(alpha_min, 2)
+    case_l_i = -(scaled_supply * theta_floor) + scaled_reserve >= theta.mul_div_down(
+        theta, 2 * alpha_min
+    )
+    regions_II = np.where(
+        case_h,
+        np.where(case_h_i, Region.CASE_i.value, Region.CASE_II_H.value),
+        np.where(case_l_i, Region.CASE_i.value, Region.CASE_II_L.value),
+    )
+
+    if params.ba_threshold_III_hl >= params.ba_threshold_region_II:
+        case_H = np.zeros(shape, dtype=bool)
+    else:
+        case_H = is_above_curve(
+            params.ba_threshold_III_hl,
+            params.slope_threshold_III_HL,
+            D(0),
+            params.xl_threshold_III_HL,
+        )
+    regions_III = np.where(case_H, Region.CASE_III_H.value, Region.CASE_III_L.value)
+
+    return np.select(
+        [high, low, region_I, region_II],
+        [Region.CASE_high.value, Region.CASE_low.value, regions_I, regions_II],
+        regions_III,
+    ).astype(np.int8)
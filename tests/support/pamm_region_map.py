@@ -0,0 +1,199 @@
+# Region maps of the PAMM model (see pamm.py): the Region of each state on a grid over the (reserve ratio,
+# normalized redemption level) plane, for many PAMM params.
+#
+# The region only depends on the state normalized to ya = redemption level + supply = 1, so the grid states have
+# redemption level x, supply 1 - x and reserve value (reserve ratio) * (1 - x). Maps are classified with
+# `pamm.compute_current_regions()`, i.e., vectorized and exactly like `Pamm.compute_current_region()`. The most recent
+# maps are cached in memory, and sweeps over several params compute the missing ones in a process pool. Results can be
+# saved as compressed npz files.
+
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from tests.support.pamm import Params, Region, compute_current_regions
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_decimal_array import QuantizedDecimalArray as DA
+
+# Each map is num_reserve_ratios * num_redemption_levels bytes, i.e., 1 MB for 1000x1000.
+REGION_MAP_CACHE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class Grid:
+    """Cell centers of a regular grid. Reserve ratios go along axis 0 and redemption levels along axis 1."""
+
+    num_reserve_ratios: int = 1000
+    num_redemption_levels: int = 1000
+    reserve_ratio_bounds: Tuple[D, D] = (D(0), D("1.1"))
+    redemption_level_bounds: Tuple[D, D] = (D(0), D(1))
+
+    @staticmethod
+    def _axis(bounds: Tuple[D, D], n: int) -> DA:
+        lo, hi = bounds
+        step = (hi - lo).scaled
+        # Integer arithmetic so that the axis is the same on every platform.
+        return DA.from_scaled(
+            np.array(
+                [lo.scaled + (2 * i + 1) * step // (2 * n) for i in range(n)],
+                dtype=object,
+            )
+        )
+
+    @property
+    def reserve_ratios(self) -> DA:
+        return self._axis(self.reserve_ratio_bounds, self.num_reserve_ratios)
+
+    @property
+    def redemption_levels(self) -> DA:
+        return self._axis(self.redemption_level_bounds, self.num_redemption_levels)
+
+
+def _params_key(params: Params) -> Tuple[D, D, D]:
+    return (
+        params.decay_slope_lower_bound,
+        params.stable_redeem_threshold_upper_bound,
+        params.target_reserve_ratio_floor,
+    )
+
+
+# Most recently used maps by (params key, grid). Maps are read-only, so they can be shared.
+_cache: "OrderedDict[Tuple[Tuple[D, D, D], Grid], np.ndarray]" = OrderedDict()
+
+
+def _classify(key: Tuple[D, D, D], grid: Grid) -> np.ndarray:
+    """Top-level so that it can run in a process pool."""
+    x = grid.redemption_levels[None, :]
+    supply = -x + 1
+    reserve_value = grid.reserve_ratios[:, None] * supply
+    return compute_current_regions(Params(*key), x, reserve_value, supply)
+
+
+def _remember(key: Tuple[D, D, D], grid: Grid, regions: np.ndarray) -> np.ndarray:
+    regions.flags.writeable = False
+    _cache[key, grid] = regions
+    _cache.move_to_end((key, grid))
+    while len(_cache) > REGION_MAP_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return regions
+
+
+def _lookup(key: Tuple[D, D, D], grid: Grid) -> Optional[np.ndarray]:
+    regions = _cache.get((key, grid))
+    if regions is not None:
+        _cache.move_to_end((key, grid))
+    return regions
+
+
+def compute_region_map(params: Params, grid: Grid = Grid()) -> np.ndarray:
+    """Region values (see Region.value) of the grid states, as a read-only int8 array of shape (num_reserve_ratios,
+    num_redemption_levels)."""
+    key = _params_key(params)
+    regions = _lookup(key, grid)
+    if regions is None:
+        regions = _remember(key, grid, _classify(key, grid))
+    return regions
+
+
+def sweep(
+    params_list: Iterable[Params],
+    grid: Grid = Grid(),
+    max_workers: Optional[int] = None,
+) -> np.ndarray:
+    """Region maps for several params, stacked along a new first axis. Maps that are not cached are computed in a
+    process pool with max_workers processes (by default, one per CPU), or in this process if max_workers is 0.
+    """
+    keys = [_params_key(params) for params in params_list]
+    maps = {key: _lookup(key, grid) for key in keys}
+    missing = [key for key, regions in maps.items() if regions is None]
+    if missing and max_workers == 0:
+        for key in missing:
+            maps[key] = _remember(key, grid, _classify(key, grid))
+    elif missing:
+        # "spawn" because workers should not inherit state (e.g., decimal contexts) from the parent.
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results = executor.map(_classify, missing, [grid] * len(missing))
+            for key, regions in zip(missing, results):
+                maps[key] = _remember(key, grid, regions)
+    return np.stack([maps[key] for key in keys])
+
+
+class RegionSummary(NamedTuple):
+    share: float  # of the grid cells
+    reserve_ratio_range: Tuple[D, D]
+    redemption_level_range: Tuple[D, D]
+
+
+def summarize_region_map(
+    regions: np.ndarray, grid: Grid
+) -> Dict[Region, RegionSummary]:
+    """Share and extent of each region that occurs in the map."""
+    reserve_ratios, redemption_levels = grid.reserve_ratios, grid.redemption_levels
+    summary = {}
+    for value in np.unique(regions):
+        rows, cols = np.nonzero(regions == value)
+        summary[Region(int(value))] = RegionSummary(
+            share=len(rows) / regions.size,
+            reserve_ratio_range=(
+                reserve_ratios[rows.min()],
+                reserve_ratios[rows.max()],
+            ),
+            redemption_level_range=(
+                redemption_levels[cols.min()],
+                redemption_levels[cols.max()],
+            ),
+        )
+    return summary
+
+
+def region_boundaries(regions: np.ndarray) -> np.ndarray:
+    """Boolean mask of the cells whose region differs from the next cell along either axis."""
+    boundaries = np.zeros(regions.shape, dtype=bool)
+    boundaries[..., :-1, :] |= regions[..., :-1, :] != regions[..., 1:, :]
+    boundaries[..., :, :-1] |= regions[..., :, :-1] != regions[..., :, 1:]
+    return boundaries
+
+
+def _scaled_strings(values) -> np.ndarray:
+    """Scaled ints as decimal strings, which don't overflow like int64 for values above about 9.22."""
+    return np.array([str(int(x)) for x in values], dtype=str)
+
+
+def _from_scaled_strings(strings: np.ndarray) -> DA:
+    return DA.from_scaled(np.array([int(x) for x in strings], dtype=object))
+
+
+def save_region_maps(
+    path: str, params_list: List[Params], grid: Grid, maps: np.ndarray
+):
+    """Save maps from sweep() with their params and axes (as scaled ints in decimal strings) to a compressed npz
+    file."""
+    np.savez_compressed(
+        path,
+        regions=maps,
+        params=_scaled_strings(
+            x.scaled for p in params_list for x in _params_key(p)
+        ).reshape(-1, 3),
+        reserve_ratios=_scaled_strings(grid.reserve_ratios.scaled),
+        redemption_levels=_scaled_strings(grid.redemption_levels.scaled),
+    )
+
+
+def load_region_maps(path: str) -> Tuple[List[Params], np.ndarray, DA, DA]:
+    """Params, maps, reserve ratios and redemption levels saved by save_region_maps()."""
+    with np.load(path) as data:
+        params_list = [
+            Params(*(D.from_scaled(int(x)) for x in row)) for row in data["params"]
+        ]
+        return (
+            params_list,
+            data["regions"],
+            _from_scaled_strings(data["reserve_ratios"]),
+            _from_scaled_strings(data["redemption_levels"]),
+        )
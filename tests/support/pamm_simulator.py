@@ -0,0 +1,107 @@
+# Replay of mint and redeem events against the bit-exact PrimaryAMMV1 (see primary_amm_v1.py).
+#
+# Between events, the redemption level decays by outflowMemory per block like on-chain: Flow.updateFlow() computes
+# outflowMemory ** blocks by repeated squaring, so a gap costs O(log(blocks)) multiplications however long it is, and
+# the simulation does not need to step through the blocks in between. Events and results are streamed, so traces can
+# be larger than memory.
+#
+# Amounts are scaled ints (like uint256 with 18 decimals). In CSV and JSONL files, they are decimal strings.
+
+import csv
+import json
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from tests.support.primary_amm_v1 import PrimaryAMMV1
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.types import PammParams
+
+ONE = 10**18
+
+MINT = "mint"
+REDEEM = "redeem"
+
+# Ethereum mainnet
+SECONDS_PER_BLOCK = 12
+
+
+class Event(NamedTuple):
+    timestamp: int  # seconds
+    kind: str  # MINT or REDEEM
+    amount: int  # GYD
+    # Reserve value right before the event, e.g., after a price move. None if it only changed by earlier events.
+    reserve_value: Optional[int] = None
+
+
+class SimulationStep(NamedTuple):
+    event: Event
+    block: int
+    usd_amount: int  # USD paid in for mints, paid out for redeems
+    price: int  # USD per GYD of this event
+    redemption_level: int  # after the event, decayed to its block
+    reserve_value: int  # after the event
+    total_gyro_supply: int  # after the event
+
+
+def _parse_event(row: dict) -> Event:
+    reserve_value = row.get("reserve_value")
+    return Event(
+        timestamp=int(row["timestamp"]),
+        kind=row["kind"],
+        amount=D(row["amount"]).scaled,
+        reserve_value=(
+            D(reserve_value).scaled if reserve_value not in (None, "") else None
+        ),
+    )
+
+
+def read_events_csv(path: str) -> Iterator[Event]:
+    """Events from a CSV file with columns timestamp, kind, amount and optionally reserve_value."""
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            yield _parse_event(row)
+
+
+def read_events_jsonl(path: str) -> Iterator[Event]:
+    """Events from a file with one JSON object per line, with the same keys as the CSV columns."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield _parse_event(json.loads(line))
+
+
+def simulate(
+    events: Iterable[Event],
+    params: PammParams,
+    reserve_value: int,
+    total_gyro_supply: int,
+    redeem_discount_ratio: int = 0,
+    seconds_per_block: int = SECONDS_PER_BLOCK,
+) -> Iterator[SimulationStep]:
+    """Replay events, which must be ordered by timestamp, starting from the given reserve and supply with no
+    recent redemptions. Mints are 1:1, like in PrimaryAMMV1."""
+    pamm = PrimaryAMMV1(params, redeem_discount_ratio)
+    for event in events:
+        block = event.timestamp // seconds_per_block
+        if event.reserve_value is not None:
+            reserve_value = event.reserve_value
+        if event.kind == MINT:
+            usd_amount = pamm.compute_mint_amount(event.amount)
+            reserve_value += usd_amount
+            total_gyro_supply += event.amount
+        elif event.kind == REDEEM:
+            usd_amount = pamm.redeem(
+                event.amount, reserve_value, total_gyro_supply, block
+            )
+            reserve_value -= usd_amount
+            total_gyro_supply -= event.amount
+        else:
+            raise ValueError(f"unknown event kind: {event.kind}")
+        yield SimulationStep(
+            event=event,
+            block=block,
+            usd_amount=usd_amount,
+            price=usd_amount * ONE // event.amount if event.amount else ONE,
+            redemption_level=pamm.get_redemption_level(block),
+            reserve_value=reserve_value,
+            total_gyro_supply=total_gyro_supply,
+        )
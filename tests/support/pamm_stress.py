@@ -0,0 +1,261 @@
+# Monte Carlo bank-run stress tests of the PAMM model (see pamm.py).
+#
+# A path samples PAMM params and a scenario from a ScenarioDistribution: the reserve value drops, and then waves of
+# redemptions hit the PAMM. Paths are run in chunks across a process pool. Every path is seeded from (seed, index of
+# the path), so results don't depend on the number of workers or the chunk size.
+#
+# Only aggregates are kept: results go into fixed-bin histograms and region counts, which are merged as chunks
+# finish, and only a bounded number of chunks is in flight at a time. Memory is therefore independent of the number of
+# paths, and the running summary can be reported while the run is still going.
+
+import multiprocessing
+import os
+import random
+from collections import Counter
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from tests.support.pamm import Pamm, Params, Region
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+# Percentiles are resolved to the width of a bin.
+HISTOGRAM_BINS = 2000
+
+# The PAMM's behavior only depends on ratios, so any supply will do.
+INITIAL_SUPPLY = D(1_000_000)
+
+
+@dataclass
+class ScenarioDistribution:
+    """Ranges that the parameters of each path are sampled from, uniformly. theta_bar is additionally kept
+    >= 1 - sqrt(2 alpha_bar), for which the redemption curve is well-defined."""
+
+    decay_slope_lower_bound: Tuple[D, D] = (D("0.5"), D("1"))  # ᾱ
+    stable_redeem_threshold_upper_bound: Tuple[D, D] = (D("0.1"), D("0.5"))  # x̄_U
+    target_reserve_ratio_floor: Tuple[D, D] = (D("0.4"), D("0.8"))  # θ̄
+    initial_reserve_ratio: Tuple[D, D] = (D("1"), D("1"))
+    # Share of the reserve value lost before the run
+    reserve_drop: Tuple[D, D] = (D("0"), D("0.4"))
+    # Share of the remaining supply redeemed in each wave
+    wave_size: Tuple[D, D] = (D("0.01"), D("0.1"))
+    num_waves: int = 10
+
+
+class PathResult(NamedTuple):
+    final_reserve_ratio: D
+    worst_price: D  # lowest average price of a wave
+    regions: List[Region]  # before each wave
+
+
+def _sample(rng: random.Random, bounds: Tuple[D, D]) -> D:
+    lo, hi = bounds
+    return D.from_scaled(rng.randint(lo.scaled, max(lo.scaled, hi.scaled)))
+
+
+def sample_path(
+    distribution: ScenarioDistribution, seed: int, index: int
+) -> Tuple[Params, D, D, List[D]]:
+    """Params, initial reserve ratio, reserve drop and wave sizes of the path with the given index."""
+    rng = random.Random(f"{seed}:{index}")
+    alpha_bar = _sample(rng, distribution.decay_slope_lower_bound)
+    xu_bar = _sample(rng, distribution.stable_redeem_threshold_upper_bound)
+    theta_lo, theta_hi = distribution.target_reserve_ratio_floor
+    theta_lo = max(theta_lo, 1 - (2 * alpha_bar).sqrt())
+    theta_bar = _sample(rng, (theta_lo, theta_hi))
+    params = Params(alpha_bar, xu_bar, theta_bar)
+    reserve_ratio = _sample(rng, distribution.initial_reserve_ratio)
+    reserve_drop = _sample(rng, distribution.reserve_drop)
+    waves = [
+        _sample(rng, distribution.wave_size) for _ in range(distribution.num_waves)
+    ]
+    return params, reserve_ratio, reserve_drop, waves
+
+
+def run_path(distribution: ScenarioDistribution, seed: int, index: int) -> PathResult:
+    params, reserve_ratio, reserve_drop, waves = sample_path(distribution, seed, index)
+    pamm = Pamm(params)
+    reserve_value = INITIAL_SUPPLY * reserve_ratio * (1 - reserve_drop)
+    pamm.update_state(D(0), reserve_value, INITIAL_SUPPLY)
+
+    worst_price = D(1)
+    regions = []
+    for wave in waves:
+        amount = pamm.total_gyro_supply * wave
+        if amount == 0:
+            continue
+        regions.append(pamm.compute_current_region())
+        worst_price = min(worst_price, pamm.redeem(amount) / amount)
+    return PathResult(
+        final_reserve_ratio=pamm.reserve_value / pamm.total_gyro_supply,
+        worst_price=worst_price,
+        regions=regions,
+    )
+
+
+@dataclass
+class Histogram:
+    """Counts of values in equal-width bins over [lo, hi). Values outside are counted in the first and last bin, but
+    the exact minimum and maximum are kept."""
+
+    lo: float
+    hi: float
+    num_bins: int = HISTOGRAM_BINS
+    counts: List[int] = field(default_factory=list)
+    min: Optional[D] = None
+    max: Optional[D] = None
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * self.num_bins
+
+    @property
+    def bin_width(self) -> float:
+        return (self.hi - self.lo) / self.num_bins
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def add(self, value: D):
+        i = int((float(value) - self.lo) / self.bin_width)
+        self.counts[min(max(i, 0), self.num_bins - 1)] += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "Histogram"):
+        if (self.lo, self.hi, self.num_bins) != (other.lo, other.hi, other.num_bins):
+            raise ValueError("histograms have different bins")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Smallest value (up to the bin width) such that a share q of the values is <= it."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        total = self.count
+        if total == 0:
+            raise ValueError("empty histogram")
+        target = max(1, q * total)
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                if i == self.num_bins - 1:
+                    # The last bin also counts the values above hi.
+                    return float(self.max)
+                upper = self.lo + (i + 1) * self.bin_width
+                return min(max(upper, float(self.min)), float(self.max))
+
+
+@dataclass
+class StressSummary:
+    final_reserve_ratio: Histogram = field(default_factory=lambda: Histogram(0, 2))
+    worst_price: Histogram = field(default_factory=lambda: Histogram(0, 1))
+    # Number of waves started in each region
+    region_counts: Counter = field(default_factory=Counter)
+
+    @property
+    def num_paths(self) -> int:
+        return self.final_reserve_ratio.count
+
+    def add(self, result: PathResult):
+        self.final_reserve_ratio.add(result.final_reserve_ratio)
+        self.worst_price.add(result.worst_price)
+        self.region_counts.update(result.regions)
+
+    def merge(self, other: "StressSummary"):
+        self.final_reserve_ratio.merge(other.final_reserve_ratio)
+        self.worst_price.merge(other.worst_price)
+        self.region_counts.update(other.region_counts)
+
+    def region_occupancy(self) -> Dict[Region, float]:
+        total = sum(self.region_counts.values())
+        return {region: n / total for region, n in self.region_counts.items()}
+
+    def percentiles(
+        self, qs: Iterable[float] = (0.01, 0.05, 0.5, 0.95)
+    ) -> Dict[str, Dict[float, float]]:
+        return {
+            "final_reserve_ratio": {
+                q: self.final_reserve_ratio.percentile(q) for q in qs
+            },
+            "worst_price": {q: self.worst_price.percentile(q) for q in qs},
+        }
+
+
+def run_chunk(
+    distribution: ScenarioDistribution, seed: int, start: int, stop: int
+) -> StressSummary:
+    """Summary of the paths with indices in [start, stop). Top-level so that it can run in a process pool."""
+    summary = StressSummary()
+    for index in range(start, stop):
+        summary.add(run_path(distribution, seed, index))
+    return summary
+
+
+def run_stress_test(
+    distribution: ScenarioDistribution,
+    num_paths: int,
+    seed: int = 0,
+    chunk_size: int = 100,
+    max_workers: Optional[int] = None,
+) -> Iterator[StressSummary]:
+    """Run num_paths paths and yield the running summary after each chunk of paths. This is the same object each time,
+    updated in place, so after the last chunk it covers all paths.
+
+    Chunks run in a process pool with max_workers processes (by default, one per CPU), or in this process if
+    max_workers is 0."""
+    chunks = (
+        (start, min(start + chunk_size, num_paths))
+        for start in range(0, num_paths, chunk_size)
+    )
+    if max_workers == 0:
+        yield from _accumulate(
+            run_chunk(distribution, seed, start, stop) for start, stop in chunks
+        )
+        return
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    # "spawn" because workers should not inherit state (e.g., decimal contexts) from the parent.
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        yield from _accumulate(
+            _bounded_map(executor, distribution, seed, chunks, 2 * max_workers)
+        )
+
+
+def _bounded_map(
+    executor: ProcessPoolExecutor,
+    distribution: ScenarioDistribution,
+    seed: int,
+    chunks: Iterator[Tuple[int, int]],
+    window: int,
+) -> Iterator[StressSummary]:
+    """run_chunk() for each chunk in the executor, with at most window chunks submitted or finished but not yet
+    consumed at a time, in the order in which they finish."""
+    pending = set()
+    for start, stop in chunks:
+        pending.add(executor.submit(run_chunk, distribution, seed, start, stop))
+        if len(pending) >= window:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    for future in as_completed(pending):
+        yield future.result()
+
+
+def _accumulate(results: Iterable[StressSummary]) -> Iterator[StressSummary]:
+    summary = StressSummary()
+    for result in results:
+        summary.merge(result)
+        yield summary
@@ -0,0 +1,494 @@
+# Bit-exact Python version of contracts/PrimaryAMMV1.sol.
+#
+# Unlike the Decimal model in pamm.py, this performs exactly the same uint256 operations as the contract, in the same
+# order, so it returns the same amounts to the wei and fails where the contract reverts (see libraries/errors.py). It
+# can be used to quote redemptions off-chain. test_primary_amm_v1.py checks it against TestingPAMMV1.
+#
+# Functions are named like their Solidity counterparts and take the same arguments. Params and states are the
+# NamedTuples below, which can be passed to the contract as structs.
+
+from typing import NamedTuple
+
+from tests.support import error_codes
+from tests.support.libraries import log_exp_math
+from tests.support.libraries.errors import Revert, checked_uint256, require
+from tests.support.libraries.fixed_point import (
+    div_down,
+    mul_down,
+    square_down,
+    square_up,
+)
+from tests.support.libraries.flow import update_flow
+from tests.support.pamm import Region
+from tests.support.types import PammParams
+
+# We tolerate underflows due to numerical issues up to 1e10, so 1e-8 given our 1e18 scale.
+UNDERFLOW_EPSILON = 10**10
+
+ONE = 10**18
+TWO = 2 * 10**18
+ANCHOR = ONE
+
+
+class State(NamedTuple):
+    redemption_level: int  # x
+    reserve_value: int  # b
+    total_gyro_supply: int  # y
+
+
+class DerivedParams(NamedTuple):
+    ba_threshold_region_I: int  # b_a^{I/II}
+    ba_threshold_region_II: int  # b_a^{II/III}
+    xl_threshold_at_threshold_I: int  # x_L^{I/II}
+    xl_threshold_at_threshold_II: int  # x_L^{II/III}
+    ba_threshold_II_HL: int  # ba^{h/l}
+    ba_threshold_III_HL: int  # ba^{H/L}
+    xu_threshold_II_HL: int  # x_U^{h/l}
+
+
+# Checked uint256 arithmetic.
+
+
+def _add(a: int, b: int) -> int:
+    return checked_uint256(a + b)
+
+
+def _sub(a: int, b: int) -> int:
+    return checked_uint256(a - b)
+
+
+def _mul(a: int, b: int) -> int:
+    return checked_uint256(a * b)
+
+
+def _sqrt(x: int) -> int:
+    return log_exp_math.sqrt(x)
+
+
+# Helpers to compute various parameters
+
+
+def compute_alpha(ba: int, ya: int, theta_bar: int, alpha_bar: int) -> int:
+    """Proposition 3 (section 3) of the paper"""
+    ra = div_down(ba, ya)
+    alpha_min = div_down(alpha_bar, ya)
+    if ra >= _add(ONE, theta_bar) // 2:
+        alpha_hat = div_down(mul_down(TWO, _sub(ONE, ra)), ya)
+    else:
+        numerator = _sub(ONE, theta_bar) ** 2
+        denominator = _sub(ba, mul_down(theta_bar, ya))
+        alpha_hat = numerator // _mul(denominator, 2)
+    return max(alpha_hat, alpha_min)
+
+
+def compute_reserve_fixed_params(
+    x: int, ba: int, ya: int, alpha: int, xu: int, xl: int
+) -> int:
+    """Proposition 1 (section 3) of the paper"""
+    if x <= xu:
+        return _sub(ba, x)
+    if x <= xl:
+        pos = _add(ba, _mul(alpha, square_down(_sub(x, xu))) // TWO)
+        if pos >= x:
+            return pos - x
+        require(
+            _add(pos, mul_down(UNDERFLOW_EPSILON, ya)) >= x, error_codes.SUB_OVERFLOW
+        )
+        return 0
+    # x > xl:
+    rl = _sub(ONE, mul_down(alpha, _sub(xl, xu)))
+    return mul_down(rl, _sub(ya, x))
+
+
+def compute_xl(ba: int, ya: int, alpha: int, xu: int) -> int:
+    """Proposition 2 (section 3) of the paper"""
+    require(ba < ya, error_codes.INVALID_ARGUMENT)
+    left = square_up(_sub(ya, xu))
+    right = _mul(TWO, _sub(ya, ba)) // alpha
+    if left >= right:
+        return _sub(ya, _sqrt(left - right))
+    return ya
+
+
+def compute_xu(ba: int, ya: int, alpha: int, xu_bar: int, theta: int) -> int:
+    """Proposition 4 (section 3) of the paper"""
+    delta = _sub(ya, ba)
+    xu_max = mul_down(xu_bar, ya)
+    if mul_down(alpha, delta) <= _mul(theta, theta) // TWO:
+        rh = _mul(TWO, delta) // alpha
+        rh_sqrt = _sqrt(rh)
+        xu = 0 if rh_sqrt >= ya else ya - rh_sqrt
+    else:
+        subtracted = _add(div_down(delta, theta), div_down(theta, _mul(2, alpha)))
+        xu = 0 if subtracted >= ya else ya - subtracted
+    return min(xu, xu_max)
+
+
+def compute_ba(xu: int, params: PammParams) -> int:
+    """Lemma 4 (section 7) of the paper"""
+    require(ONE >= xu, "ya must be greater than xu")
+    alpha = params.alpha_bar
+
+    yz = _sub(ANCHOR, xu)
+    if ONE >= _add(params.theta_bar, mul_down(alpha, yz)):
+        return _sub(ANCHOR, _mul(alpha, square_down(yz)) // TWO)
+    theta = _sub(ONE, params.theta_bar)
+    return _add(_sub(ANCHOR, mul_down(theta, yz)), theta**2 // _mul(2, alpha))
+
+
+def create_derived_params(params: PammParams) -> DerivedParams:
+    """Algorithm 1 (section 7) of the paper"""
+    ba_threshold_region_I = compute_ba(params.xu_bar, params)
+    ba_threshold_region_II = compute_ba(0, params)
+    xl_threshold_at_threshold_I = compute_xl(
+        ba_threshold_region_I, ONE, params.alpha_bar, params.xu_bar
+    )
+    xl_threshold_at_threshold_II = compute_xl(
+        ba_threshold_region_II, ONE, params.alpha_bar, 0
+    )
+
+    theta = _sub(ONE, params.theta_bar)
+
+    subtrahend = theta**2 // _mul(2, params.alpha_bar)
+    ba_threshold_II_HL = ONE - subtrahend if ONE >= subtrahend else 0
+
+    xu_threshold_II_HL = 0
+    if ba_threshold_region_I > ba_threshold_II_HL > ba_threshold_region_II:
+        xu_threshold_II_HL = compute_xu(
+            ba_threshold_II_HL, ONE, params.alpha_bar, params.xu_bar, theta
+        )
+
+    ba_threshold_III_HL = _add(ONE, params.theta_bar) // 2
+
+    return DerivedParams(
+        ba_threshold_region_I=ba_threshold_region_I,
+        ba_threshold_region_II=ba_threshold_region_II,
+        xl_threshold_at_threshold_I=xl_threshold_at_threshold_I,
+        xl_threshold_at_threshold_II=xl_threshold_at_threshold_II,
+        ba_threshold_II_HL=ba_threshold_II_HL,
+        ba_threshold_III_HL=ba_threshold_III_HL,
+        xu_threshold_II_HL=xu_threshold_II_HL,
+    )
+
+
+def compute_reserve(x: int, ba: int, ya: int, params: PammParams) -> int:
+    alpha = compute_alpha(ba, ya, params.theta_bar, params.alpha_bar)
+    xu = compute_xu(ba, ya, alpha, params.xu_bar, _sub(ONE, params.theta_bar))
+    xl = compute_xl(ba, ya, alpha, xu)
+    return compute_reserve_fixed_params(x, ba, ya, alpha, xu, xl)
+
+
+def is_in_first_region(
+    normalized_state: State, params: PammParams, derived: DerivedParams
+) -> bool:
+    return normalized_state.reserve_value >= compute_reserve_fixed_params(
+        normalized_state.redemption_level,
+        derived.ba_threshold_region_I,
+        ONE,
+        params.alpha_bar,
+        params.xu_bar,
+        derived.xl_threshold_at_threshold_I,
+    )
+
+
+def is_in_second_region(
+    normalized_state: State, alpha_bar: int, derived: DerivedParams
+) -> bool:
+    return normalized_state.reserve_value >= compute_reserve_fixed_params(
+        normalized_state.redemption_level,
+        derived.ba_threshold_region_II,
+        ONE,
+        alpha_bar,
+        0,
+        derived.xl_threshold_at_threshold_II,
+    )
+
+
+def is_in_second_region_high(
+    normalized_state: State, alpha_bar: int, derived: DerivedParams
+) -> bool:
+    if derived.ba_threshold_II_HL <= derived.ba_threshold_region_II:
+        return True
+    if derived.ba_threshold_II_HL > derived.ba_threshold_region_I:
+        return False
+    return normalized_state.reserve_value >= compute_reserve_fixed_params(
+        normalized_state.redemption_level,
+        derived.ba_threshold_II_HL,
+        ONE,
+        alpha_bar,
+        derived.xu_threshold_II_HL,
+        ONE,
+    )
+
+
+def is_in_third_region_high(
+    normalized_state: State, params: PammParams, derived: DerivedParams
+) -> bool:
+    if derived.ba_threshold_III_HL > derived.ba_threshold_region_II:
+        return False
+    return normalized_state.reserve_value >= compute_reserve_fixed_params(
+        normalized_state.redemption_level,
+        derived.ba_threshold_III_HL,
+        ONE,
+        _sub(ONE, params.theta_bar),
+        0,
+        ONE,
+    )
+
+
+def compute_reserve_value_region(
+    normalized_state: State, params: PammParams, derived: DerivedParams
+) -> Region:
+    x, b, y = normalized_state
+
+    if is_in_first_region(normalized_state, params, derived):
+        # case I
+        if x <= params.xu_bar:
+            return Region.CASE_i
+        lhs = _add(div_down(b, y), mul_down(params.alpha_bar, _sub(x, params.xu_bar)))
+        if lhs <= ONE:
+            return Region.CASE_I_ii
+        return Region.CASE_I_iii
+
+    if is_in_second_region(normalized_state, params.alpha_bar, derived):
+        # case II
+        if is_in_second_region_high(normalized_state, params.alpha_bar, derived):
+            # case II_h
+            if _sub(y, b) <= _mul(square_down(y), params.alpha_bar) // TWO:
+                return Region.CASE_i
+            return Region.CASE_II_H
+
+        theta = _sub(ONE, params.theta_bar)
+        if _sub(b, mul_down(params.theta_bar, y)) >= theta**2 // _mul(
+            2, params.alpha_bar
+        ):
+            return Region.CASE_i
+        return Region.CASE_II_L
+
+    if is_in_third_region_high(normalized_state, params, derived):
+        return Region.CASE_III_H
+
+    return Region.CASE_III_L
+
+
+def compute_anchored_reserve_value(
+    normalized_state: State, params: PammParams, derived: DerivedParams
+) -> int:
+    region = compute_reserve_value_region(normalized_state, params, derived)
+
+    x, b, y = normalized_state
+    ya = ONE
+    r = div_down(b, y)
+    u = _sub(ONE, r)
+    theta = _sub(ONE, params.theta_bar)
+
+    if region == Region.CASE_i:
+        return _add(b, x)
+
+    if region == Region.CASE_I_ii:
+        x_diff = _sub(x, params.xu_bar)
+        return _sub(_add(b, x), _mul(params.alpha_bar, square_down(x_diff)) // TWO)
+
+    if region == Region.CASE_I_iii:
+        return _add(
+            _sub(ya, mul_down(_sub(ya, params.xu_bar), u)),
+            u**2 // _mul(2, params.alpha_bar),
+        )
+
+    if region == Region.CASE_II_H:
+        base = _add(div_down(u, params.alpha_bar), y // 2)
+        delta = _mul(params.alpha_bar, square_down(base)) // TWO
+        return _sub(ya, delta)
+
+    if region == Region.CASE_II_L:
+        p = mul_down(theta, _add(div_down(theta, _mul(2, params.alpha_bar)), y))
+        d = _mul(
+            2,
+            mul_down(
+                theta**2 // params.alpha_bar, _sub(b, mul_down(y, params.theta_bar))
+            ),
+        )
+        return _sub(_add(ya, _sqrt(d)), p)
+
+    if region == Region.CASE_III_H:
+        delta = div_down(_sub(y, b), _sub(ONE, square_down(x)))
+        return _sub(ya, delta)
+
+    if region == Region.CASE_III_L:
+        p = _add(_sub(y, b), theta) // 2
+        q = _add(
+            mul_down(_sub(y, b), theta),
+            mul_down(square_down(theta), square_down(x)) // 4,
+        )
+        delta = _sub(p, _sqrt(_sub(square_down(p), q)))
+        return _sub(ya, delta)
+
+    raise Revert("unknown region")
+
+
+def compute_discounted_reserve_value(
+    reserve_value: int, total_gyro_supply: int, redeem_discount_ratio: int
+) -> int:
+    """`_computeDiscountedReserveValue()`, with the REDEEM_DISCOUNT_RATIO from the config passed in."""
+    discount = mul_down(redeem_discount_ratio, total_gyro_supply)
+    if reserve_value > _mul(2, discount):
+        return min(reserve_value - discount, total_gyro_supply)
+    return reserve_value
+
+
+def _normalize(state: State) -> State:
+    ya = _add(state.total_gyro_supply, state.redemption_level)
+    return State(
+        redemption_level=div_down(state.redemption_level, ya),
+        reserve_value=div_down(state.reserve_value, ya),
+        total_gyro_supply=div_down(state.total_gyro_supply, ya),
+    )
+
+
+def compute_redeem_amount(
+    state: State,
+    params: PammParams,
+    derived: DerivedParams,
+    amount: int,
+    redeem_discount_ratio: int = 0,
+) -> int:
+    ya = _add(state.total_gyro_supply, state.redemption_level)
+
+    state = state._replace(
+        reserve_value=compute_discounted_reserve_value(
+            state.reserve_value, state.total_gyro_supply, redeem_discount_ratio
+        )
+    )
+    normalized_state = _normalize(state)
+
+    normalized_nav = div_down(
+        normalized_state.reserve_value, normalized_state.total_gyro_supply
+    )
+    if normalized_nav >= ONE:
+        return amount
+    if normalized_nav <= params.theta_bar:
+        nav = div_down(state.reserve_value, state.total_gyro_supply)
+        return mul_down(nav, amount)
+
+    normalized_anchored_reserve_value = compute_anchored_reserve_value(
+        normalized_state, params, derived
+    )
+    anchored_reserve_value = mul_down(normalized_anchored_reserve_value, ya)
+
+    next_reserve_value = compute_reserve(
+        _add(state.redemption_level, amount), anchored_reserve_value, ya, params
+    )
+    # we are redeeming so the next reserve value must be smaller than the current one
+    redeem_amount = _sub(state.reserve_value, next_reserve_value)
+
+    # Defensive programming. The following conditions could only occur due to numerical inaccuracy in extreme
+    # situations.
+    return min(redeem_amount, amount, state.total_gyro_supply)
+
+
+def get_normalized_anchored_reserve_value_at_state(
+    state: State, params: PammParams, redeem_discount_ratio: int = 0
+) -> int:
+    state = state._replace(
+        reserve_value=compute_discounted_reserve_value(
+            state.reserve_value, state.total_gyro_supply, redeem_discount_ratio
+        )
+    )
+    normalized_state = _normalize(state)
+
+    normalized_nav = div_down(
+        normalized_state.reserve_value, normalized_state.total_gyro_supply
+    )
+    if normalized_nav >= ONE:
+        return ONE
+    if normalized_nav <= params.theta_bar:
+        return div_down(state.reserve_value, state.total_gyro_supply)
+
+    derived = create_derived_params(params)
+    return compute_anchored_reserve_value(normalized_state, params, derived)
+
+
+class PrimaryAMMV1:
+    """The storage and external functions of the contract.
+
+    Where the contract reads the chain or the config, the values are passed in: the block number, the GYD supply
+    (`Motherboard.mintedSupply()`) and REDEEM_DISCOUNT_RATIO."""
+
+    def __init__(self, params: PammParams, redeem_discount_ratio: int = 0):
+        self.redeem_discount_ratio = redeem_discount_ratio
+        self.redemption_level = 0
+        self.last_redemption_block = 0
+        self.set_system_params(params)
+
+    def set_system_params(self, params: PammParams):
+        # The contract recomputes the derived params on every call, but they only depend on the params.
+        self.derived = create_derived_params(params)
+        self.system_params = params
+
+    def get_redemption_level(self, block_number: int) -> int:
+        return update_flow(
+            self.redemption_level,
+            block_number,
+            self.last_redemption_block,
+            self.system_params.outflow_memory,
+        )
+
+    def compute_starting_redeem_state(
+        self, reserve_usd_value: int, total_gyro_supply: int, block_number: int
+    ) -> State:
+        return State(
+            redemption_level=self.get_redemption_level(block_number),
+            reserve_value=reserve_usd_value,
+            total_gyro_supply=total_gyro_supply,
+        )
+
+    def compute_mint_amount(self, usd_amount: int) -> int:
+        return usd_amount
+
+    def compute_redeem_amount(
+        self,
+        gyd_amount: int,
+        reserve_usd_value: int,
+        total_gyro_supply: int,
+        block_number: int,
+    ) -> int:
+        if gyd_amount == 0:
+            return 0
+        state = self.compute_starting_redeem_state(
+            reserve_usd_value, total_gyro_supply, block_number
+        )
+        return compute_redeem_amount(
+            state,
+            self.system_params,
+            self.derived,
+            gyd_amount,
+            self.redeem_discount_ratio,
+        )
+
+    def redeem(
+        self,
+        gyd_amount: int,
+        reserve_usd_value: int,
+        total_gyro_supply: int,
+        block_number: int,
+    ) -> int:
+        if gyd_amount == 0:
+            return 0
+        state = self.compute_starting_redeem_state(
+            reserve_usd_value, total_gyro_supply, block_number
+        )
+        redeem_amount = compute_redeem_amount(
+            state,
+            self.system_params,
+            self.derived,
+            gyd_amount,
+            self.redeem_discount_ratio,
+        )
+        self.redemption_level = _add(state.redemption_level, gyd_amount)
+        self.last_redemption_block = block_number
+        return redeem_amount
+
+    def get_normalized_anchored_reserve_value_at_state(self, state: State) -> int:
+        return get_normalized_anchored_reserve_value_at_state(
+            state, self.system_params, self.redeem_discount_ratio
+        )
@@ -8,30 +8,33 @@ from __future__ import annotations
 
 import decimal
 import math
+import os
+import re
 from functools import total_ordering
 from typing import Any, Optional, Union
 
-import pytest
+from tests.support import exp_log
+from tests.support.libraries import fixed_point, log_exp_math
+from tests.support.quantized_decimal_int import _div_rounded, _is_approx
 
 # v Total number of decimal places. This matches uint256, to the degree possible (max uint256 ≈ 1.16e+77).
 MAX_PREC_VALUE = 78
 
-# Workaround a brownie issue:
-# - In Brownie, prec is already set to 78 and you can't set it. (through vyper for some reason)
-# - Outside brownie, prec is lower than that and you should set it.
-if decimal.getcontext().prec != MAX_PREC_VALUE:
-    decimal.getcontext().prec = MAX_PREC_VALUE
+DECIMAL_PRECISION = 18
 
+# QuantizedDecimal(n) for these ints returns a shared instance.
+INTERNED_INTS = range(-1, 11)
 
-def set_decimals(ndecimals: int):
-    global DECIMAL_PRECISION, DECIMAL_MULT, QUANTIZED_EXP
-    DECIMAL_PRECISION = ndecimals
-    QUANTIZED_EXP = decimal.Decimal(1) / decimal.Decimal(10**DECIMAL_PRECISION)
-    # 1.000000... multiplier to increase the precision to the required level by multiplying
-    DECIMAL_MULT = QUANTIZED_EXP * decimal.Decimal(10**DECIMAL_PRECISION)
 
+def max_prec_for_decimals(ndecimals: int) -> int:
+    """Number of significant digits used for a given number of decimals.
 
-set_decimals(18)
+    We use MAX_PREC_VALUE (≈ uint256) as long as that leaves at least as many places before the point as after it.
+    Beyond that, we give the same number of places to the integer part, the fractional part and headroom for
+    intermediate results (e.g., 300 digits for 100 decimals)."""
+    if 2 * ndecimals <= MAX_PREC_VALUE:
+        return MAX_PREC_VALUE
+    return 3 * ndecimals
 
 
 @total_ordering
@@ -39,73 +42,191 @@ class QuantizedDecimal:
     """Wrapper of `decimal.Decimal` with quantized semantics
     meaning that all operations will be quantized down to the `DECIMAL_PRECISION`
     set in `constants`
+
+    `QuantizedDecimal` has 18 decimals. `QuantizedDecimal[n]` is the variant with n decimals; it is a subclass of
+    `QuantizedDecimal` and `QuantizedDecimal[18] is QuantizedDecimal`. Each variant computes in its own
+    `decimal.Context` (see `max_prec_for_decimals()`), so the global context is neither used nor modified.
+    Operations between different variants are performed at the higher precision.
+
+    Instances are immutable. Small int constants (INTERNED_INTS, e.g., `QuantizedDecimal(1)`) are shared.
+
+    There is no global state, so different variants can be used concurrently in threads. Instances and variants can
+    be pickled, e.g., to send them to a process pool.
     """
 
-    def __init__(self, value="0", context: decimal.Context = None):
-        if isinstance(value, QuantizedDecimal):
-            value = value * DECIMAL_MULT
-            self._value = value._value
+    __slots__ = ("_value",)
+
+    DECIMAL_PRECISION = DECIMAL_PRECISION
+    MAX_PREC_VALUE = MAX_PREC_VALUE
+    CONTEXT = decimal.Context(prec=MAX_PREC_VALUE)
+    QUANTIZED_EXP = decimal.Decimal(1).scaleb(-DECIMAL_PRECISION)
+    # 1.000000... multiplier to increase the precision to the required level by multiplying
+    DECIMAL_MULT = QUANTIZED_EXP * decimal.Decimal(10**DECIMAL_PRECISION)
+    # Values with at most this many digits before the point fit into CONTEXT.
+    _INTEGER_DIGITS = MAX_PREC_VALUE - DECIMAL_PRECISION
+
+    _variants: dict[int, type] = {}
+    _interned: dict[int, QuantizedDecimal] = {}
+
+    def __class_getitem__(cls, ndecimals: int) -> type:
+        try:
+            return cls._variants[ndecimals]
+        except KeyError:
+            pass
+        max_prec = max_prec_for_decimals(ndecimals)
+        quantized_exp = decimal.Decimal(1).scaleb(-ndecimals)
+        variant = type(
+            f"QuantizedDecimal[{ndecimals}]",
+            (DecimalQuantizedDecimal,),
+            {
+                "__module__": __name__,
+                "__slots__": (),
+                "DECIMAL_PRECISION": ndecimals,
+                "MAX_PREC_VALUE": max_prec,
+                "CONTEXT": decimal.Context(prec=max_prec),
+                "QUANTIZED_EXP": quantized_exp,
+                "DECIMAL_MULT": quantized_exp * decimal.Decimal(10**ndecimals),
+                "_INTEGER_DIGITS": max_prec - ndecimals,
+                "_interned": {},
+            },
+        )
+        variant._intern_constants()
+        return cls._variants.setdefault(ndecimals, variant)
+
+    @classmethod
+    def _intern_constants(cls):
+        for n in INTERNED_INTS:
+            cls._interned[n] = cls(n)
+
+    def __new__(cls, value="0", context: decimal.Context = None):
+        if type(value) is cls:
+            return value
+        if type(value) is int and context is None:
+            interned = cls._interned.get(value)
+            if interned is not None:
+                return interned
+        self = object.__new__(cls)
+        if isinstance(value, DecimalQuantizedDecimal):
+            if value.DECIMAL_PRECISION == self.DECIMAL_PRECISION:
+                self._value = value._value
+            else:
+                # Exact if we have at least as many decimals as `value`, o/w rounds down.
+                self._value = self._quantize(value._value)
         elif isinstance(value, decimal.Decimal):
             rounding = decimal.ROUND_DOWN
             if context is not None:
                 rounding = context.rounding
-            value = value * DECIMAL_MULT
+            value = self.CONTEXT.multiply(value, self.DECIMAL_MULT)
             self._value = self._quantize(value, rounding=rounding)
         else:
             rounding = decimal.ROUND_DOWN
             if isinstance(value, float):
                 rounding = decimal.ROUND_HALF_DOWN
-            high_prec_value = decimal.Decimal(value, context=context) * DECIMAL_MULT
+            high_prec_value = self.CONTEXT.multiply(
+                decimal.Decimal(value, context=context), self.DECIMAL_MULT
+            )
             self._value = self._quantize(high_prec_value, rounding=rounding)
+        return self
+
+    def __reduce__(self):
+        return _unpickle, (self.DECIMAL_PRECISION, self._value)
+
+    @classmethod
+    def _from_raw(cls, value: decimal.Decimal) -> QuantizedDecimal:
+        """Wrap a Decimal that is already quantized, bypassing the checks and conversions of the constructor."""
+        ret = object.__new__(cls)
+        ret._value = value
+        return ret
+
+    @classmethod
+    def _from_exact(cls, value: decimal.Decimal) -> QuantizedDecimal:
+        """Wrap a sum or difference of quantized values, or a scaleb() of an int. These are quantized already unless
+        the context had to round them (too many digits), in which case the constructor raises.
+        """
+        if value.adjusted() < cls._INTEGER_DIGITS:
+            return cls._from_raw(value)
+        return cls(value)
+
+    @classmethod
+    def from_scaled(cls, n: int) -> QuantizedDecimal:
+        """Wrap an int that is already scaled by 10**DECIMAL_PRECISION, e.g., a uint256 returned by a contract."""
+        return cls._from_exact(
+            cls.CONTEXT.scaleb(decimal.Decimal(n), -cls.DECIMAL_PRECISION)
+        )
+
+    @property
+    def scaled(self) -> int:
+        return int(self.CONTEXT.scaleb(self._value, self.DECIMAL_PRECISION))
 
     @property
     def raw(self):
         return self._value
 
-    @staticmethod
+    @classmethod
     def _quantize(
-        value: decimal.Decimal, rounding=decimal.ROUND_DOWN
+        cls, value: decimal.Decimal, rounding=decimal.ROUND_DOWN
     ) -> decimal.Decimal:
-        return value.quantize(QUANTIZED_EXP, rounding=rounding)
+        return value.quantize(cls.QUANTIZED_EXP, rounding=rounding, context=cls.CONTEXT)
 
     def quantize_to_lower_precision(self, rounding=decimal.ROUND_DOWN):
-        return self._value.quantize(QUANTIZED_EXP, rounding=rounding)
+        return self._value.quantize(
+            self.QUANTIZED_EXP, rounding=rounding, context=self.CONTEXT
+        )
+
+    def _result_type(self, other: Any) -> type:
+        """Variant that an operation between self and other is performed in: the more precise of the two."""
+        if (
+            isinstance(other, DecimalQuantizedDecimal)
+            and other.DECIMAL_PRECISION > self.DECIMAL_PRECISION
+        ):
+            return type(other)
+        return type(self)
 
     def __add__(self, other: DecimalLike):
-        return QuantizedDecimal(self._value + self._get_value(other))
+        if type(other) is type(self):
+            return self._from_exact(self.CONTEXT.add(self._value, other._value))
+        cls = self._result_type(other)
+        return cls(cls.CONTEXT.add(self._value, self._get_value(other)))
 
     def __radd__(self, other: DecimalLike):
-        return QuantizedDecimal(self._value + self._get_value(other))
+        return self + other
 
     def __sub__(self, other: DecimalLike):
-        return QuantizedDecimal(self._value - self._get_value(other))
+        if type(other) is type(self):
+            return self._from_exact(self.CONTEXT.subtract(self._value, other._value))
+        cls = self._result_type(other)
+        return cls(cls.CONTEXT.subtract(self._value, self._get_value(other)))
 
     def __rsub__(self, other: DecimalLike):
-        return QuantizedDecimal(self._get_value(other) - self._value)
+        return type(self)(self.CONTEXT.subtract(self._get_value(other), self._value))
 
     def __mul__(self, other: DecimalLike):
-        return QuantizedDecimal(self._value * self._get_value(other))
+        cls = self._result_type(other)
+        return cls(cls.CONTEXT.multiply(self._value, self._get_value(other)))
 
     def __rmul__(self, other: DecimalLike):
-        return QuantizedDecimal(self._value * self._get_value(other))
+        return self * other
 
     def __truediv__(self, other: DecimalLike):
-        return QuantizedDecimal(self._value / self._get_value(other))
+        cls = self._result_type(other)
+        return cls(cls.CONTEXT.divide(self._value, self._get_value(other)))
 
     def __rtruediv__(self, other: DecimalLike):
-        return QuantizedDecimal(self._get_value(other) / self._value)
+        return type(self)(self.CONTEXT.divide(self._get_value(other), self._value))
 
     def __floordiv__(self, other: DecimalLike):
-        return QuantizedDecimal(self._value // self._get_value(other))
+        cls = self._result_type(other)
+        return cls(cls.CONTEXT.divide_int(self._value, self._get_value(other)))
 
     def __rfloordiv__(self, other: DecimalLike):
-        return QuantizedDecimal(self._get_value(other) // self._value)
+        return type(self)(self.CONTEXT.divide_int(self._get_value(other), self._value))
 
     def __pow__(self, other: DecimalLike):
-        return QuantizedDecimal(self._value ** self._get_value(other))
+        cls = self._result_type(other)
+        return cls(cls.CONTEXT.power(self._value, self._get_value(other)))
 
     def __eq__(self, other: Any):
-        if isinstance(other, QuantizedDecimal):
+        if isinstance(other, DecimalQuantizedDecimal):
             return (
                 self.quantize_to_lower_precision()
                 == other.quantize_to_lower_precision()
@@ -113,7 +234,7 @@ class QuantizedDecimal:
         return self.quantize_to_lower_precision() == other
 
     def __ne__(self, other: Any):
-        if isinstance(other, QuantizedDecimal):
+        if isinstance(other, DecimalQuantizedDecimal):
             return (
                 self.quantize_to_lower_precision()
                 != other.quantize_to_lower_precision()
@@ -125,24 +246,24 @@ class QuantizedDecimal:
     # a > b.approxed() means (not a <= b.approxed()), i.e., a is significantly greater than b.
 
     def __le__(self, other: DecimalLike):
-        if isinstance(other, QuantizedDecimal):
+        if isinstance(other, DecimalQuantizedDecimal):
             return (
                 self.quantize_to_lower_precision()
                 <= other.quantize_to_lower_precision()
             )
-        if isinstance(other, ApproxDecimal):
+        if _is_approx(other):
             return self < other.expected or self == other
-        return self <= QuantizedDecimal(other)
+        return self <= type(self)(other)
 
     def __ge__(self, other: DecimalLike):
-        if isinstance(other, QuantizedDecimal):
+        if isinstance(other, DecimalQuantizedDecimal):
             return (
                 self.quantize_to_lower_precision()
                 >= other.quantize_to_lower_precision()
             )
-        if isinstance(other, ApproxDecimal):
+        if _is_approx(other):
             return self > other.expected or self == other
-        return self >= QuantizedDecimal(other)
+        return self >= type(self)(other)
 
     def __lt__(self, other):
         return not self >= other
@@ -154,10 +275,10 @@ class QuantizedDecimal:
         return hash(self._value)
 
     def __neg__(self):
-        return QuantizedDecimal(-self._value)
+        return self._from_raw(self.CONTEXT.minus(self._value))
 
     def __abs__(self):
-        return QuantizedDecimal(abs(self._value))
+        return self._from_raw(self.CONTEXT.abs(self._value))
 
     def __int__(self):
         return int(self._value)
@@ -168,22 +289,87 @@ class QuantizedDecimal:
     def is_zero(self):
         return self == 0
 
-    def sqrt(self):
-        """For consistency with Decimal"""
-        return self ** QuantizedDecimal("0.5")
+    def sqrt(self, logexpmath: bool = False):
+        """Square root, rounded down. Named like this for consistency with Decimal.
+
+        With `logexpmath=True`, the result is exactly the one of `LogExpMath.sqrt()` instead, which may be off by a
+        few units of the last place in either direction. This is only available with 18 decimals.
+        """
+        n = self.scaled
+        if n < 0:
+            raise decimal.InvalidOperation("square root of negative number")
+        if logexpmath:
+            self._check_logexpmath("sqrt")
+            return self.from_scaled(log_exp_math.sqrt(n))
+        return self.from_scaled(math.isqrt(n * 10**self.DECIMAL_PRECISION))
+
+    def _check_logexpmath(self, name: str):
+        if self.DECIMAL_PRECISION != 18:
+            raise ValueError(f"LogExpMath.{name}() only exists for 18 decimals")
+
+    def exp(self, logexpmath: bool = False):
+        """e**self, rounded down. With `logexpmath=True`, the result of `LogExpMath.exp()` instead."""
+        if logexpmath:
+            self._check_logexpmath("exp")
+            return self.from_scaled(log_exp_math.exp(self.scaled))
+        return self.from_scaled(
+            exp_log.exp(self.scaled, self.DECIMAL_PRECISION, self.MAX_PREC_VALUE)
+        )
+
+    def ln(self, logexpmath: bool = False):
+        """Natural logarithm, truncated towards 0 like the other operations. With `logexpmath=True`, the result of `LogExpMath.ln()` instead."""
+        if logexpmath:
+            self._check_logexpmath("ln")
+            return self.from_scaled(log_exp_math.ln(self.scaled))
+        return self.from_scaled(exp_log.ln(self.scaled, self.DECIMAL_PRECISION))
+
+    def pow(self, other: DecimalLike, logexpmath: bool = False):
+        """self**other, rounded down. Unlike `**`, this is correctly rounded for fractional exponents, too.
+
+        With `logexpmath=True`, the result of `LogExpMath.pow()` instead, which is only accurate to about 1e-14
+        relative (see `pow_down()` and `pow_up()` for the bounds used by FixedPoint).
+        """
+        cls = self._result_type(other)
+        x, y = cls(self), cls(other)
+        if logexpmath:
+            x._check_logexpmath("pow")
+            return cls.from_scaled(log_exp_math.pow(x.scaled, y.scaled))
+        return cls.from_scaled(
+            exp_log.pow(x.scaled, y.scaled, cls.DECIMAL_PRECISION, cls.MAX_PREC_VALUE)
+        )
+
+    def pow_down(self, other: DecimalLike):
+        """Same as `FixedPoint.powDown()`: a lower bound of self**other. Only available with 18 decimals."""
+        self._check_logexpmath("pow")
+        return self.from_scaled(
+            fixed_point.pow_down(self.scaled, type(self)(other).scaled)
+        )
+
+    def pow_up(self, other: DecimalLike):
+        """Same as `FixedPoint.powUp()`: an upper bound of self**other. Only available with 18 decimals."""
+        self._check_logexpmath("pow")
+        return self.from_scaled(
+            fixed_point.pow_up(self.scaled, type(self)(other).scaled)
+        )
 
     def floor(self):
-        return QuantizedDecimal(math.floor(self._value))
+        return type(self)(math.floor(self._value))
 
     def mul_up(self, other: DecimalLike):
-        context = decimal.getcontext().copy()
+        cls = self._result_type(other)
+        context = cls.CONTEXT.copy()
         context.rounding = decimal.ROUND_UP
-        return QuantizedDecimal(self._value * self._get_value(other), context=context)
+        return cls(
+            cls.CONTEXT.multiply(self._value, self._get_value(other)), context=context
+        )
 
     def div_up(self, other: DecimalLike):
-        context = decimal.getcontext().copy()
+        cls = self._result_type(other)
+        context = cls.CONTEXT.copy()
         context.rounding = decimal.ROUND_UP
-        return QuantizedDecimal(self._value / self._get_value(other), context=context)
+        return cls(
+            cls.CONTEXT.divide(self._value, self._get_value(other)), context=context
+        )
 
     # mul_down and div_down are the defaults but we put them here for consistency so that one can quickly swap out one for the other.
 
@@ -193,13 +379,41 @@ class QuantizedDecimal:
     def div_down(self, other: DecimalLike):
         return self / other
 
+    def _fused_operands(self, *others: DecimalLike) -> tuple[type, list[int]]:
+        """Variant with the most decimals among self and others, and all of them as scaled ints of that variant."""
+        cls = type(self)
+        for other in others:
+            if (
+                isinstance(other, DecimalQuantizedDecimal)
+                and other.DECIMAL_PRECISION > cls.DECIMAL_PRECISION
+            ):
+                cls = type(other)
+        return cls, [cls(x).scaled for x in (self,) + others]
+
+    def mul_div_down(self, b: DecimalLike, c: DecimalLike):
+        """self * b / c, rounded down (towards 0) only once at the end. Like `FullMath.mulDiv()` for non-negative
+        values. Arguments that aren't QuantizedDecimals are converted first."""
+        cls, (x, y, z) = self._fused_operands(b, c)
+        return cls.from_scaled(_div_rounded(x * y, z, False))
+
+    def mul_div_up(self, b: DecimalLike, c: DecimalLike):
+        """Like `mul_div_down()`, but rounded up (away from 0). Like `FullMath.mulDivRoundingUp()`."""
+        cls, (x, y, z) = self._fused_operands(b, c)
+        return cls.from_scaled(_div_rounded(x * y, z, True))
+
+    def mul_add(self, b: DecimalLike, c: DecimalLike):
+        """self * b + c, rounded down (towards 0) only once at the end."""
+        cls, (x, y, z) = self._fused_operands(b, c)
+        one = 10**cls.DECIMAL_PRECISION
+        return cls.from_scaled(_div_rounded(x * y + z * one, one, False))
+
     @classmethod
     def from_float(cls, value: float) -> QuantizedDecimal:
         return cls(value)
 
     @staticmethod
     def _get_value(value: DecimalLike) -> decimal.Decimal:
-        if isinstance(value, QuantizedDecimal):
+        if isinstance(value, DecimalQuantizedDecimal):
             return value._value  # pylint: disable=protected-access
         elif isinstance(value, (int, str)):
             return decimal.Decimal(value)
@@ -219,20 +433,39 @@ class QuantizedDecimal:
             return format(self._value, format_spec)
 
     def approxed(self, **kwargs):
-        return pytest.approx(self.raw, **kwargs)
+        from tests.support.quantized_decimal_approx import approxed
+
+        return approxed(self.raw, **kwargs)
+
+
+# The Decimal-backed implementation above is always available under this name, regardless of the backend selected
+# below. Its methods refer to it by this name so that they keep working when `QuantizedDecimal` is rebound.
+DecimalQuantizedDecimal = QuantizedDecimal
+DecimalQuantizedDecimal._variants[DECIMAL_PRECISION] = DecimalQuantizedDecimal
+DecimalQuantizedDecimal._intern_constants()
+
+
+def _unpickle(ndecimals: int, value: decimal.Decimal) -> DecimalQuantizedDecimal:
+    return DecimalQuantizedDecimal[ndecimals]._from_raw(value)
 
 
-# The following is LEGACY code. In new code just write a >= b.approxed()
-# Sry monkey patching...
-from _pytest.python_api import ApproxDecimal
+def __getattr__(name: str):
+    # Variants are pickled by name, which is "QuantizedDecimal[n]". This creates them on demand when unpickling in a
+    # fresh process.
+    match = re.fullmatch(r"QuantizedDecimal\[(\d+)\]", name)
+    if match is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return DecimalQuantizedDecimal[int(match[1])]
 
-ApproxDecimal.__le__ = (
-    lambda self, other: self.expected <= other.expected or self == other
-)
-ApproxDecimal.__ge__ = (
-    lambda self, other: self.expected >= other.expected or self == other
-)
 
+# Backend selection. QUANTIZED_DECIMAL_BACKEND=int swaps in the integer-backed implementation (see
+# quantized_decimal_int.py) for every module that imports QuantizedDecimal from here. The two are bit-identical; the
+# int one is a lot faster.
+QUANTIZED_DECIMAL_BACKEND = os.environ.get("QUANTIZED_DECIMAL_BACKEND", "decimal")
+if QUANTIZED_DECIMAL_BACKEND == "int":
+    from tests.support.quantized_decimal_int import QuantizedDecimal
+elif QUANTIZED_DECIMAL_BACKEND != "decimal":
+    raise ValueError(f"Unknown QUANTIZED_DECIMAL_BACKEND: {QUANTIZED_DECIMAL_BACKEND}")
 
 DecimalLike = Union[int, str, decimal.Decimal, QuantizedDecimal]
 
@@ -0,0 +1,21 @@
+# pytest integration of QuantizedDecimal: `x.approxed()` and comparisons with it.
+#
+# This is kept separate from the numeric core so that importing QuantizedDecimal does not import pytest. It is loaded
+# by tests/conftest.py, and otherwise on the first call to approxed().
+
+import pytest
+from _pytest.python_api import ApproxDecimal
+
+
+def approxed(value, **kwargs) -> ApproxDecimal:
+    return pytest.approx(value, **kwargs)
+
+
+# The following is LEGACY code. In new code just write a >= b.approxed()
+# Sry monkey patching...
+ApproxDecimal.__le__ = (
+    lambda self, other: self.expected <= other.expected or self == other
+)
+ApproxDecimal.__ge__ = (
+    lambda self, other: self.expected >= other.expected or self == other
+)
@@ -0,0 +1,357 @@
+# Arrays of fixed-point numbers with the semantics of QuantizedDecimal.
+#
+# Values are stored as a numpy object array of scaled Python ints (like the int backend in `quantized_decimal_int.py`),
+# so there is no overflow and each element of a result is *exactly* what the corresponding scalar QuantizedDecimal
+# operation would return, including the rounding of intermediate results to MAX_PREC_VALUE significant digits and
+# decimal.InvalidOperation for out-of-range results. Operations are evaluated for the whole array at once; only the
+# (rare) elements where the context rounding makes a difference are passed through the scalar rounding helpers.
+#
+# Indexing with an int and reductions return scalar `QuantizedDecimal`s of the selected backend.
+
+from __future__ import annotations
+
+import decimal
+import math
+import re
+from typing import Any, Iterable, Union
+
+import numpy as np
+
+from tests.support.quantized_decimal import DecimalQuantizedDecimal
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_decimal import max_prec_for_decimals
+from tests.support.quantized_decimal_int import QuantizedDecimal as IntQuantizedDecimal
+from tests.support.quantized_decimal_int import (
+    _div_rounded,
+    _ensure_pow10,
+    _ndigits,
+    _round_product,
+    _round_quotient,
+)
+
+DECIMAL_PRECISION = 18
+MAX_PREC_VALUE = max_prec_for_decimals(DECIMAL_PRECISION)
+
+_SCALARS = (DecimalQuantizedDecimal, IntQuantizedDecimal)
+
+
+def _check_range(a: np.ndarray, limit: int) -> np.ndarray:
+    """Like `quantized_decimal_int._check_range()`, for all elements."""
+    if a.size and np.max(np.abs(a)) >= limit:
+        raise decimal.InvalidOperation(
+            "quantize result has too many digits for current context"
+        )
+    return a
+
+
+class QuantizedDecimalArray:
+    """Array of fixed-point numbers with DECIMAL_PRECISION decimals. All operations are elementwise (with numpy
+    broadcasting) and round like the respective `QuantizedDecimal` operation.
+
+    `QuantizedDecimalArray[n]` is the variant with n decimals, corresponding to `QuantizedDecimal[n]`. Like for the
+    scalars, operations between different variants are performed at the higher precision.
+    """
+
+    DECIMAL_PRECISION = DECIMAL_PRECISION
+    MAX_PREC_VALUE = MAX_PREC_VALUE
+    ONE = 10**DECIMAL_PRECISION
+    SCALAR = D
+    _SCALED_LIMIT = 10**MAX_PREC_VALUE
+
+    _variants: dict[int, type] = {}
+
+    # Make numpy defer to our reflected operators, e.g., for `np_array * qd_array`.
+    __array_ufunc__ = None
+
+    def __class_getitem__(cls, ndecimals: int) -> type:
+        try:
+            return cls._variants[ndecimals]
+        except KeyError:
+            pass
+        max_prec = max_prec_for_decimals(ndecimals)
+        _ensure_pow10(2 * max_prec)
+        variant = type(
+            f"QuantizedDecimalArray[{ndecimals}]",
+            (QuantizedDecimalArray,),
+            {
+                "__module__": __name__,
+                "DECIMAL_PRECISION": ndecimals,
+                "MAX_PREC_VALUE": max_prec,
+                "ONE": 10**ndecimals,
+                "SCALAR": D[ndecimals],
+                "_SCALED_LIMIT": 10**max_prec,
+            },
+        )
+        return cls._variants.setdefault(ndecimals, variant)
+
+    def __init__(self, values: Union[QuantizedDecimalArray, Iterable[Any]] = ()):
+        if isinstance(values, QuantizedDecimalArray):
+            self._scaled = self._rescale(values._scaled, values.DECIMAL_PRECISION)
+            return
+        values = np.asarray(values, dtype=object)
+        self._scaled = np.asarray(
+            np.frompyfunc(self._scalar_to_scaled, 1, 1)(values), dtype=object
+        )
+
+    @classmethod
+    def from_scaled(cls, values: Iterable[int]) -> QuantizedDecimalArray:
+        """Wrap ints that are already scaled by 10**DECIMAL_PRECISION, e.g., uint256s returned by a contract."""
+        ret = object.__new__(cls)
+        ret._scaled = np.asarray(values, dtype=object)
+        return ret
+
+    @classmethod
+    def full(cls, shape, value: Any) -> QuantizedDecimalArray:
+        return cls.from_scaled(
+            np.full(shape, cls._scalar_to_scaled(value), dtype=object)
+        )
+
+    @property
+    def scaled(self) -> np.ndarray:
+        return self._scaled
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self._scaled.shape
+
+    def __len__(self):
+        return len(self._scaled)
+
+    def __getitem__(self, index):
+        item = self._scaled[index]
+        if isinstance(item, np.ndarray):
+            return self.from_scaled(item)
+        return self.SCALAR.from_scaled(item)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def tolist(self) -> list:
+        return [x.tolist() if isinstance(x, QuantizedDecimalArray) else x for x in self]
+
+    @classmethod
+    def _rescale(cls, scaled: np.ndarray, ndecimals: int) -> np.ndarray:
+        """Scaled values with `ndecimals` decimals converted to our decimals, rounding towards 0 like QuantizedDecimal."""
+        if ndecimals <= cls.DECIMAL_PRECISION:
+            return scaled * 10 ** (cls.DECIMAL_PRECISION - ndecimals)
+        factor = 10 ** (ndecimals - cls.DECIMAL_PRECISION)
+        return np.sign(scaled) * (np.abs(scaled) // factor)
+
+    @classmethod
+    def _scalar_to_scaled(cls, value: Any) -> int:
+        if isinstance(value, _SCALARS):
+            if value.DECIMAL_PRECISION <= cls.DECIMAL_PRECISION:
+                return value.scaled * 10 ** (
+                    cls.DECIMAL_PRECISION - value.DECIMAL_PRECISION
+                )
+            n = abs(value.scaled) // 10 ** (
+                value.DECIMAL_PRECISION - cls.DECIMAL_PRECISION
+            )
+            return n if value.scaled >= 0 else -n
+        return cls.SCALAR(value).scaled
+
+    def _result_type(self, other: Any) -> type:
+        """Variant that an operation between self and other is performed in: the more precise of the two."""
+        if (
+            isinstance(other, (QuantizedDecimalArray,) + _SCALARS)
+            and other.DECIMAL_PRECISION > self.DECIMAL_PRECISION
+        ):
+            return QuantizedDecimalArray[other.DECIMAL_PRECISION]
+        return type(self)
+
+    def _operands(self, other: Any) -> tuple[type, np.ndarray, Any]:
+        """Result type and both operands scaled to its decimals."""
+        cls = self._result_type(other)
+        a = cls._rescale(self._scaled, self.DECIMAL_PRECISION)
+        if type(other) is int:
+            return cls, a, other * cls.ONE
+        if isinstance(other, QuantizedDecimalArray):
+            return cls, a, cls._rescale(other._scaled, other.DECIMAL_PRECISION)
+        if isinstance(other, (np.ndarray, list, tuple)):
+            return cls, a, cls(other)._scaled
+        return cls, a, cls._scalar_to_scaled(other)
+
+    def __add__(self, other: Any):
+        cls, a, b = self._operands(other)
+        return cls.from_scaled(_check_range(a + b, cls._SCALED_LIMIT))
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Any):
+        cls, a, b = self._operands(other)
+        return cls.from_scaled(_check_range(a - b, cls._SCALED_LIMIT))
+
+    def __rsub__(self, other: Any):
+        return -self + other
+
+    def __neg__(self):
+        return self.from_scaled(-self._scaled)
+
+    def __abs__(self):
+        return self.from_scaled(np.abs(self._scaled))
+
+    def _mul(self, other: Any, round_up: bool):
+        if type(other) is int:
+            # The product is exact (o/w it's out of range anyway).
+            return self.from_scaled(
+                _check_range(self._scaled * other, self._SCALED_LIMIT)
+            )
+        cls, a, b = self._operands(other)
+        p = a * b
+        abs_p = np.abs(p)
+        q = abs_p // cls.ONE
+        if round_up:
+            q += abs_p % cls.ONE != 0
+        # Products with more than MAX_PREC_VALUE digits are rounded by the context first.
+        rounded = abs_p >= cls._SCALED_LIMIT
+        if rounded.any():
+            q[rounded] = np.frompyfunc(
+                lambda n: _round_product(n, cls.ONE, cls.MAX_PREC_VALUE, round_up), 1, 1
+            )(abs_p[rounded])
+        return cls.from_scaled(_check_range(np.sign(p) * q, cls._SCALED_LIMIT))
+
+    def __mul__(self, other: Any):
+        return self._mul(other, False)
+
+    __rmul__ = __mul__
+
+    def mul_down(self, other: Any):
+        return self._mul(other, False)
+
+    def mul_up(self, other: Any):
+        return self._mul(other, True)
+
+    @classmethod
+    def _div(cls, a, b, round_up: bool):
+        a, b = np.broadcast_arrays(
+            np.asarray(a, dtype=object), np.asarray(b, dtype=object)
+        )
+        zero = b == 0
+        if zero.any():
+            if a[zero][0] == 0:
+                raise decimal.InvalidOperation("[<class 'decimal.DivisionUndefined'>]")
+            raise decimal.DivisionByZero("[<class 'decimal.DivisionByZero'>]")
+        abs_a, abs_b = np.abs(a) * cls.ONE, np.abs(b)
+        q, r = abs_a // abs_b, abs_a % abs_b
+        if round_up:
+            q = q + (r != 0)
+
+        # Same shortcut as `_round_quotient()`, with a lower bound of the number of extra digits the context keeps
+        # for all elements: The quantized result is determined unless the exact quotient is within
+        # 10**-k_lo * 10**-DECIMAL_PRECISION of the next multiple of 10**-DECIMAL_PRECISION (or the previous one when
+        # rounding up).
+        if r.size and (r != 0).any():
+            k_lo = max(cls.MAX_PREC_VALUE - _ndigits(int(np.max(q)) + 1) - 1, 0)
+            if round_up:
+                undecided = (r != 0) & (2 * r * 10**k_lo <= abs_b)
+            else:
+                undecided = (r != 0) & (2 * (abs_b - r) * 10**k_lo <= abs_b)
+            if undecided.any():
+                q[undecided] = np.frompyfunc(
+                    lambda n, d: _round_quotient(
+                        n, d, cls.ONE, cls.MAX_PREC_VALUE, round_up
+                    ),
+                    2,
+                    1,
+                )(np.abs(a[undecided]), abs_b[undecided])
+        return cls.from_scaled(
+            _check_range(np.sign(a) * np.sign(b) * q, cls._SCALED_LIMIT)
+        )
+
+    def __truediv__(self, other: Any):
+        cls, a, b = self._operands(other)
+        return cls._div(a, b, False)
+
+    def __rtruediv__(self, other: Any):
+        cls, a, b = self._operands(other)
+        return cls._div(b, a, False)
+
+    def div_down(self, other: Any):
+        return self / other
+
+    def div_up(self, other: Any):
+        cls, a, b = self._operands(other)
+        return cls._div(a, b, True)
+
+    def mul_div_down(self, b: Any, c: Any):
+        """self * b / c for each element, rounded down (towards 0) only once at the end, like
+        `QuantizedDecimal.mul_div_down()`."""
+        cls, x, y = self._operands(b)
+        _, _, z = cls.from_scaled(x)._operands(c)
+        q = np.frompyfunc(_div_rounded, 3, 1)(x * y, z, False).astype(object)
+        return cls.from_scaled(_check_range(q, cls._SCALED_LIMIT))
+
+    def _compare(self, other: Any, op) -> np.ndarray:
+        cls, a, b = self._operands(other)
+        return op(a, b).astype(bool)
+
+    def __eq__(self, other: Any):
+        return self._compare(other, np.equal)
+
+    def __ne__(self, other: Any):
+        return self._compare(other, np.not_equal)
+
+    def __lt__(self, other: Any):
+        return self._compare(other, np.less)
+
+    def __le__(self, other: Any):
+        return self._compare(other, np.less_equal)
+
+    def __gt__(self, other: Any):
+        return self._compare(other, np.greater)
+
+    def __ge__(self, other: Any):
+        return self._compare(other, np.greater_equal)
+
+    __hash__ = None
+
+    def sqrt(self):
+        """Square root of each element, rounded down."""
+        if self._scaled.size and np.min(self._scaled) < 0:
+            raise decimal.InvalidOperation("square root of negative number")
+        isqrt = np.frompyfunc(math.isqrt, 1, 1)
+        return self.from_scaled(
+            np.asarray(isqrt(self._scaled * self.ONE), dtype=object)
+        )
+
+    # Reductions are over all elements and return a scalar.
+
+    def sum(self):
+        """Exact sum. Raises if any partial sum is out of range, like adding up the scalars would."""
+        if not self._scaled.size:
+            return self.SCALAR.from_scaled(0)
+        partial_sums = np.cumsum(self._scaled.ravel())
+        _check_range(partial_sums, self._SCALED_LIMIT)
+        return self.SCALAR.from_scaled(partial_sums[-1])
+
+    def prod(self):
+        """Product, computed left to right with mul_down() like `functools.reduce(operator.mul, ...)`."""
+        ret = self.SCALAR(1)
+        for x in self._scaled.ravel():
+            ret = ret * self.SCALAR.from_scaled(x)
+        return ret
+
+    def dot(self, other: Any):
+        """Sum of the elementwise mul_down() products."""
+        return (self * other).sum()
+
+    def min(self):
+        return self.SCALAR.from_scaled(np.min(self._scaled))
+
+    def max(self):
+        return self.SCALAR.from_scaled(np.max(self._scaled))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({[str(x) for x in self.tolist()]})"
+
+
+QuantizedDecimalArray._variants[DECIMAL_PRECISION] = QuantizedDecimalArray
+
+
+def __getattr__(name: str):
+    # See `quantized_decimal.__getattr__()`.
+    match = re.fullmatch(r"QuantizedDecimalArray\[(\d+)\]", name)
+    if match is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return QuantizedDecimalArray[int(match[1])]
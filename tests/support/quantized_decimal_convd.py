@@ -5,7 +5,7 @@ from tests.support.quantized_decimal_100 import QuantizedDecimal as D3
 
 
 def convd(x, totype, dofloat=True, dostr=True):
-    """totype: one of D, D2, D3, i.e., some QuantizedDecimal implementation.
+    """totype: one of D, D2, D3, i.e., some QuantizedDecimal[n].
 
     `dofloat`: Also convert floats.
 
@@ -16,8 +16,9 @@ def convd(x, totype, dofloat=True, dostr=True):
     def go(y):
         if isinstance(y, decimal.Decimal):
             return totype(y)
-        elif isinstance(y, (D, D2, D3)):
-            return totype(y.raw)
+        elif isinstance(y, D):
+            # Exact when converting to more decimals, rounds down o/w.
+            return totype(y)
         elif dofloat and isinstance(y, float):
             return totype(y)
         elif dostr and isinstance(y, str):
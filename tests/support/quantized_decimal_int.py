@@ -0,0 +1,587 @@
+# Integer-backed variant of QuantizedDecimal.
+#
+# Values are stored as scaled Python ints, i.e., the same representation as a Solidity uint256 with 18 decimals (or n
+# decimals for QuantizedDecimal[n]), instead of quantized `decimal.Decimal`s. The semantics are *exactly* those of the
+# Decimal-backed implementation in `quantized_decimal.py` running at MAX_PREC_VALUE digits: Where that implementation
+# rounds an intermediate result to MAX_PREC_VALUE significant digits (ROUND_HALF_EVEN) before quantizing it
+# (ROUND_DOWN, or ROUND_UP for mul_up() / div_up()), we emulate that rounding on integers. Likewise, we raise
+# decimal.InvalidOperation where quantize() would.
+#
+# Operations without a cheap integer equivalent (`**`, sqrt(), and mixing with non-quantized Decimals, floats or
+# strings) fall back to the Decimal arithmetic, so they produce the same results as well, just not faster.
+#
+# To use this for all code that imports QuantizedDecimal from `quantized_decimal`, set QUANTIZED_DECIMAL_BACKEND=int.
+
+from __future__ import annotations
+
+import decimal
+import math
+import re
+import sys
+from functools import total_ordering
+from typing import Any, Union
+
+from tests.support import exp_log
+from tests.support.libraries import fixed_point, log_exp_math
+
+MAX_PREC_VALUE = 78
+DECIMAL_PRECISION = 18
+
+ONE = 10**DECIMAL_PRECISION
+
+_POW10 = [10**i for i in range(2 * MAX_PREC_VALUE + 1)]
+
+
+def _is_approx(value: Any) -> bool:
+    # `value` can only be a pytest.approx() if pytest is loaded. We don't import it ourselves, see
+    # quantized_decimal_approx.py.
+    python_api = sys.modules.get("_pytest.python_api")
+    return python_api is not None and isinstance(value, python_api.ApproxDecimal)
+
+
+def _ensure_pow10(n: int):
+    while len(_POW10) <= n:
+        _POW10.append(_POW10[-1] * 10)
+
+
+def _ndigits(n: int) -> int:
+    """Number of decimal digits of n > 0."""
+    # 1233 / 4096 ≈ log10(2). This is either exact or one too low.
+    t = (n.bit_length() * 1233) >> 12
+    if t >= len(_POW10):
+        return len(str(n))
+    return t + 1 if n >= _POW10[t] else t
+
+
+def _check_range(n: int, limit: int) -> int:
+    """Scaled values must stay below `limit` = 10**MAX_PREC_VALUE, o/w they don't fit into the context and quantize()
+    raises."""
+    if -limit < n < limit:
+        return n
+    raise decimal.InvalidOperation(
+        "quantize result has too many digits for current context"
+    )
+
+
+def _round_product(p: int, one: int, max_prec: int, round_up: bool) -> int:
+    """p = |a * b| with 2 * DECIMAL_PRECISION decimals. Round to MAX_PREC_VALUE significant digits, then
+    quantize."""
+    if p >= _POW10[max_prec]:
+        m = _ndigits(p) - max_prec
+        q, r = divmod(p, _POW10[m])
+        if 2 * r > _POW10[m] or (2 * r == _POW10[m] and q & 1):
+            q += 1
+        p = q * _POW10[m]
+    q, r = divmod(p, one)
+    if round_up and r:
+        q += 1
+    return q
+
+
+def _round_quotient(a: int, b: int, one: int, max_prec: int, round_up: bool) -> int:
+    """|a / b| where a, b are scaled. Round to MAX_PREC_VALUE significant digits, then quantize."""
+    q, r = divmod(a * one, b)
+    if r == 0:
+        return q
+
+    # Number of significant digits the context keeps beyond the quantization exponent. k_lo <= k so that we can
+    # usually decide without computing k.
+    k_lo = max_prec - ((q.bit_length() * 1233) >> 12) - 1
+    if k_lo < 0:
+        k_lo = 0
+    if round_up:
+        if 2 * r * _POW10[k_lo] > b:
+            return q + 1
+    elif 2 * (b - r) * _POW10[k_lo] > b:
+        return q
+
+    k = max_prec - (_ndigits(q) if q else 0)
+    if k < 0:
+        k = 0
+    fl, rem = divmod(r * _POW10[k], b)
+    odd = fl & 1 if k > 0 else q & 1
+    if 2 * rem > b or (2 * rem == b and odd):
+        fl += 1
+    if round_up:
+        return q + 1 if fl > 0 else q
+    return q + 1 if fl == _POW10[k] else q
+
+
+def _div_rounded(n: int, d: int, round_up: bool) -> int:
+    """n / d rounded towards 0, or away from 0 if `round_up`, without any intermediate rounding."""
+    if d == 0:
+        if n == 0:
+            raise decimal.InvalidOperation("[<class 'decimal.DivisionUndefined'>]")
+        raise decimal.DivisionByZero("[<class 'decimal.DivisionByZero'>]")
+    q, r = divmod(abs(n), abs(d))
+    if round_up and r:
+        q += 1
+    return q if (n < 0) == (d < 0) else -q
+
+
+@total_ordering
+class QuantizedDecimal:
+    """Drop-in replacement for the Decimal-backed `QuantizedDecimal`, storing the value as an int scaled by
+    10**DECIMAL_PRECISION. `QuantizedDecimal[n]` is the variant with n decimals, like for the Decimal-backed one.
+    """
+
+    __slots__ = ("_int",)
+
+    DECIMAL_PRECISION = DECIMAL_PRECISION
+    MAX_PREC_VALUE = MAX_PREC_VALUE
+    ONE = ONE
+    CONTEXT = decimal.Context(prec=MAX_PREC_VALUE)
+    QUANTIZED_EXP = decimal.Decimal(1).scaleb(-DECIMAL_PRECISION)
+    DECIMAL_MULT = QUANTIZED_EXP * decimal.Decimal(ONE)
+    _SCALED_LIMIT = 10**MAX_PREC_VALUE
+
+    _variants: dict[int, type] = {}
+
+    def __class_getitem__(cls, ndecimals: int) -> type:
+        try:
+            return cls._variants[ndecimals]
+        except KeyError:
+            pass
+        from tests.support.quantized_decimal import max_prec_for_decimals
+
+        max_prec = max_prec_for_decimals(ndecimals)
+        _ensure_pow10(2 * max_prec)
+        quantized_exp = decimal.Decimal(1).scaleb(-ndecimals)
+        variant = type(
+            f"QuantizedDecimal[{ndecimals}]",
+            (QuantizedDecimal,),
+            {
+                "__module__": __name__,
+                "__slots__": (),
+                "DECIMAL_PRECISION": ndecimals,
+                "MAX_PREC_VALUE": max_prec,
+                "ONE": 10**ndecimals,
+                "CONTEXT": decimal.Context(prec=max_prec),
+                "QUANTIZED_EXP": quantized_exp,
+                "DECIMAL_MULT": quantized_exp * decimal.Decimal(10**ndecimals),
+                "_SCALED_LIMIT": 10**max_prec,
+            },
+        )
+        return cls._variants.setdefault(ndecimals, variant)
+
+    def __init__(self, value="0", context: decimal.Context = None):
+        if type(value) is type(self):
+            self._int = value._int
+        elif type(value) is int and (
+            -self._SCALED_LIMIT < value * self.ONE < self._SCALED_LIMIT
+        ):
+            self._int = value * self.ONE
+        elif isinstance(value, QuantizedDecimal):
+            # Exact if we have at least as many decimals as `value`, o/w rounds down.
+            if self.DECIMAL_PRECISION >= value.DECIMAL_PRECISION:
+                n = value._int * (self.ONE // value.ONE)
+            else:
+                n = abs(value._int) // (value.ONE // self.ONE)
+                if value._int < 0:
+                    n = -n
+            self._int = _check_range(n, self._SCALED_LIMIT)
+        else:
+            # Same steps as the Decimal-backed implementation.
+            rounding = decimal.ROUND_DOWN
+            if isinstance(value, decimal.Decimal):
+                if context is not None:
+                    rounding = context.rounding
+            else:
+                if isinstance(value, float):
+                    rounding = decimal.ROUND_HALF_DOWN
+                value = decimal.Decimal(value, context=context)
+            quantized = self.CONTEXT.multiply(value, self.DECIMAL_MULT).quantize(
+                self.QUANTIZED_EXP, rounding=rounding, context=self.CONTEXT
+            )
+            self._int = int(self.CONTEXT.scaleb(quantized, self.DECIMAL_PRECISION))
+
+    @classmethod
+    def from_scaled(cls, n: int) -> QuantizedDecimal:
+        """Wrap an int that is already scaled by 10**DECIMAL_PRECISION, e.g., a uint256 returned by a contract."""
+        ret = object.__new__(cls)
+        ret._int = n
+        return ret
+
+    @property
+    def scaled(self) -> int:
+        return self._int
+
+    def __reduce__(self):
+        return _unpickle, (self.DECIMAL_PRECISION, self._int)
+
+    @property
+    def raw(self) -> decimal.Decimal:
+        return self.CONTEXT.scaleb(decimal.Decimal(self._int), -self.DECIMAL_PRECISION)
+
+    def quantize_to_lower_precision(self, rounding=decimal.ROUND_DOWN):
+        # Our values are always quantized already.
+        return self.raw
+
+    def _fallback(self, other: Any) -> decimal.Decimal:
+        """Operand as a Decimal, for the Decimal-arithmetic slow path."""
+        if isinstance(other, (int, str)):
+            return decimal.Decimal(other)
+        return other
+
+    def _common(self, other: QuantizedDecimal):
+        """self and other, which has a different precision, converted to the more precise of the two.
+
+        We don't check the range of the converted value: It's only an operand, just like the Decimal-backed
+        implementation would use the exact value of the less precise operand."""
+        if self.DECIMAL_PRECISION > other.DECIMAL_PRECISION:
+            return self, self.from_scaled(other._int * (self.ONE // other.ONE))
+        return other.from_scaled(self._int * (other.ONE // self.ONE)), other
+
+    def __add__(self, other: DecimalLike):
+        if type(other) is type(self):
+            return self.from_scaled(
+                _check_range(self._int + other._int, self._SCALED_LIMIT)
+            )
+        if type(other) is int:
+            return self.from_scaled(
+                _check_range(self._int + other * self.ONE, self._SCALED_LIMIT)
+            )
+        if isinstance(other, QuantizedDecimal):
+            a, b = self._common(other)
+            return a + b
+        return type(self)(self.CONTEXT.add(self.raw, self._fallback(other)))
+
+    __radd__ = __add__
+
+    def __sub__(self, other: DecimalLike):
+        if type(other) is type(self):
+            return self.from_scaled(
+                _check_range(self._int - other._int, self._SCALED_LIMIT)
+            )
+        if type(other) is int:
+            return self.from_scaled(
+                _check_range(self._int - other * self.ONE, self._SCALED_LIMIT)
+            )
+        if isinstance(other, QuantizedDecimal):
+            a, b = self._common(other)
+            return a - b
+        return type(self)(self.CONTEXT.subtract(self.raw, self._fallback(other)))
+
+    def __rsub__(self, other: DecimalLike):
+        if type(other) is int:
+            return self.from_scaled(
+                _check_range(other * self.ONE - self._int, self._SCALED_LIMIT)
+            )
+        return type(self)(self.CONTEXT.subtract(self._fallback(other), self.raw))
+
+    def _mul(self, other: DecimalLike, round_up: bool):
+        if type(other) is type(self):
+            p = self._int * other._int
+            if p >= 0:
+                n = _round_product(p, self.ONE, self.MAX_PREC_VALUE, round_up)
+            else:
+                n = -_round_product(-p, self.ONE, self.MAX_PREC_VALUE, round_up)
+            return self.from_scaled(_check_range(n, self._SCALED_LIMIT))
+        if type(other) is int:
+            # The product is exact (o/w it's out of range anyway).
+            return self.from_scaled(_check_range(self._int * other, self._SCALED_LIMIT))
+        if isinstance(other, QuantizedDecimal):
+            a, b = self._common(other)
+            return a._mul(b, round_up)
+        return None
+
+    def __mul__(self, other: DecimalLike):
+        ret = self._mul(other, False)
+        if ret is None:
+            return type(self)(self.CONTEXT.multiply(self.raw, self._fallback(other)))
+        return ret
+
+    __rmul__ = __mul__
+
+    def _div(self, a: int, b: int, round_up: bool):
+        if b == 0:
+            if a == 0:
+                raise decimal.InvalidOperation("[<class 'decimal.DivisionUndefined'>]")
+            raise decimal.DivisionByZero("[<class 'decimal.DivisionByZero'>]")
+        n = _round_quotient(abs(a), abs(b), self.ONE, self.MAX_PREC_VALUE, round_up)
+        if (a < 0) != (b < 0):
+            n = -n
+        return self.from_scaled(_check_range(n, self._SCALED_LIMIT))
+
+    def __truediv__(self, other: DecimalLike):
+        if type(other) is type(self):
+            return self._div(self._int, other._int, False)
+        if type(other) is int:
+            return self._div(self._int, other * self.ONE, False)
+        if isinstance(other, QuantizedDecimal):
+            a, b = self._common(other)
+            return a / b
+        return type(self)(self.CONTEXT.divide(self.raw, self._fallback(other)))
+
+    def __rtruediv__(self, other: DecimalLike):
+        if type(other) is int:
+            return self._div(other * self.ONE, self._int, False)
+        return type(self)(self.CONTEXT.divide(self._fallback(other), self.raw))
+
+    def __floordiv__(self, other: DecimalLike):
+        if type(other) is type(self):
+            return self._int_div(self._int, other._int)
+        if type(other) is int:
+            return self._int_div(self._int, other * self.ONE)
+        if isinstance(other, QuantizedDecimal):
+            a, b = self._common(other)
+            return a // b
+        return type(self)(self.CONTEXT.divide_int(self.raw, self._fallback(other)))
+
+    def __rfloordiv__(self, other: DecimalLike):
+        if type(other) is int:
+            return self._int_div(other * self.ONE, self._int)
+        return type(self)(self.CONTEXT.divide_int(self._fallback(other), self.raw))
+
+    def _int_div(self, a: int, b: int):
+        # Decimal's `//` truncates towards 0.
+        if b == 0:
+            if a == 0:
+                raise decimal.InvalidOperation("[<class 'decimal.DivisionUndefined'>]")
+            raise decimal.DivisionByZero("[<class 'decimal.DivisionByZero'>]")
+        q = abs(a) // abs(b)
+        if (a < 0) != (b < 0):
+            q = -q
+        return self.from_scaled(_check_range(q * self.ONE, self._SCALED_LIMIT))
+
+    def __pow__(self, other: DecimalLike):
+        if isinstance(other, QuantizedDecimal) and type(other) is not type(self):
+            a, b = self._common(other)
+            return a**b
+        return type(self)(self.CONTEXT.power(self.raw, self._get_value(other)))
+
+    def __eq__(self, other: Any):
+        if type(other) is type(self):
+            return self._int == other._int
+        if type(other) is int:
+            return self._int == other * self.ONE
+        if isinstance(other, QuantizedDecimal):
+            return self.raw == other.raw
+        return self.raw == other
+
+    def __ne__(self, other: Any):
+        return not self == other
+
+    # Comparison operators are such that we can write a >= b.approxed(). Note that this relationship is not transitive,
+    # as is '=='.
+    # a > b.approxed() means (not a <= b.approxed()), i.e., a is significantly greater than b.
+
+    def __le__(self, other: DecimalLike):
+        if type(other) is type(self):
+            return self._int <= other._int
+        if type(other) is int:
+            return self._int <= _check_range(other * self.ONE, self._SCALED_LIMIT)
+        if isinstance(other, QuantizedDecimal):
+            return self.raw <= other.raw
+        if _is_approx(other):
+            return self < other.expected or self == other
+        return self <= type(self)(other)
+
+    def __ge__(self, other: DecimalLike):
+        if type(other) is type(self):
+            return self._int >= other._int
+        if type(other) is int:
+            return self._int >= _check_range(other * self.ONE, self._SCALED_LIMIT)
+        if isinstance(other, QuantizedDecimal):
+            return self.raw >= other.raw
+        if _is_approx(other):
+            return self > other.expected or self == other
+        return self >= type(self)(other)
+
+    def __lt__(self, other):
+        return not self >= other
+
+    def __gt__(self, other):
+        return not self <= other
+
+    def __hash__(self):
+        return hash(self.raw)
+
+    def __neg__(self):
+        return self.from_scaled(-self._int)
+
+    def __abs__(self):
+        return self.from_scaled(abs(self._int))
+
+    def __int__(self):
+        if self._int >= 0:
+            return self._int // self.ONE
+        return -(-self._int // self.ONE)
+
+    def __float__(self):
+        # int / int is correctly rounded, like float(Decimal).
+        return self._int / self.ONE
+
+    def is_zero(self):
+        return self._int == 0
+
+    def sqrt(self, logexpmath: bool = False):
+        """Square root, rounded down. Named like this for consistency with Decimal.
+
+        With `logexpmath=True`, the result is exactly the one of `LogExpMath.sqrt()` instead, which may be off by a
+        few units of the last place in either direction. This is only available with 18 decimals.
+        """
+        if self._int < 0:
+            raise decimal.InvalidOperation("square root of negative number")
+        if logexpmath:
+            self._check_logexpmath("sqrt")
+            return self.from_scaled(log_exp_math.sqrt(self._int))
+        return self.from_scaled(math.isqrt(self._int * self.ONE))
+
+    def _check_logexpmath(self, name: str):
+        if self.DECIMAL_PRECISION != 18:
+            raise ValueError(f"LogExpMath.{name}() only exists for 18 decimals")
+
+    def exp(self, logexpmath: bool = False):
+        """e**self, rounded down. With `logexpmath=True`, the result of `LogExpMath.exp()` instead."""
+        if logexpmath:
+            self._check_logexpmath("exp")
+            return self.from_scaled(log_exp_math.exp(self._int))
+        n = exp_log.exp(self._int, self.DECIMAL_PRECISION, self.MAX_PREC_VALUE)
+        return self.from_scaled(_check_range(n, self._SCALED_LIMIT))
+
+    def ln(self, logexpmath: bool = False):
+        """Natural logarithm, truncated towards 0 like the other operations. With `logexpmath=True`, the result of `LogExpMath.ln()` instead."""
+        if logexpmath:
+            self._check_logexpmath("ln")
+            return self.from_scaled(log_exp_math.ln(self._int))
+        return self.from_scaled(exp_log.ln(self._int, self.DECIMAL_PRECISION))
+
+    def pow(self, other: DecimalLike, logexpmath: bool = False):
+        """self**other, rounded down. Unlike `**`, this is correctly rounded for fractional exponents, too.
+
+        With `logexpmath=True`, the result of `LogExpMath.pow()` instead, which is only accurate to about 1e-14
+        relative (see `pow_down()` and `pow_up()` for the bounds used by FixedPoint).
+        """
+        if isinstance(other, QuantizedDecimal) and type(other) is not type(self):
+            x, y = self._common(other)
+        else:
+            x, y = self, type(self)(other)
+        if logexpmath:
+            x._check_logexpmath("pow")
+            return x.from_scaled(log_exp_math.pow(x._int, y._int))
+        n = exp_log.pow(x._int, y._int, x.DECIMAL_PRECISION, x.MAX_PREC_VALUE)
+        return x.from_scaled(_check_range(n, x._SCALED_LIMIT))
+
+    def pow_down(self, other: DecimalLike):
+        """Same as `FixedPoint.powDown()`: a lower bound of self**other. Only available with 18 decimals."""
+        self._check_logexpmath("pow")
+        return self.from_scaled(fixed_point.pow_down(self._int, type(self)(other)._int))
+
+    def pow_up(self, other: DecimalLike):
+        """Same as `FixedPoint.powUp()`: an upper bound of self**other. Only available with 18 decimals."""
+        self._check_logexpmath("pow")
+        return self.from_scaled(fixed_point.pow_up(self._int, type(self)(other)._int))
+
+    def floor(self):
+        return self.from_scaled(self._int // self.ONE * self.ONE)
+
+    def mul_up(self, other: DecimalLike):
+        ret = self._mul(other, True)
+        if ret is None:
+            context = self.CONTEXT.copy()
+            context.rounding = decimal.ROUND_UP
+            return type(self)(
+                self.CONTEXT.multiply(self.raw, self._fallback(other)), context=context
+            )
+        return ret
+
+    def div_up(self, other: DecimalLike):
+        if type(other) is type(self):
+            return self._div(self._int, other._int, True)
+        if type(other) is int:
+            return self._div(self._int, other * self.ONE, True)
+        if isinstance(other, QuantizedDecimal):
+            a, b = self._common(other)
+            return a.div_up(b)
+        context = self.CONTEXT.copy()
+        context.rounding = decimal.ROUND_UP
+        return type(self)(
+            self.CONTEXT.divide(self.raw, self._fallback(other)), context=context
+        )
+
+    # mul_down and div_down are the defaults but we put them here for consistency so that one can quickly swap out one for the other.
+
+    def mul_down(self, other: DecimalLike):
+        return self * other
+
+    def div_down(self, other: DecimalLike):
+        return self / other
+
+    def _fused_operands(self, *others: DecimalLike) -> tuple[type, list[int]]:
+        """Variant with the most decimals among self and others, and all of them as scaled ints of that variant."""
+        cls = type(self)
+        for other in others:
+            if (
+                isinstance(other, QuantizedDecimal)
+                and other.DECIMAL_PRECISION > cls.DECIMAL_PRECISION
+            ):
+                cls = type(other)
+        return cls, [cls(x)._int for x in (self,) + others]
+
+    def mul_div_down(self, b: DecimalLike, c: DecimalLike):
+        """self * b / c, rounded down (towards 0) only once at the end. Like `FullMath.mulDiv()` for non-negative
+        values. Arguments that aren't QuantizedDecimals are converted first."""
+        cls, (x, y, z) = self._fused_operands(b, c)
+        return cls.from_scaled(
+            _check_range(_div_rounded(x * y, z, False), cls._SCALED_LIMIT)
+        )
+
+    def mul_div_up(self, b: DecimalLike, c: DecimalLike):
+        """Like `mul_div_down()`, but rounded up (away from 0). Like `FullMath.mulDivRoundingUp()`."""
+        cls, (x, y, z) = self._fused_operands(b, c)
+        return cls.from_scaled(
+            _check_range(_div_rounded(x * y, z, True), cls._SCALED_LIMIT)
+        )
+
+    def mul_add(self, b: DecimalLike, c: DecimalLike):
+        """self * b + c, rounded down (towards 0) only once at the end."""
+        cls, (x, y, z) = self._fused_operands(b, c)
+        n = _div_rounded(x * y + z * cls.ONE, cls.ONE, False)
+        return cls.from_scaled(_check_range(n, cls._SCALED_LIMIT))
+
+    @classmethod
+    def from_float(cls, value: float) -> QuantizedDecimal:
+        return cls(value)
+
+    @staticmethod
+    def _get_value(value: DecimalLike) -> decimal.Decimal:
+        if isinstance(value, QuantizedDecimal):
+            return value.raw
+        elif isinstance(value, (int, str)):
+            return decimal.Decimal(value)
+        return value
+
+    def __repr__(self):
+        return repr(self.raw)
+
+    def __str__(self):
+        return str(self.raw)
+
+    def __format__(self, format_spec: str):
+        if format_spec.endswith("e"):
+            return format(float(self), format_spec)
+        else:
+            return format(self.raw, format_spec)
+
+    def approxed(self, **kwargs):
+        from tests.support.quantized_decimal_approx import approxed
+
+        return approxed(self.raw, **kwargs)
+
+
+QuantizedDecimal._variants[DECIMAL_PRECISION] = QuantizedDecimal
+
+DecimalLike = Union[int, str, decimal.Decimal, QuantizedDecimal]
+
+
+def _unpickle(ndecimals: int, n: int) -> QuantizedDecimal:
+    return QuantizedDecimal[ndecimals].from_scaled(n)
+
+
+def __getattr__(name: str):
+    # See `quantized_decimal.__getattr__()`.
+    match = re.fullmatch(r"QuantizedDecimal\[(\d+)\]", name)
+    if match is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return QuantizedDecimal[int(match[1])]
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from tests.support.eclp import mimpl
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+# l = 20000 makes the trade quadratic ill-conditioned.
+params_ill_conditioned = mimpl.Params.from_angle_degrees(
+    D("0.5"), D("2"), D(-60), D(20000)
+)
+
+
+def trade(eclp: mimpl.ECLP, dx):
+    try:
+        return eclp.trade_x(dx, mock=True)
+    except AssertionError:  # Sanity check for a negative reserve
+        return "failed"
+
+
+@pytest.mark.parametrize("rel_tolerance", [mimpl.ADAPTIVE_REL_TOLERANCE, 1e-8])
+@pytest.mark.parametrize("params", [mimpl.myparams1, mimpl.myparams2_circle])
+def test_adaptive_matches_exact(params, rel_tolerance):
+    rng = random.Random(0)
+    solver = mimpl.AdaptiveSolver(rel_tolerance=rel_tolerance)
+    for _ in range(50):
+        x, y = D(rng.randrange(1, 10**6)), D(rng.randrange(1, 10**6))
+        exact = mimpl.ECLP.from_x_y(x, y, params)
+        adaptive = mimpl.ECLP.from_x_y(x, y, params, solver)
+        assert float(adaptive.r) == pytest.approx(float(exact.r), rel=1e-12)
+        exact.r = adaptive.r
+        # Tiny trades, too, where the amount is much smaller than the reserves.
+        dx = D(rng.randrange(-1000, 1000)) / 10 ** rng.randrange(7)
+        expected, got = trade(exact, dx), trade(adaptive, dx)
+        assert (expected is None) == (got is None)
+        if expected is not None:
+            # Up to the rounding error of the exact computation, which is far below the tolerance.
+            assert float(got) == pytest.approx(float(expected), rel=rel_tolerance)
+            # The exact computation truncates below the exact reserve here, and the solver rounds above it.
+            assert got >= expected
+    assert sum(solver.counts.values()) == 100
+    # The error of a trade scales with the amount, so even the tiny trades finish in float64.
+    assert solver.counts[mimpl.FLOAT64] == 100
+
+
+def test_adaptive_invariant_ill_conditioned():
+    rng = random.Random(0)
+    solver = mimpl.AdaptiveSolver()
+    for _ in range(50):
+        x, y = D(rng.randrange(1, 10**6)), D(rng.randrange(1, 10**6))
+        exact = mimpl.ECLP.from_x_y(x, y, params_ill_conditioned)
+        adaptive = mimpl.ECLP.from_x_y(x, y, params_ill_conditioned, solver)
+        assert float(adaptive.r) == pytest.approx(float(exact.r), rel=1e-14)
+    # Through _float_invariant_lagrange(), the direct form cancels.
+    assert solver.counts[mimpl.FLOAT64] == 50
+
+
+def test_adaptive_escalates_to_high_precision():
+    # Tighter than float64 and QuantizedDecimal can guarantee.
+    solver = mimpl.AdaptiveSolver(rel_tolerance=1e-16)
+    adaptive = mimpl.ECLP.from_x_y(D(1), D(10**6), params_ill_conditioned)
+    # Close to the exhaustion point, where the discriminant is close to 0.
+    adaptive.trade_x((adaptive.xmax - adaptive.x) * D("0.9999"))
+    adaptive.solver = solver
+    reference = mimpl.ECLP(mimpl._high_precision_params(params_ill_conditioned))
+    reference.x, reference.y = D[100](adaptive.x), D[100](adaptive.y)
+    reference.r = D[100](adaptive.r)
+    got = adaptive.trade_x(D(1), mock=True)
+    assert dict(solver.counts) == {mimpl.DECIMAL_100: 1}
+    expected = reference.trade_x(D[100](1), mock=True)
+    assert float(got) == pytest.approx(float(expected), rel=1e-16)
+    assert got >= expected
+
+
+def test_adaptive_keeps_failures():
+    solver = mimpl.AdaptiveSolver()
+    adaptive = mimpl.ECLP.from_x_y(D(1), D(10**6), params_ill_conditioned, solver)
+    exact = mimpl.ECLP.from_x_y(D(1), D(10**6), params_ill_conditioned)
+    assert adaptive.trade_x(adaptive.xmax, mock=True) is None
+    dx = (exact.xmax - exact.x) * D("0.999999999999")
+    assert trade(exact, dx) == trade(adaptive, dx) == "failed"
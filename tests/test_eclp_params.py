@@ -0,0 +1,50 @@
+import dataclasses
+
+import pytest
+
+from tests.support.eclp import mimpl
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+
+@pytest.mark.parametrize("params", [mimpl.myparams1, mimpl.myparams2_circle])
+def test_derived_params(params):
+    derived = params.derived
+    c, s, l = params.rx, -params.ry, params.l
+    assert (derived.c, derived.s) == (c, s)
+    assert params.tau_alpha == mimpl.eta(params.zeta(params.alpha))
+    assert params.tau_beta == mimpl.eta(params.zeta(params.beta))
+    assert params.A_times(D(2), D(3)) == (c / l * 2 - s / l * 3, s * 2 + c * 3)
+    assert params.Ainv_times(D(2), D(3)) == (c * l * 2 + s * 3, -s * l * 2 + c * 3)
+
+    ls = 1 - 1 / l**2
+    assert derived.s2_c2_ls2 == s**2 * c**2 * ls**2
+    assert derived.minus_s_c_ls == -s * c * ls
+    assert derived.one_minus_ls_s2 == 1 - ls * s**2
+    assert derived.one_minus_ls_c2 == 1 - ls * c**2
+
+    eclp = mimpl.ECLP.from_px_v(D(1), D(1000), params)
+    assert eclp.a == eclp.r * params.Ainv_times_x(*params.tau_beta)
+    assert eclp.b == eclp.r * params.Ainv_times_y(*params.tau_alpha)
+    assert eclp.xmax == eclp.a - eclp.r * params.Ainv_times_x(*params.tau_alpha)
+    assert eclp.ymax == eclp.b - eclp.r * params.Ainv_times_y(*params.tau_beta)
+    assert eclp.px == D(1).approxed(abs=D("1e-12"))
+    mimpl.mtest_rebuild_r(eclp)
+
+
+def test_derived_params_cache():
+    values = (D("0.9"), D("1.1"), D("0.8"), D("-0.6"), D(3))
+    mimpl.compute_derived_params.cache_clear()
+    first = mimpl.Params(*values)
+    second = mimpl.Params(*values)
+    assert first == second and hash(first) == hash(second)
+    assert second.derived is first.derived
+    info = mimpl.compute_derived_params.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.l = D(2)
+
+    mimpl.compute_derived_params.cache_clear()
+    for i in range(mimpl.DERIVED_PARAMS_CACHE_SIZE + 10):
+        mimpl.Params(*values[:4], D(3) + D.from_scaled(i)).derived
+    info = mimpl.compute_derived_params.cache_info()
+    assert info.currsize == mimpl.DERIVED_PARAMS_CACHE_SIZE
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from tests.support.eclp import mimpl
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+
+def make_eclp(params) -> mimpl.ECLP:
+    return mimpl.ECLP.from_px_v(D("1.05"), D(1_000_000), params)
+
+
+def trade_sizes(eclp: mimpl.ECLP, trade_x: bool):
+    """A ladder over both directions, and sizes at and around the exhaustion point and for emptying the reserve."""
+    own, max_reserve = (eclp.x, eclp.xmax) if trade_x else (eclp.y, eclp.ymax)
+    to_max = max_reserve - own
+    return [D(k) * 1000 for k in range(-600, 600, 13)] + [
+        to_max - D("1e-9"),
+        to_max + D.from_scaled(1),
+        -own,
+        -own - D.from_scaled(1),
+    ]
+
+
+def scalar_quote(eclp: mimpl.ECLP, amount: D, trade_x: bool):
+    """(amount, price) from trade_x() / trade_y(), or None if the trade is not possible."""
+    other = mimpl.ECLP(eclp.params)
+    other.x, other.y, other.r = eclp.x, eclp.y, eclp.r
+    try:
+        out = other.trade_x(amount) if trade_x else other.trade_y(amount)
+    except AssertionError:  # Sanity check for a negative reserve
+        return None
+    return None if out is None else (out, other.px)
+
+
+@pytest.mark.parametrize("params", [mimpl.myparams1, mimpl.myparams2_circle])
+@pytest.mark.parametrize("trade_x", [True, False])
+def test_quotes(params, trade_x):
+    eclp = make_eclp(params)
+    sizes = trade_sizes(eclp, trade_x)
+    quotes = eclp.quote_x(sizes) if trade_x else eclp.quote_y(sizes)
+    assert not quotes.valid[-1] and not quotes.valid[-3]
+    for i, amount in enumerate(sizes):
+        expected = scalar_quote(eclp, amount, trade_x)
+        if expected is None:
+            assert not quotes.valid[i]
+            assert quotes.amounts[i] == 0
+        else:
+            assert quotes.valid[i]
+            assert (quotes.amounts[i], quotes.prices[i]) == expected
+
+
+@pytest.mark.parametrize("params", [mimpl.myparams1, mimpl.myparams2_circle])
+@pytest.mark.parametrize("trade_x", [True, False])
+def test_float_quotes(params, trade_x):
+    eclp = make_eclp(params)
+    sizes = trade_sizes(eclp, trade_x)
+    exact = eclp.quote_x(sizes) if trade_x else eclp.quote_y(sizes)
+    quotes = eclp.quote_x_float(sizes) if trade_x else eclp.quote_y_float(sizes)
+    assert (quotes.valid == exact.valid).all()
+    exact_amounts = exact.amounts.scaled.astype(float) / 1e18
+    assert (np.abs(quotes.amounts - exact_amounts) <= quotes.error_bounds).all()
+    assert (quotes.error_bounds <= 1e-9 * np.abs(quotes.amounts)).all()
+    exact_prices = exact.prices.scaled.astype(float) / 1e18
+    assert quotes.prices == pytest.approx(exact_prices, rel=1e-9)
+    assert (np.abs(quotes.prices - exact_prices) <= quotes.price_error_bounds).all()
+    assert (quotes.price_error_bounds <= 1e-9 * np.abs(quotes.prices)).all()
+    # Only trades close to the exhaustion point and the empty trade need the exact computation.
+    assert quotes.exact.sum() <= 3
+    assert quotes.exact[len(sizes) - 4]
+
+
+def test_float_quotes_ill_conditioned_prices():
+    # With l = 20000, some of the prices are not precise enough in float64 and are recomputed exactly.
+    params = mimpl.Params.from_angle_degrees(D("0.5"), D("2"), D(-60), D(20000))
+    eclp = mimpl.ECLP.from_px_v(D("1.85"), D(1_000_000), params)
+    sizes = trade_sizes(eclp, True)
+    exact = eclp.quote_x(sizes)
+    quotes = eclp.quote_x_float(sizes)
+    assert (quotes.valid == exact.valid).all()
+    exact_prices = exact.prices.scaled.astype(float) / 1e18
+    assert (np.abs(quotes.prices - exact_prices) <= quotes.price_error_bounds).all()
+    assert (quotes.price_error_bounds <= 1e-9 * np.abs(quotes.prices)).all()
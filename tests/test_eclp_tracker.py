@@ -0,0 +1,119 @@
+import json
+import math
+import random
+
+import numpy as np
+import pytest
+
+from tests.support.eclp import mimpl, tracker
+from tests.support.eclp.tracker import LIQUIDITY, SWAP_X, SWAP_Y, Event
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+
+def make_eclp() -> mimpl.ECLP:
+    return mimpl.ECLP.from_px_v(D(1), D(1_000_000), mimpl.myparams1)
+
+
+def random_events(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n):
+        kind = rng.choice([SWAP_X, SWAP_Y, SWAP_X, SWAP_Y, LIQUIDITY])
+        amount = D(rng.randrange(-10_000, 10_000))
+        if kind == LIQUIDITY:
+            amount /= 100
+        yield Event(12 * i, kind, amount)
+
+
+def test_track_matches_eclp():
+    events = list(random_events(300))
+    chunks = list(tracker.track(events, make_eclp(), chunk_size=128))
+    assert [len(chunk.x) for chunk in chunks] == [128, 128, 44]
+    columns = tracker.StateColumns.concatenate(chunks)
+
+    eclp = make_eclp()
+    for i, event in enumerate(events):
+        if event.kind == SWAP_X:
+            changes = event.amount, eclp.trade_x(event.amount)
+        elif event.kind == SWAP_Y:
+            changes = eclp.trade_y(event.amount), event.amount
+        else:
+            changes = eclp.update_liquidity(event.amount)
+        assert columns.ok[i]
+        assert tracker.KINDS[columns.kind[i]] == event.kind
+        assert (columns.dx[i], columns.dy[i]) == tuple(map(float, changes))
+        assert (columns.x[i], columns.y[i], columns.r[i]) == (
+            float(eclp.x),
+            float(eclp.y),
+            float(eclp.r),
+        )
+        assert columns.px[i] == pytest.approx(float(eclp.px), rel=1e-14)
+    assert np.isnan(columns.drift).all()
+
+
+def test_reanchor():
+    eclp = make_eclp()
+    columns = tracker.StateColumns.concatenate(
+        tracker.track(random_events(250), eclp, reanchor_interval=100)
+    )
+    reanchored = ~np.isnan(columns.drift)
+    assert list(np.nonzero(reanchored)[0]) == [99, 199]
+    assert (np.abs(columns.drift[reanchored]) < 1e-15).all()
+    # The tracked r stays close to the one from the reserves.
+    rebuilt = mimpl.ECLP.from_x_y(eclp.x, eclp.y, eclp.params)
+    assert float(eclp.r) == pytest.approx(float(rebuilt.r), rel=1e-15)
+
+
+def test_impossible_events():
+    eclp = make_eclp()
+    events = [
+        Event(0, SWAP_X, eclp.xmax),
+        Event(1, LIQUIDITY, -2 * eclp.r),
+        Event(2, SWAP_Y, -eclp.y - 1),
+    ]
+    x, y, r = eclp.x, eclp.y, eclp.r
+    columns = tracker.StateColumns.concatenate(tracker.track(events, eclp))
+    assert not columns.ok.any()
+    assert (columns.dx == 0).all() and (columns.dy == 0).all()
+    assert (eclp.x, eclp.y, eclp.r) == (x, y, r)
+    with pytest.raises(ValueError):
+        list(tracker.track([Event(0, "burn", D(1))], eclp))
+
+
+def test_negative_reserve():
+    # Right at the exhaustion point, rounding makes the new reserve negative.
+    params = mimpl.Params.from_angle_degrees(D("0.5"), D("2"), D(-60), D(20000))
+    eclp = mimpl.ECLP.from_x_y(D(1), D(10**6), params)
+    dx = (eclp.xmax - eclp.x) * D("0.999999999999")
+    with pytest.raises(mimpl.NegativeReserveError):
+        eclp.trade_x(dx, mock=True)
+    columns = tracker.StateColumns.concatenate(
+        tracker.track([Event(0, SWAP_X, dx)], eclp)
+    )
+    assert not columns.ok.any()
+
+
+def test_read_and_save(tmp_path):
+    events = list(random_events(20))
+    path = tmp_path / "events.jsonl"
+    path.write_text(
+        "\n".join(
+            json.dumps(
+                {"timestamp": e.timestamp, "kind": e.kind, "amount": str(e.amount)}
+            )
+            for e in events
+        )
+    )
+    assert list(tracker.read_events_jsonl(path)) == events
+    csv_path = tmp_path / "events.csv"
+    csv_path.write_text(
+        "timestamp,kind,amount\n"
+        + "".join(f"{e.timestamp},{e.kind},{e.amount}\n" for e in events)
+    )
+    assert list(tracker.read_events_csv(csv_path)) == events
+
+    chunks = list(tracker.track(events, make_eclp(), chunk_size=7))
+    tracker.save_columns(tmp_path / "state.npz", chunks)
+    loaded = tracker.load_columns(tmp_path / "state.npz")
+    for expected, got in zip(tracker.StateColumns.concatenate(chunks), loaded):
+        assert np.array_equal(expected, got, equal_nan=True)
+    assert math.isnan(loaded.drift[0])
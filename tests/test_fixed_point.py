@@ -1,7 +1,10 @@
 import hypothesis.strategies as st
 import pytest
+from brownie import reverts
 from brownie.test import given
 
+from tests.support.libraries import fixed_point, log_exp_math, signed_fixed_point
+from tests.support.libraries.errors import INT256_MAX, INT256_MIN, UINT256_MAX, Revert
 from tests.support.quantized_decimal import QuantizedDecimal as D
 from tests.support.utils import scale, to_decimal
 
@@ -16,3 +19,115 @@ def test_int_pow_down(testing_fixed_point, numbers):
     descaled_number = numbers[0] / 10**18
     expected_result = descaled_number ** numbers[1]
     assert D(result) == scale(D(expected_result)).approxed(abs=D("1E10"))
+
+
+# Differential tests of the Python versions of the libraries against the Solidity ones.
+
+uint_generator = st.one_of(
+    st.integers(min_value=0, max_value=10**30),
+    st.integers(min_value=0, max_value=UINT256_MAX),
+)
+int_generator = st.one_of(
+    st.integers(min_value=-(10**30), max_value=10**30),
+    st.integers(min_value=INT256_MIN, max_value=INT256_MAX),
+)
+natural_exponent_generator = st.integers(
+    min_value=log_exp_math.MIN_NATURAL_EXPONENT - 10**18,
+    max_value=log_exp_math.MAX_NATURAL_EXPONENT + 10**18,
+)
+log_argument_generator = st.one_of(
+    st.integers(min_value=1, max_value=10**40),
+    st.integers(
+        min_value=log_exp_math.LN_36_LOWER_BOUND,
+        max_value=log_exp_math.LN_36_UPPER_BOUND,
+    ),
+)
+pow_base_generator = st.one_of(
+    st.integers(min_value=0, max_value=10**24),
+    st.integers(
+        min_value=log_exp_math.LN_36_LOWER_BOUND,
+        max_value=log_exp_math.LN_36_UPPER_BOUND,
+    ),
+)
+pow_exponent_generator = st.integers(min_value=0, max_value=10**20)
+
+
+def assert_same_as_contract(contract_fn, py_fn, *args):
+    try:
+        expected = py_fn(*args)
+    except Revert as ex:
+        with reverts(ex.args[0]):
+            contract_fn(*args)
+        return
+    except (OverflowError, ZeroDivisionError):
+        with reverts():
+            contract_fn(*args)
+        return
+    assert contract_fn(*args) == expected
+
+
+@pytest.mark.parametrize(
+    "name,py_fn",
+    [
+        ("mulDown", fixed_point.mul_down),
+        ("mulUp", fixed_point.mul_up),
+        ("divDown", fixed_point.div_down),
+        ("divUp", fixed_point.div_up),
+        ("powDown", fixed_point.pow_down),
+        ("powUp", fixed_point.pow_up),
+    ],
+)
+@given(a=uint_generator, b=uint_generator)
+def test_fixed_point_binary(testing_fixed_point, name, py_fn, a, b):
+    assert_same_as_contract(getattr(testing_fixed_point, name), py_fn, a, b)
+
+
+@given(x=uint_generator)
+def test_fixed_point_complement(testing_fixed_point, x):
+    assert_same_as_contract(testing_fixed_point.complement, fixed_point.complement, x)
+
+
+@given(base=base_generator, exp=exp_generator)
+def test_fixed_point_int_pow_down(testing_fixed_point, base, exp):
+    assert_same_as_contract(
+        testing_fixed_point.intPowDownTest, fixed_point.int_pow_down, base, exp
+    )
+
+
+@pytest.mark.parametrize(
+    "name,py_fn",
+    [
+        ("mulDownMag", signed_fixed_point.mul_down_mag),
+        ("mulUpMag", signed_fixed_point.mul_up_mag),
+        ("divDownMag", signed_fixed_point.div_down_mag),
+        ("divUpMag", signed_fixed_point.div_up_mag),
+    ],
+)
+@given(a=int_generator, b=int_generator)
+def test_signed_fixed_point_binary(testing_fixed_point, name, py_fn, a, b):
+    assert_same_as_contract(getattr(testing_fixed_point, name), py_fn, a, b)
+
+
+@given(x=natural_exponent_generator)
+def test_exp(testing_fixed_point, x):
+    assert_same_as_contract(testing_fixed_point.exp, log_exp_math.exp, x)
+
+
+@given(a=log_argument_generator)
+def test_ln(testing_fixed_point, a):
+    assert_same_as_contract(testing_fixed_point.ln, log_exp_math.ln, a)
+
+
+@given(arg=log_argument_generator, base=log_argument_generator)
+def test_log(testing_fixed_point, arg, base):
+    assert_same_as_contract(testing_fixed_point.log, log_exp_math.log, arg, base)
+
+
+@given(x=pow_base_generator, y=pow_exponent_generator)
+def test_pow(testing_fixed_point, x, y):
+    assert_same_as_contract(testing_fixed_point.pow, log_exp_math.pow, x, y)
+
+
+@given(x=pow_base_generator)
+def test_sqrt(testing_fixed_point, x):
+    assert_same_as_contract(testing_fixed_point.sqrt, log_exp_math.sqrt, x)
@@ -0,0 +1,38 @@
+import pytest
+
+from tests.support.g2clp import math_implementation as math_impl
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+SQRT_ALPHA = D("0.97").sqrt()
+SQRT_BETA = D("1.02").sqrt()
+
+
+@pytest.fixture
+def validation():
+    saved = math_impl.quadratic_validation
+    math_impl.quadratic_validation = math_impl.QuadraticValidation(enabled=True)
+    yield math_impl.quadratic_validation
+    math_impl.quadratic_validation = saved
+
+
+def test_validation_counts(validation):
+    balances = [D(1000), D(2000)]
+    invariant = math_impl.calculateInvariant(balances, SQRT_ALPHA, SQRT_BETA)
+    assert validation.counts == {"checked": 1}
+
+    validation.enabled = False
+    assert math_impl.calculateInvariant(balances, SQRT_ALPHA, SQRT_BETA) == invariant
+    assert validation.counts == {"checked": 1}
+
+
+def test_validation_mismatch(validation):
+    a, mb, b_square, mc = math_impl.calculateQuadraticTerms(
+        [D(1000), D(2000)], SQRT_ALPHA, SQRT_BETA
+    )
+    with pytest.raises(AssertionError):
+        math_impl.calculateQuadraticSpecial(a, mb, b_square * 2, mc)
+    assert validation.counts == {"checked": 1, "mismatches": 1}
+
+    validation.raise_on_mismatch = False
+    math_impl.calculateQuadraticSpecial(a, mb, b_square * 2, mc)
+    assert validation.counts == {"checked": 2, "mismatches": 2}
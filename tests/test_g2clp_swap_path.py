@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from tests.support.g2clp import math_implementation as math_impl
+from tests.support.g2clp.swap_path import Pool2CLP, Swap, simulate_swaps
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+SQRT_ALPHA = D("0.97").sqrt()
+SQRT_BETA = D("1.02").sqrt()
+
+
+def random_swaps(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield Swap(rng.randrange(2), D(rng.randrange(1, 10_000)), rng.random() < 0.5)
+
+
+# With one balance 0, the price is at the edge of the range. With the tiny factor, the deltas are proportional, but
+# truncated to 18 decimals.
+@pytest.mark.parametrize(
+    "balances, factor",
+    [
+        ((1000, 2000), "0.013"),
+        ((10**6, 3), "0.013"),
+        ((5, 10**6), "0.013"),
+        ((0, 10**6), "0.013"),
+        ((10**6, 0), "0.013"),
+        ((10**6, D(7) / 3), "1e-15"),
+    ],
+)
+@pytest.mark.parametrize("is_increase", [True, False])
+def test_liquidity_invariant_update(balances, factor, is_increase):
+    balances = [D(b) for b in balances]
+    invariant = math_impl.calculateInvariant(balances, SQRT_ALPHA, SQRT_BETA)
+    deltas = [b * D(factor) for b in balances]
+    args = (balances, SQRT_ALPHA, SQRT_BETA, invariant, deltas, is_increase)
+    incremental = math_impl.liquidityInvariantUpdate(*args)
+    from_scratch = math_impl.liquidityInvariantUpdate_fromscratch(*args)
+    assert abs(incremental - from_scratch) <= D("1e-16") * invariant
+
+
+@pytest.mark.parametrize(
+    "balances, deltas",
+    [((100, 100), (1, 5)), ((0, 10**6), (1, 10**4)), ((0, 0), (1, 1))],
+)
+def test_liquidity_invariant_update_not_proportional(balances, deltas):
+    balances, deltas = [D(b) for b in balances], [D(d) for d in deltas]
+    with pytest.raises(AssertionError):
+        math_impl.liquidityInvariantUpdate(
+            balances, SQRT_ALPHA, SQRT_BETA, D(1000), deltas, True
+        )
+
+
+def test_rederive_every_swap_matches_pool():
+    swaps = list(random_swaps(200))
+    pool = Pool2CLP([D(1_000_000), D(1_000_000)], SQRT_ALPHA, SQRT_BETA)
+    steps = list(simulate_swaps(swaps, pool, rederive_interval=1))
+
+    balances = [D(1_000_000), D(1_000_000)]
+    for swap, step in zip(swaps, steps):
+        invariant = math_impl.calculateInvariant(balances, SQRT_ALPHA, SQRT_BETA)
+        virtual = (
+            math_impl.calculateVirtualParameter0(invariant, SQRT_BETA),
+            math_impl.calculateVirtualParameter1(invariant, SQRT_ALPHA),
+        )
+        i, o = swap.token_in, 1 - swap.token_in
+        args = (balances[i], balances[o], swap.amount, virtual[i], virtual[o])
+        if swap.given_in:
+            amount_in, amount_out = swap.amount, math_impl.calcOutGivenIn(*args)
+        else:
+            amount_in, amount_out = math_impl.calcInGivenOut(*args), swap.amount
+        balances[i] += amount_in
+        balances[o] -= amount_out
+        assert step.ok
+        assert (step.amount_in, step.amount_out) == (amount_in, amount_out)
+        assert step.balances == tuple(balances)
+
+
+def test_carried_invariant_is_close():
+    swaps = list(random_swaps(500, seed=1))
+    exact = simulate_swaps(
+        swaps, Pool2CLP([D(10**6), D(10**6)], SQRT_ALPHA, SQRT_BETA), 1
+    )
+    pool = Pool2CLP([D(10**6), D(10**6)], SQRT_ALPHA, SQRT_BETA)
+    for expected, step in zip(exact, simulate_swaps(swaps, pool)):
+        assert float(step.amount_in) == pytest.approx(float(expected.amount_in), 1e-12)
+        assert float(step.amount_out) == pytest.approx(
+            float(expected.amount_out), 1e-12
+        )
+    # Rounding in favor of the pool only increases the invariant.
+    rederived = math_impl.calculateInvariant(pool.balances, SQRT_ALPHA, SQRT_BETA)
+    assert pool.invariant <= rederived <= pool.invariant * (1 + D("1e-15"))
+
+
+def test_swap_ratio_limits():
+    pool = Pool2CLP([D(1000), D(1000)], SQRT_ALPHA, SQRT_BETA)
+    steps = list(
+        simulate_swaps([Swap(0, D(301)), Swap(1, D(301), given_in=False)], pool)
+    )
+    assert not any(step.ok for step in steps)
+    assert pool.balances == [D(1000), D(1000)]
+
+
+def test_update_liquidity():
+    pool = Pool2CLP([D(1000), D(3000)], SQRT_ALPHA, SQRT_BETA)
+    list(simulate_swaps(random_swaps(10), pool))
+    pool.rederive()
+    pool.update_liquidity([b / 10 for b in pool.balances], is_increase=True)
+    rederived = math_impl.calculateInvariant(pool.balances, SQRT_ALPHA, SQRT_BETA)
+    assert abs(pool.invariant - rederived) <= D("1e-16") * rederived
+    assert pool.virtual_params == (
+        math_impl.calculateVirtualParameter0(pool.invariant, SQRT_BETA),
+        math_impl.calculateVirtualParameter1(pool.invariant, SQRT_ALPHA),
+    )
@@ -0,0 +1,76 @@
+import pytest
+
+from tests.support import pamm as pypamm
+from tests.support.pamm import Pamm, Params
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+STATES = [
+    (D(0), D(800_000), D(1_000_000)),
+    (D(50_000), D(700_000), D(950_000)),
+    (D(300_000), D(450_000), D(700_000)),
+]
+
+
+def make_pamm(state, incremental=False) -> Pamm:
+    pamm = Pamm(Params(), incremental=incremental)
+    pamm.update_state(*state)
+    return pamm
+
+
+@pytest.mark.parametrize("state", STATES)
+def test_quote_then_redeem(state):
+    pamm = make_pamm(state)
+    quote = pamm.compute_redeem_amount(D(10_000))
+    assert pamm.redeem(D(10_000)) == quote
+    assert pamm.anchor_cache_info() == (1, 1, 1, 1)
+
+    # The next state is new.
+    pamm.compute_redeem_amount(D(10_000))
+    assert pamm.anchor_cache_info() == (1, 2, 1, 2)
+    pamm.update_state(*state)
+    pamm.compute_redeem_amount(D(10_000))
+    assert pamm.anchor_cache_info() == (1, 3, 1, 3)
+
+
+@pytest.mark.parametrize("state", STATES)
+def test_incremental(state):
+    exact, incremental = make_pamm(state), make_pamm(state, incremental=True)
+    for _ in range(20):
+        amount = exact.total_gyro_supply / 50
+        assert incremental.redeem(amount) == exact.redeem(amount).approxed(
+            rel=D("1e-10")
+        )
+    assert incremental.anchor_cache_info() == (19, 1, 19, 1)
+    assert incremental.anchor_cache_info().hit_rate == pytest.approx(0.95)
+    assert exact.anchor_cache_info() == (0, 20, 0, 20)
+
+    # Setting the state reconstructs the anchor.
+    incremental.update_state(*state)
+    incremental.compute_redeem_amount(D(1))
+    assert incremental.anchor_cache_info() == (19, 2, 19, 2)
+
+
+def test_params_change():
+    # Reassigning the params reconstructs the anchor.
+    pamm = make_pamm(STATES[1])
+    pamm.compute_redeem_amount(D(10_000))
+    params = Params(decay_slope_lower_bound=D("0.4"))
+    pamm.params = params
+    fresh = Pamm(params)
+    fresh.update_state(*STATES[1])
+    assert pamm.compute_redeem_amount(D(10_000)) == fresh.compute_redeem_amount(
+        D(10_000)
+    )
+    assert pamm.anchor_cache_info() == (0, 2, 0, 2)
+
+
+def test_redemption_curve_shares_curve_parameters():
+    pamm = make_pamm(STATES[1])
+    quote = pamm.compute_redeem_amount(D(10_000))
+    curve = pamm.redemption_curve()
+    assert pamm.anchor_cache_info() == (1, 1, 1, 1)
+    assert curve.curve_parameters == pypamm.compute_curve_parameters(
+        curve.ba, curve.ya, pamm.params
+    )
+    (amount,) = curve.compute_redeem_amounts([D(10_000)]).tolist()
+    assert amount == quote
@@ -0,0 +1,49 @@
+from tests.support import pamm as pypamm
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+
+def test_derived_params_cache():
+    values = (D("0.55"), D("0.25"), D("0.65"))
+    pypamm.compute_derived_params.cache_clear()
+    first = pypamm.Params(*values)
+    assert first.ba_threshold_region_I == pypamm.compute_relative_reserve_for_xu(
+        D("0.25"), D(1), first
+    )
+    assert first.target_utilization_ceiling == D("0.35")
+    assert pypamm.compute_derived_params.cache_info().misses == 1
+
+    second = pypamm.Params(*values)
+    assert second.derived is first.derived
+    info = pypamm.compute_derived_params.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+    # Different precisions are cached separately.
+    high_prec = pypamm.Params(*[D[38](x) for x in values])
+    assert isinstance(high_prec.ba_threshold_region_I, D[38])
+    assert pypamm.compute_derived_params.cache_info().misses == 2
+
+
+def test_derived_params_cache_size():
+    pypamm.compute_derived_params.cache_clear()
+    for i in range(pypamm.DERIVED_PARAMS_CACHE_SIZE + 10):
+        pypamm.Params(D("0.6"), D("0.3"), D("0.6") + D.from_scaled(i)).derived
+    info = pypamm.compute_derived_params.cache_info()
+    assert info.currsize == pypamm.DERIVED_PARAMS_CACHE_SIZE
+
+
+def test_derived_params_round_like_contract():
+    # theta**2 / (2 * alpha_bar) and alpha * yz**2 / 2 with a single division of the raw product, like
+    # PrimaryAMMV1.createDerivedParams() and computeBa().
+    # Values where rounding theta**2 and yz**2 / 2 separately differs.
+    alpha_bar = D("0.261115915384424051")
+    xu_bar = D("0.407002032842416490")
+    theta_bar = D("0.209332424445158009")
+    params = pypamm.Params(alpha_bar, xu_bar, theta_bar)
+    theta, yz = (1 - theta_bar).scaled, (1 - xu_bar).scaled
+    one = D(1).scaled
+    assert params.ba_threshold_II_hl == D.from_scaled(
+        one - theta**2 // (2 * alpha_bar.scaled)
+    )
+    assert params.ba_threshold_region_I == D.from_scaled(
+        one - alpha_bar.scaled * (yz**2 // one) // (2 * one)
+    )
@@ -0,0 +1,118 @@
+import hypothesis.strategies as st
+import pytest
+from brownie.test import given
+
+from tests.support import pamm as pypamm
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_decimal_array import QuantizedDecimalArray as DA
+
+
+def st_decimal(min_value: str, max_value: str):
+    return st.integers(D(min_value).scaled, D(max_value).scaled).map(D.from_scaled)
+
+
+@st.composite
+def st_params(draw):
+    alpha_bar = draw(st_decimal("0.01", "1"))
+    xu_bar = draw(st_decimal("0.01", "0.99"))
+    # Like in test_pamm.py, theta_bar >= 1 - sqrt(2 alpha_bar) for the curve to be well-defined.
+    theta_bar_min = max(D("0.01"), 1 - (2 * alpha_bar).sqrt())
+    theta_bar = draw(st_decimal(str(theta_bar_min), "0.99"))
+    return pypamm.Params(alpha_bar, xu_bar, theta_bar)
+
+
+@st.composite
+def st_pamm(draw):
+    """A Pamm in a state reached by a redemption, so that the redemption level is consistent with the reserve."""
+    pamm = pypamm.Pamm(draw(st_params()))
+    supply = draw(st_decimal("1", "1000000"))
+    reserve_ratio = draw(st_decimal("0.3", "1.2"))
+    pamm.update_state(D(0), supply * reserve_ratio, supply)
+    pamm.redeem(supply * draw(st_decimal("0", "0.9")))
+    return pamm
+
+
+def st_amounts(max_size: int = 20):
+    return st.lists(st_decimal("0", "1"), min_size=1, max_size=max_size)
+
+
+@given(pamm=st_pamm(), fractions=st_amounts())
+def test_redemption_curve(pamm, fractions):
+    amounts = [pamm.total_gyro_supply * f for f in fractions]
+    curve = pamm.redemption_curve()
+    redeem_amounts = curve.compute_redeem_amounts(amounts)
+    prices = curve.compute_prices(amounts)
+
+    assert redeem_amounts.tolist() == [pamm.compute_redeem_amount(a) for a in amounts]
+    for amount, price in zip(amounts, prices):
+        if curve.fixed_price is not None:
+            assert price == curve.fixed_price
+        else:
+            x = pamm.redemption_level + amount
+            assert price == pypamm.compute_price(x, curve.ba, curve.ya, pamm.params)
+
+
+@given(pamms=st.lists(st_pamm(), min_size=1, max_size=5), fractions=st_amounts())
+def test_compute_redemption_curves(pamms, fractions):
+    amounts = DA(fractions) * 1000
+    curves = [pamm.redemption_curve() for pamm in pamms]
+    redeem_amounts, prices = pypamm.compute_redemption_curves(curves, amounts)
+    assert redeem_amounts.shape == prices.shape == (len(pamms), len(fractions))
+    for i, curve in enumerate(curves):
+        assert list(redeem_amounts[i].scaled) == list(
+            curve.compute_redeem_amounts(amounts).scaled
+        )
+        assert list(prices[i].scaled) == list(curve.compute_prices(amounts).scaled)
+
+
+@pytest.mark.parametrize("reserve_ratio", ["1.1", "0.5"])
+def test_redemption_curve_fixed_price(reserve_ratio):
+    pamm = pypamm.Pamm(pypamm.Params())
+    pamm.update_state(D(0), D(100) * D(reserve_ratio), D(100))
+    curve = pamm.redemption_curve()
+    assert curve.fixed_price == min(D(1), D(reserve_ratio))
+    assert curve.compute_redeem_amounts([10, 20]).tolist() == [
+        pamm.compute_redeem_amount(D(10)),
+        pamm.compute_redeem_amount(D(20)),
+    ]
+
+
+def assert_round_trip(pamm, amount):
+    redeem_amount = pamm.compute_redeem_amount(amount)
+    inverse = pamm.compute_amount_to_redeem(redeem_amount)
+    assert pamm.compute_redeem_amount(inverse) == redeem_amount.approxed(
+        abs=pamm.total_gyro_supply * D("1e-15")
+    )
+    return inverse
+
+
+@given(pamm=st_pamm(), fraction=st_decimal("0", "1"))
+def test_compute_amount_to_redeem(pamm, fraction):
+    assert_round_trip(pamm, pamm.total_gyro_supply * fraction)
+
+
+def test_compute_amount_to_redeem_at_region_edges():
+    pamm = pypamm.Pamm(pypamm.Params())
+    pamm.update_state(D(0), D(800), D(1000))
+    curve = pamm.redemption_curve()
+    assert curve.fixed_price is None
+    _, xu, xl = curve.curve_parameters
+    for x in [xu, xl]:
+        for offset in [D(0), D.from_scaled(1), D.from_scaled(-1)]:
+            assert_round_trip(pamm, x + offset)
+
+    # The numeric fallback agrees with the closed form.
+    b = pypamm.compute_reserve((xu + xl) / 2, curve.ba, curve.ya, pamm.params)
+    assert curve._bisect_reserve(b, xu, xl) == curve._solve_reserve(b).approxed(
+        abs=D("1e-12")
+    )
+
+
+def test_compute_amount_to_redeem_out_of_range():
+    pamm = pypamm.Pamm(pypamm.Params())
+    pamm.update_state(D(100), D(1100), D(1000))
+    assert pamm.compute_amount_to_redeem(D(10)) == D(10)
+    with pytest.raises(ValueError):
+        pamm.compute_amount_to_redeem(D(1001))
+    with pytest.raises(ValueError):
+        pamm.compute_amount_to_redeem(D(-1))
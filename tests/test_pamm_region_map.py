@@ -0,0 +1,114 @@
+import hypothesis.strategies as st
+import numpy as np
+import pytest
+from brownie.test import given
+
+from tests.support import pamm_region_map
+from tests.support.pamm import Pamm, Params, Region, compute_current_regions
+from tests.support.pamm_region_map import Grid
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_decimal_array import QuantizedDecimalArray as DA
+
+GRID = Grid(num_reserve_ratios=30, num_redemption_levels=20)
+
+
+def st_decimal(min_value: str, max_value: str):
+    return st.integers(D(min_value).scaled, D(max_value).scaled).map(D.from_scaled)
+
+
+@st.composite
+def st_params(draw):
+    alpha_bar = draw(st_decimal("0.01", "1"))
+    xu_bar = draw(st_decimal("0.01", "0.99"))
+    theta_bar_min = max(D("0.01"), 1 - (2 * alpha_bar).sqrt())
+    theta_bar = draw(st_decimal(str(theta_bar_min), "0.99"))
+    return Params(alpha_bar, xu_bar, theta_bar)
+
+
+@given(
+    params=st_params(),
+    states=st.lists(
+        st.tuples(
+            st_decimal("0", "1000"), st_decimal("0", "1200"), st_decimal("1", "1000")
+        ),
+        min_size=1,
+        max_size=20,
+    ),
+)
+def test_compute_current_regions(params, states):
+    redemption_level, reserve_value, supply = (
+        DA([s[i] for s in states]) for i in range(3)
+    )
+    regions = compute_current_regions(params, redemption_level, reserve_value, supply)
+    for state, region in zip(states, regions):
+        pamm = Pamm(params)
+        pamm.update_state(*state)
+        assert Region(region) == pamm.compute_current_region()
+
+
+def test_region_map():
+    params = Params()
+    regions = pamm_region_map.compute_region_map(params, GRID)
+    assert regions.shape == (30, 20)
+    for i, r in enumerate(GRID.reserve_ratios):
+        for j, x in enumerate(GRID.redemption_levels):
+            pamm = Pamm(params)
+            pamm.update_state(x, r * (1 - x), 1 - x)
+            assert Region(regions[i, j]) == pamm.compute_current_region()
+
+    assert pamm_region_map.compute_region_map(params, GRID) is regions
+    with pytest.raises(ValueError):
+        regions[0, 0] = 0
+
+    summary = pamm_region_map.summarize_region_map(regions, GRID)
+    assert sum(s.share for s in summary.values()) == pytest.approx(1)
+    assert summary[Region.CASE_high].reserve_ratio_range[0] >= 1
+    assert (
+        summary[Region.CASE_low].reserve_ratio_range[1]
+        <= params.target_reserve_ratio_floor
+    )
+
+
+def test_sweep(tmp_path):
+    params_list = [Params(), Params(D("0.5"), D("0.2"), D("0.5")), Params()]
+    maps = pamm_region_map.sweep(params_list, GRID, max_workers=0)
+    assert maps.shape == (3, 30, 20)
+    assert (maps[0] == maps[2]).all()
+    assert not (maps[0] == maps[1]).all()
+
+    pamm_region_map._cache.clear()
+    assert (pamm_region_map.sweep(params_list, GRID, max_workers=2) == maps).all()
+
+    path = tmp_path / "maps.npz"
+    pamm_region_map.save_region_maps(path, params_list, GRID, maps)
+    loaded_params, loaded_maps, reserve_ratios, redemption_levels = (
+        pamm_region_map.load_region_maps(path)
+    )
+    assert loaded_params == params_list
+    assert (loaded_maps == maps).all()
+    assert reserve_ratios.tolist() == GRID.reserve_ratios.tolist()
+    assert redemption_levels.tolist() == GRID.redemption_levels.tolist()
+
+
+def test_save_large_values(tmp_path):
+    # Scaled values above about 9.22 don't fit into int64.
+    grid = pamm_region_map.Grid(2, 2, (D(0), D(100)), (D(0), D(50)))
+    params_list = [Params(D(20), D("0.3"), D("0.6"))]
+    maps = np.zeros((1, 2, 2), dtype=np.int8)
+    path = tmp_path / "maps.npz"
+    pamm_region_map.save_region_maps(path, params_list, grid, maps)
+    loaded_params, _, reserve_ratios, redemption_levels = (
+        pamm_region_map.load_region_maps(path)
+    )
+    assert loaded_params == params_list
+    assert reserve_ratios.tolist() == grid.reserve_ratios.tolist()
+    assert redemption_levels.tolist() == grid.redemption_levels.tolist()
+
+
+def test_region_boundaries():
+    regions = np.array([[0, 0, 1], [0, 0, 1], [2, 2, 2]])
+    assert pamm_region_map.region_boundaries(regions).tolist() == [
+        [False, True, False],
+        [True, True, True],
+        [False, False, False],
+    ]
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from tests.support import pamm_simulator
+from tests.support.libraries.fixed_point import int_pow_down, mul_down
+from tests.support.pamm_simulator import MINT, REDEEM, Event
+from tests.support.primary_amm_v1 import PrimaryAMMV1
+from tests.support.types import PammParams
+
+ONE = 10**18
+PARAMS = PammParams(ONE * 6 // 10, ONE * 3 // 10, ONE * 6 // 10, ONE * 999 // 1000)
+SECONDS_PER_BLOCK = pamm_simulator.SECONDS_PER_BLOCK
+
+
+def test_simulate():
+    events = [
+        Event(0, MINT, 1000 * ONE),
+        Event(12, REDEEM, 50_000 * ONE),
+        Event(24, REDEEM, 10_000 * ONE, reserve_value=700_000 * ONE),
+        Event(10**9, REDEEM, 1 * ONE),
+    ]
+    steps = list(pamm_simulator.simulate(events, PARAMS, 800_000 * ONE, 10**6 * ONE))
+
+    # The same with the engine directly.
+    pamm = PrimaryAMMV1(PARAMS)
+    reserve_value, supply = 801_000 * ONE, 1_001_000 * ONE
+    assert steps[0].usd_amount == 1000 * ONE
+    assert (steps[0].reserve_value, steps[0].total_gyro_supply) == (
+        reserve_value,
+        supply,
+    )
+    for step, event in zip(steps[1:], events[1:]):
+        if event.reserve_value is not None:
+            reserve_value = event.reserve_value
+        block = event.timestamp // SECONDS_PER_BLOCK
+        usd_amount = pamm.redeem(event.amount, reserve_value, supply, block)
+        reserve_value -= usd_amount
+        supply -= event.amount
+        assert step.usd_amount == usd_amount
+        assert step.price == usd_amount * ONE // event.amount
+        assert step.redemption_level == pamm.redemption_level
+        assert (step.reserve_value, step.total_gyro_supply) == (reserve_value, supply)
+    assert steps[2].price < steps[1].price == ONE
+    # After a long time, only the last redemption is still remembered.
+    assert steps[3].redemption_level == ONE
+
+
+def test_decay_between_events():
+    events = [Event(0, REDEEM, 100_000 * ONE), Event(100 * SECONDS_PER_BLOCK, MINT, 1)]
+    steps = list(pamm_simulator.simulate(events, PARAMS, 800_000 * ONE, 10**6 * ONE))
+    assert steps[0].redemption_level == 100_000 * ONE
+    assert steps[1].redemption_level == mul_down(
+        100_000 * ONE, int_pow_down(PARAMS.outflow_memory, 100)
+    )
+
+
+def test_unknown_event():
+    with pytest.raises(ValueError):
+        list(pamm_simulator.simulate([Event(0, "burn", ONE)], PARAMS, ONE, ONE))
+
+
+def test_read_events(tmp_path):
+    expected = [Event(0, MINT, 1500 * ONE // 1000), Event(60, REDEEM, 2 * ONE, ONE)]
+
+    csv_path = tmp_path / "events.csv"
+    csv_path.write_text(
+        "timestamp,kind,amount,reserve_value\n0,mint,1.5,\n60,redeem,2,1\n"
+    )
+    assert list(pamm_simulator.read_events_csv(csv_path)) == expected
+
+    jsonl_path = tmp_path / "events.jsonl"
+    jsonl_path.write_text(
+        json.dumps({"timestamp": 0, "kind": "mint", "amount": "1.5"})
+        + "\n"
+        + json.dumps(
+            {"timestamp": 60, "kind": "redeem", "amount": "2", "reserve_value": "1"}
+        )
+        + "\n"
+    )
+    assert list(pamm_simulator.read_events_jsonl(jsonl_path)) == expected
+
+
+def test_read_zero_reserve_value(tmp_path):
+    # An explicit zero is a value, only an empty field is missing.
+    csv_path = tmp_path / "events.csv"
+    csv_path.write_text("timestamp,kind,amount,reserve_value\n0,redeem,1,0\n")
+    assert list(pamm_simulator.read_events_csv(csv_path)) == [
+        Event(0, REDEEM, ONE, reserve_value=0)
+    ]
+
+    jsonl_path = tmp_path / "events.jsonl"
+    jsonl_path.write_text(
+        json.dumps(
+            {"timestamp": 0, "kind": "redeem", "amount": "1", "reserve_value": 0}
+        )
+        + "\n"
+    )
+    assert list(pamm_simulator.read_events_jsonl(jsonl_path)) == [
+        Event(0, REDEEM, ONE, reserve_value=0)
+    ]
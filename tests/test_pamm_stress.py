@@ -0,0 +1,79 @@
+import pytest
+
+from tests.support import pamm_stress
+from tests.support.pamm import Region
+from tests.support.pamm_stress import Histogram, ScenarioDistribution
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+DISTRIBUTION = ScenarioDistribution(num_waves=5)
+
+
+def test_deterministic():
+    summaries = [
+        list(pamm_stress.run_stress_test(DISTRIBUTION, 30, chunk_size=7, max_workers=0))
+    ]
+    summaries.append(
+        list(
+            pamm_stress.run_stress_test(DISTRIBUTION, 30, chunk_size=10, max_workers=2)
+        )
+    )
+    assert len(summaries[0]) == 5
+    assert len(summaries[1]) == 3
+    last = [s[-1] for s in summaries]
+    assert last[0].num_paths == 30
+    assert last[0] == last[1]
+    assert last[0].percentiles() == last[1].percentiles()
+
+    # More chunks than the window of chunks in flight, which finish in any order.
+    windowed = list(
+        pamm_stress.run_stress_test(DISTRIBUTION, 30, chunk_size=3, max_workers=1)
+    )
+    assert len(windowed) == 10
+    assert windowed[-1] == last[0]
+
+    other_seed = list(
+        pamm_stress.run_stress_test(DISTRIBUTION, 30, seed=1, max_workers=0)
+    )[-1]
+    assert other_seed != last[0]
+
+
+def test_summary_matches_paths():
+    results = [pamm_stress.run_path(DISTRIBUTION, 0, i) for i in range(50)]
+    (summary,) = pamm_stress.run_stress_test(DISTRIBUTION, 50, max_workers=0)
+
+    ratios = sorted(r.final_reserve_ratio for r in results)
+    width = summary.final_reserve_ratio.bin_width
+    for q in [0.01, 0.5, 0.95, 1]:
+        exact = float(ratios[max(0, int(q * len(ratios) + 0.5) - 1)])
+        assert summary.final_reserve_ratio.percentile(q) == pytest.approx(
+            exact, abs=width
+        )
+    assert summary.worst_price.min == min(r.worst_price for r in results)
+    assert sum(summary.region_counts.values()) == 50 * DISTRIBUTION.num_waves
+    assert sum(summary.region_occupancy().values()) == pytest.approx(1)
+
+
+def test_no_stress():
+    # Fully backed and no price drop: redemptions are 1:1.
+    distribution = ScenarioDistribution(reserve_drop=(D(0), D(0)), num_waves=3)
+    for i in range(5):
+        result = pamm_stress.run_path(distribution, 0, i)
+        assert result.worst_price == 1
+        assert result.final_reserve_ratio == 1
+        assert result.regions == [Region.CASE_high] * 3
+
+
+def test_histogram():
+    h = Histogram(0, 1, num_bins=10)
+    for x in ["0.05", "0.15", "0.15", "0.95", "1.5"]:
+        h.add(D(x))
+    assert h.counts == [1, 2] + [0] * 7 + [2]
+    assert h.percentile(0.2) == pytest.approx(0.1)
+    assert h.percentile(0.6) == pytest.approx(0.2)
+    assert h.percentile(1) == 1.5
+    other = Histogram(0, 1, num_bins=10)
+    other.add(D("-1"))
+    h.merge(other)
+    assert (h.count, h.min, h.max) == (6, D(-1), D("1.5"))
+    with pytest.raises(ValueError):
+        h.merge(Histogram(0, 2, num_bins=10))
@@ -0,0 +1,147 @@
+import hypothesis.strategies as st
+from brownie import reverts
+from brownie.network.state import Chain
+from brownie.test import given
+from hypothesis import assume
+
+from tests.support import config_keys
+from tests.support import pamm as pypamm
+from tests.support import primary_amm_v1
+from tests.support.libraries.errors import Revert
+from tests.support.primary_amm_v1 import State
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.types import PammParams
+
+chain = Chain()
+
+ONE = 10**18
+
+
+@st.composite
+def st_params(draw):
+    alpha_bar = draw(st.integers(ONE // 100, ONE))
+    xu_bar = draw(st.integers(ONE // 100, ONE - 1))
+    theta_bar_min = int((1 - (2 * alpha_bar / ONE) ** 0.5) * ONE) + 1
+    theta_bar = draw(st.integers(max(theta_bar_min, ONE // 100), ONE - 1))
+    outflow_memory = draw(st.integers(ONE * 99 // 100, ONE))
+    return PammParams(alpha_bar, xu_bar, theta_bar, outflow_memory)
+
+
+@st.composite
+def st_state(draw):
+    total_gyro_supply = draw(st.integers(ONE, 10**9 * ONE))
+    redemption_level = draw(st.integers(0, total_gyro_supply))
+    reserve_ratio = draw(st.integers(ONE * 3 // 10, ONE * 12 // 10))
+    return State(
+        redemption_level, total_gyro_supply * reserve_ratio // ONE, total_gyro_supply
+    )
+
+
+def assert_same_as_contract(contract_fn, py_fn, *args):
+    try:
+        expected = py_fn(*args)
+    except Revert as ex:
+        with reverts(ex.args[0]):
+            contract_fn(*args)
+        return
+    except (OverflowError, ZeroDivisionError):
+        with reverts():
+            contract_fn(*args)
+        return
+    assert contract_fn(*args) == expected
+
+
+@given(params=st_params())
+def test_create_derived_params(pamm, params):
+    pamm.setParams(params)
+    assert pamm.computeDerivedParams() == primary_amm_v1.create_derived_params(params)
+
+
+@given(params=st_params(), state=st_state(), amount_fraction=st.integers(1, ONE))
+def test_compute_redeem_amount(pamm, params, state, amount_fraction):
+    pamm.setParams(params)
+    amount = state.total_gyro_supply * amount_fraction // ONE
+    derived = primary_amm_v1.create_derived_params(params)
+    assert_same_as_contract(
+        pamm.computeRedeemAmount["(uint256,uint256,uint256),uint256"],
+        lambda state, amount: primary_amm_v1.compute_redeem_amount(
+            state, params, derived, amount
+        ),
+        state,
+        amount,
+    )
+
+
+@given(params=st_params(), state=st_state())
+def test_compute_reserve_value_region(pamm, params, state):
+    pamm.setParams(params)
+    normalized_nav = state.reserve_value * ONE // state.total_gyro_supply
+    assume(params.theta_bar < normalized_nav < ONE)
+    derived = primary_amm_v1.create_derived_params(params)
+    assert_same_as_contract(
+        pamm.reconstructRegion,
+        lambda state: primary_amm_v1.compute_reserve_value_region(
+            state, params, derived
+        ).value,
+        state,
+    )
+
+
+@given(params=st_params(), state=st_state())
+def test_normalized_anchored_reserve_value(pamm, params, state):
+    pamm.setParams(params)
+    assert_same_as_contract(
+        pamm.getNormalizedAnchoredReserveValueAtState,
+        lambda *args: primary_amm_v1.get_normalized_anchored_reserve_value_at_state(
+            State(args[1], args[0], args[2]), params
+        ),
+        state.reserve_value,
+        state.redemption_level,
+        state.total_gyro_supply,
+    )
+
+
+def test_redeem_with_decay(admin, gyro_config, TestingPAMMV1):
+    params = PammParams(ONE * 6 // 10, ONE * 3 // 10, ONE * 6 // 10, ONE * 999 // 1000)
+    redeem_discount_ratio = ONE // 100
+    gyro_config.setAddress(config_keys.MOTHERBOARD_ADDRESS, admin, {"from": admin})
+    gyro_config.setUint(
+        config_keys.REDEEM_DISCOUNT_RATIO, redeem_discount_ratio, {"from": admin}
+    )
+    pamm = admin.deploy(TestingPAMMV1, admin, gyro_config, params)
+    engine = primary_amm_v1.PrimaryAMMV1(params, redeem_discount_ratio)
+
+    supply = 1_000_000 * ONE
+    reserve_value = 800_000 * ONE
+    for amount, blocks in [(50_000, 1), (20_000, 10), (100_000, 0), (5_000, 100)]:
+        chain.mine(blocks)
+        amount *= ONE
+        # Sets the GYD supply. The reserve value is passed to redeem().
+        pamm.setState((pamm.redemptionLevel(), 0, supply))
+        tx = pamm.redeem(amount, reserve_value, {"from": admin})
+        block = tx.block_number
+        assert tx.return_value == engine.redeem(amount, reserve_value, supply, block)
+        assert pamm.redemptionLevel() == engine.redemption_level
+        assert pamm.lastRedemptionBlock() == engine.last_redemption_block
+        reserve_value -= tx.return_value
+        supply -= amount
+
+
+@given(params=st_params(), state=st_state(), amount_fraction=st.integers(1, ONE))
+def test_agrees_with_decimal_model(params, state, amount_fraction):
+    amount = state.total_gyro_supply * amount_fraction // ONE
+    try:
+        derived = primary_amm_v1.create_derived_params(params)
+        redeem_amount = primary_amm_v1.compute_redeem_amount(
+            state, params, derived, amount
+        )
+    except (Revert, OverflowError, ZeroDivisionError):
+        assume(False)
+
+    model = pypamm.Pamm(pypamm.Params(*[D.from_scaled(p) for p in params[:3]]))
+    model.update_state(*[D.from_scaled(v) for v in state])
+    expected = model.compute_redeem_amount(D.from_scaled(amount))
+    # The absolute error of both is relative to the size of the reserve, not of the amount.
+    assert D.from_scaled(redeem_amount) == expected.approxed(
+        rel=D("1e-8"), abs=model.total_gyro_supply * D("1e-12")
+    )
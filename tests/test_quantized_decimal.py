@@ -0,0 +1,239 @@
+import decimal
+import multiprocessing
+import pickle
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fractions import Fraction
+
+import hypothesis.strategies as st
+import pytest
+from brownie.test import given
+
+from tests.support.libraries import fixed_point, log_exp_math
+from tests.support.quantized_decimal import DecimalQuantizedDecimal
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_decimal_int import QuantizedDecimal as IntD
+from tests.support.quantized_decimal_38 import QuantizedDecimal as D2
+from tests.support.quantized_decimal_100 import QuantizedDecimal as D3
+
+
+def test_precision_variants():
+    assert D[18] is D
+    assert D[38] is D2
+    assert D[100] is D3
+    assert issubclass(D3, D)
+    assert (D.MAX_PREC_VALUE, D2.MAX_PREC_VALUE, D3.MAX_PREC_VALUE) == (78, 78, 300)
+    assert str(D2(1) / 3) == "0." + "3" * 38
+    assert str(D3(1) / 3) == "0." + "3" * 100
+
+
+def test_interned_constants():
+    # Only the Decimal backend interns constants.
+    DD = DecimalQuantizedDecimal
+    assert DD(1) is DD(1)
+    assert DD[100](0) is DD[100](0)
+    assert DD(1) is not DD[100](1)
+    assert DD(1).raw == DD("1").raw
+    assert DD(2) + DD(1) == 3
+    assert not hasattr(DD(1), "__dict__")
+    with pytest.raises(decimal.InvalidOperation):
+        DD.from_scaled(10**78)
+    with pytest.raises(decimal.InvalidOperation):
+        DD.from_scaled(10**78 - 1) + DD.from_scaled(1)
+
+
+def test_global_context_unaffected():
+    prec = decimal.getcontext().prec
+    assert D3(2).sqrt() > D3("1.414")
+    assert decimal.getcontext().prec == prec
+
+
+def test_import_without_pytest():
+    code = "import sys, tests.support.quantized_decimal; assert 'pytest' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_approxed():
+    x = D(1) / 3
+    assert x == (x + D("1e-12")).approxed()
+    assert x != (x + D("1e-6")).approxed()
+    assert x >= (x + D("1e-12")).approxed()
+    assert not x > (x + D("1e-12")).approxed()
+    assert IntD(1) <= IntD("1.000000000001").approxed()
+
+
+def compute_in_precision(ndecimals: int):
+    """Some work at the given precision, for the concurrency tests. Needs to be top-level to run in a process pool."""
+    x = D[ndecimals](2)
+    for _ in range(50):
+        x = (x + D[ndecimals](2) / x) / 2
+    return x, x.pow(D[ndecimals](1) / 3)
+
+
+def test_concurrent_precisions():
+    precisions = [18, 38, 100, 27] * 4
+    expected = [compute_in_precision(n) for n in precisions]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(compute_in_precision, precisions)) == expected
+    with ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        results = list(executor.map(compute_in_precision, precisions))
+    assert results == expected
+    assert [type(x) for x, _ in results] == [D[n] for n in precisions]
+
+
+@pytest.mark.parametrize("qd_type", [D, D2, D3, IntD, IntD[38], IntD[100]])
+def test_pickle(qd_type):
+    for x in [qd_type(1) / 7, -qd_type(2).sqrt(), qd_type(0)]:
+        y = pickle.loads(pickle.dumps(x))
+        assert type(y) is qd_type
+        assert y == x
+        assert str(y) == str(x)
+    assert pickle.loads(pickle.dumps(qd_type)) is qd_type
+
+
+@pytest.mark.parametrize("totype", [D, D2, D3])
+def test_conversion(totype):
+    x = D("1.123456789012345678")
+    assert totype(x) == x
+    assert totype(-x) == -x
+    assert isinstance(totype(x), totype)
+    # Conversion to fewer decimals rounds down.
+    y = D3(-1) / 3
+    assert totype(y) == totype(-1) / 3
+    assert D(D3(2).sqrt()) == D(2).sqrt()
+
+
+def test_mixed_precision():
+    x = D(1) / 3
+    y = D3(1) / 3
+    for result in [x + y, y + x, x * y, y * x, x / y, y / x, x.mul_up(y), x.div_up(y)]:
+        assert isinstance(result, D3)
+    assert y - x == D3("0." + "0" * 18 + "3" * 82)
+    assert x == D3(x)
+    assert x < y
+
+
+@pytest.mark.parametrize("qd_type", [D, D2, D3])
+@given(n=st.integers(min_value=0, max_value=10**40))
+def test_sqrt(qd_type, n):
+    x = qd_type.from_scaled(n)
+    r = x.sqrt().scaled
+    assert r**2 <= n * qd_type(1).scaled < (r + 1) ** 2
+
+
+@given(n=st.integers(min_value=0, max_value=10**40))
+def test_sqrt_logexpmath(n):
+    assert D.from_scaled(n).sqrt(logexpmath=True).scaled == log_exp_math.sqrt(n)
+
+
+def test_sqrt_negative():
+    with pytest.raises(decimal.InvalidOperation):
+        D(-1).sqrt()
+
+
+def reference_truncated(qd_type, f, *args):
+    """f(*args) with plenty of extra digits, truncated towards 0 to the decimals of qd_type."""
+    context = decimal.Context(prec=qd_type.MAX_PREC_VALUE + 50)
+    args = [
+        context.scaleb(decimal.Decimal(a.scaled), -a.DECIMAL_PRECISION) for a in args
+    ]
+    value = context.scaleb(f(context, *args), qd_type.DECIMAL_PRECISION)
+    return int(value.to_integral_value(rounding=decimal.ROUND_DOWN, context=context))
+
+
+@pytest.mark.parametrize("qd_type", [D, D2, D3])
+@given(
+    x=st.integers(min_value=1, max_value=10**30),
+    y=st.integers(min_value=-(10**19), max_value=10**19),
+)
+def test_pow(qd_type, x, y):
+    x = qd_type.from_scaled(x * qd_type(1).scaled // 10**18)
+    y = qd_type.from_scaled(y * qd_type(1).scaled // 10**18)
+    expected = reference_truncated(qd_type, decimal.Context.power, x, y)
+    if expected >= 10**qd_type.MAX_PREC_VALUE:
+        with pytest.raises(decimal.InvalidOperation):
+            x.pow(y)
+    else:
+        assert x.pow(y).scaled == expected
+
+
+@pytest.mark.parametrize("qd_type", [D, D2, D3])
+@given(x=st.integers(min_value=-50 * 10**18, max_value=50 * 10**18))
+def test_exp(qd_type, x):
+    x = qd_type.from_scaled(x * qd_type(1).scaled // 10**18)
+    assert x.exp().scaled == reference_truncated(qd_type, decimal.Context.exp, x)
+
+
+@pytest.mark.parametrize("qd_type", [D, D2, D3])
+@given(x=st.integers(min_value=1, max_value=10**40))
+def test_ln(qd_type, x):
+    x = qd_type.from_scaled(x)
+    assert x.ln().scaled == reference_truncated(qd_type, decimal.Context.ln, x)
+
+
+def test_ln_truncates_towards_zero():
+    # ln(0.5) = -0.693147180559945309417...
+    assert D("0.5").ln() == D("-0.693147180559945309")
+    assert D("0.5").ln() == -D(2).ln()
+
+
+def test_pow_special_cases():
+    assert D(4).pow(D("0.5")) == 2
+    assert D3(4).pow(D3("1.5")) == 8
+    assert D(2).pow(-2) == D("0.25")
+    assert D(0).pow(D("0.5")) == 0
+    assert D(0).pow(0) == 1
+    assert isinstance(D(2).pow(D3(1) / 3), D3)
+    with pytest.raises(decimal.InvalidOperation):
+        D(-1).pow(D("0.5"))
+    with pytest.raises(decimal.DivisionByZero):
+        D(0).pow(-1)
+    with pytest.raises(decimal.InvalidOperation):
+        D(10).pow(100)
+
+
+# ln(x) * y must stay within the bounds of LogExpMath.
+@given(
+    x=st.integers(min_value=10**17, max_value=10**21),
+    y=st.integers(min_value=0, max_value=5 * 10**18),
+)
+def test_pow_bounds(x, y):
+    x, y = D.from_scaled(x), D.from_scaled(y)
+    assert x.pow_down(y).scaled == fixed_point.pow_down(x.scaled, y.scaled)
+    assert x.pow_up(y).scaled == fixed_point.pow_up(x.scaled, y.scaled)
+    assert x.pow(y, logexpmath=True).scaled == log_exp_math.pow(x.scaled, y.scaled)
+    assert x.pow_down(y) <= x.pow(y) <= x.pow_up(y)
+
+
+@pytest.mark.parametrize("qd_type", [D, D3])
+@given(
+    a=st.integers(min_value=-(10**30), max_value=10**30),
+    b=st.integers(min_value=-(10**30), max_value=10**30),
+    c=st.integers(min_value=-(10**30), max_value=10**30),
+)
+def test_fused_ops(qd_type, a, b, c):
+    x, y, z = [qd_type.from_scaled(n) for n in (a, b, c)]
+    one = qd_type(1).scaled
+    exact_sum = Fraction(a * b, one) + c
+    assert x.mul_add(y, z).scaled == int(exact_sum)  # int() truncates towards 0.
+    if c == 0:
+        with pytest.raises(decimal.DecimalException):
+            x.mul_div_down(y, z)
+        return
+    exact = Fraction(a * b, c)
+    assert x.mul_div_down(y, z).scaled == int(exact)
+    assert x.mul_div_up(y, z).scaled == int(exact) + (exact.denominator != 1) * (
+        1 if exact > 0 else -1
+    )
+
+
+def test_fused_ops_rounding():
+    x = D(1).mul_div_down(D3(1), 3)
+    assert isinstance(x, D3)
+    assert x == D3(1) / 3
+    # Only rounded once.
+    assert D("0.3").mul_div_down(D(1) / 3, D("0.7")) == D("0.142857142857142857")
+    assert D("0.3") * (D(1) / 3) / D("0.7") == D("0.142857142857142855")
@@ -0,0 +1,152 @@
+import decimal
+import operator
+
+import hypothesis.strategies as st
+import numpy as np
+import pytest
+from brownie.test import given
+
+from tests.support.quantized_decimal_array import QuantizedDecimalArray as A
+from tests.support.quantized_decimal_int import QuantizedDecimal as IntD
+
+# Scaled values, including ones where the 78-digit context rounds intermediate results.
+scaled_generator = st.one_of(
+    st.integers(min_value=-(10**24), max_value=10**24),
+    st.integers(min_value=-(10**45), max_value=10**45),
+    st.integers(min_value=-(10**77), max_value=10**77),
+)
+
+BINARY_OPS = [
+    operator.add,
+    operator.sub,
+    operator.mul,
+    operator.truediv,
+    lambda a, b: a.mul_up(b),
+    lambda a, b: a.div_up(b),
+]
+
+COMPARISONS = [
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.le,
+    operator.gt,
+    operator.ge,
+]
+
+
+def evaluate(op, *args):
+    try:
+        return op(*args)
+    except (decimal.InvalidOperation, decimal.DivisionByZero) as ex:
+        return type(ex)
+
+
+def scalar_results(op, xs, ys, decimals=18):
+    """Results of op on the scalars. If any of them raise, the array operation must raise one of these exceptions,
+    which we return as a set."""
+    results = [
+        evaluate(op, IntD[decimals].from_scaled(x), IntD[decimals].from_scaled(y))
+        for x, y in zip(xs, ys)
+    ]
+    exceptions = {result for result in results if isinstance(result, type)}
+    return exceptions or results
+
+
+def assert_same(expected, actual):
+    if isinstance(expected, set):
+        assert actual in expected
+    else:
+        assert list(actual.scaled) == [x.scaled for x in expected]
+
+
+@pytest.mark.parametrize("decimals", [18, 100])
+@pytest.mark.parametrize("op", BINARY_OPS)
+@given(pairs=st.lists(st.tuples(scaled_generator, scaled_generator), max_size=20))
+def test_binary_ops(op, decimals, pairs):
+    xs = [x for x, _ in pairs]
+    ys = [y for _, y in pairs]
+    expected = scalar_results(op, xs, ys, decimals)
+    actual = evaluate(op, A[decimals].from_scaled(xs), A[decimals].from_scaled(ys))
+    assert_same(expected, actual)
+
+
+@pytest.mark.parametrize("op", BINARY_OPS)
+@given(xs=st.lists(scaled_generator, max_size=20), y=scaled_generator)
+def test_binary_ops_with_scalar(op, xs, y):
+    expected = scalar_results(op, xs, [y] * len(xs))
+    actual = evaluate(op, A.from_scaled(xs), IntD.from_scaled(y))
+    assert_same(expected, actual)
+
+
+@given(pairs=st.lists(st.tuples(scaled_generator, scaled_generator), max_size=20))
+def test_mul_div_down(pairs):
+    xs = [x for x, _ in pairs]
+    ys = [y for _, y in pairs]
+    op = lambda a, b: a.mul_div_down(b, 3)  # noqa: E731
+    expected = scalar_results(op, xs, ys)
+    actual = evaluate(op, A.from_scaled(xs), A.from_scaled(ys))
+    assert_same(expected, actual)
+
+
+@pytest.mark.parametrize("op", COMPARISONS)
+@given(pairs=st.lists(st.tuples(scaled_generator, scaled_generator), max_size=20))
+def test_comparisons(op, pairs):
+    xs = [x for x, _ in pairs]
+    ys = [y for _, y in pairs]
+    expected = [op(IntD.from_scaled(x), IntD.from_scaled(y)) for x, y in pairs]
+    assert list(op(A.from_scaled(xs), A.from_scaled(ys))) == expected
+
+
+@given(xs=st.lists(st.integers(min_value=0, max_value=10**40), max_size=20))
+def test_sqrt(xs):
+    expected = [IntD.from_scaled(x).sqrt().scaled for x in xs]
+    assert list(A.from_scaled(xs).sqrt().scaled) == expected
+
+
+@given(
+    pairs=st.lists(
+        st.tuples(
+            st.integers(min_value=-(10**30), max_value=10**30),
+            st.integers(min_value=-(10**30), max_value=10**30),
+        ),
+        max_size=20,
+    )
+)
+def test_reductions(pairs):
+    xs = [IntD.from_scaled(x) for x, _ in pairs]
+    ys = [IntD.from_scaled(y) for _, y in pairs]
+    a = A(xs)
+    assert a.sum() == sum(xs, IntD(0))
+    assert a.dot(ys) == sum((x * y for x, y in zip(xs, ys)), IntD(0))
+    prod = IntD(1)
+    for x in xs:
+        prod = evaluate(operator.mul, prod, x)
+        if isinstance(prod, type):
+            break
+    assert evaluate(A.prod, a) == prod
+    if xs:
+        assert a.min() == min(xs)
+        assert a.max() == max(xs)
+
+
+def test_construction_and_indexing():
+    a = A(["1.5", 2, IntD("0.25")])
+    assert a.shape == (3,)
+    assert a[0] == IntD("1.5")
+    assert isinstance(a[1:], A)
+    assert a.tolist() == [IntD("1.5"), IntD(2), IntD("0.25")]
+    grid = A(np.array([[1, 2], [3, 4]]))
+    assert grid.shape == (2, 2)
+    assert (grid * A(["0.5", "2"])).tolist() == [
+        [IntD("0.5"), IntD(4)],
+        [IntD("1.5"), IntD(8)],
+    ]
+
+
+def test_mixed_precision():
+    a = A(["1", "2"]) / 3
+    b = A[100](a)
+    assert isinstance(a + b, A[100])
+    assert isinstance(a * IntD[100](1), A[100])
+    assert list((A[100]([1, 2]) / 3 - a).scaled) == [int("3" * 82), int("6" * 82)]
@@ -0,0 +1,218 @@
+import decimal
+import operator
+
+import hypothesis.strategies as st
+import pytest
+from brownie.test import given
+
+from tests.support.quantized_decimal import DecimalQuantizedDecimal
+from tests.support.quantized_decimal_int import QuantizedDecimal as IntQuantizedDecimal
+
+PRECISIONS = [18, 38, 100]
+
+# Scaled (i.e., raw 18-decimals) values. We cover the typical range as well as values close to the limits of the
+# 78-digit context, where the Decimal implementation starts rounding intermediate results.
+scaled_generator = st.one_of(
+    st.integers(min_value=-(10**24), max_value=10**24),
+    st.integers(min_value=-(10**45), max_value=10**45),
+    st.integers(min_value=-(10**77), max_value=10**77),
+)
+
+BINARY_OPS = [
+    operator.add,
+    operator.sub,
+    operator.mul,
+    operator.truediv,
+    operator.floordiv,
+    lambda a, b: a.mul_up(b),
+    lambda a, b: a.div_up(b),
+]
+
+COMPARISONS = [
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.le,
+    operator.gt,
+    operator.ge,
+]
+
+
+def to_decimal_backend(n: int, decimals: int = 18) -> DecimalQuantizedDecimal:
+    return DecimalQuantizedDecimal[decimals](decimal.Decimal(f"{n}E-{decimals}"))
+
+
+def to_int_backend(n: int, decimals: int = 18) -> IntQuantizedDecimal:
+    return IntQuantizedDecimal[decimals].from_scaled(n)
+
+
+def evaluate(op, *args):
+    try:
+        return op(*args)
+    except (decimal.InvalidOperation, decimal.DivisionByZero) as ex:
+        return type(ex)
+
+
+def assert_same(expected, actual):
+    if isinstance(expected, type):
+        assert actual is expected or issubclass(actual, expected)
+        return
+    assert isinstance(actual, IntQuantizedDecimal)
+    assert actual.raw == expected.raw
+    # Sign of zero is the only thing that a scaled int can't represent.
+    if expected.raw != 0:
+        assert str(actual) == str(expected)
+
+
+@pytest.mark.parametrize("decimals", PRECISIONS)
+@pytest.mark.parametrize("op", BINARY_OPS)
+@given(a=scaled_generator, b=scaled_generator)
+def test_binary_ops(op, decimals, a, b):
+    expected = evaluate(
+        op, to_decimal_backend(a, decimals), to_decimal_backend(b, decimals)
+    )
+    actual = evaluate(op, to_int_backend(a, decimals), to_int_backend(b, decimals))
+    assert_same(expected, actual)
+
+
+@pytest.mark.parametrize("decimals", [(18, 38), (100, 18), (38, 100)])
+@pytest.mark.parametrize("op", BINARY_OPS)
+@given(a=scaled_generator, b=scaled_generator)
+def test_mixed_precision_binary_ops(op, decimals, a, b):
+    da, db = decimals
+    expected = evaluate(op, to_decimal_backend(a, da), to_decimal_backend(b, db))
+    actual = evaluate(op, to_int_backend(a, da), to_int_backend(b, db))
+    assert_same(expected, actual)
+
+
+@pytest.mark.parametrize("op", BINARY_OPS)
+@given(a=scaled_generator, b=st.integers(min_value=-(10**30), max_value=10**30))
+def test_binary_ops_with_int(op, a, b):
+    expected = evaluate(op, to_decimal_backend(a), b)
+    actual = evaluate(op, to_int_backend(a), b)
+    assert_same(expected, actual)
+
+
+@pytest.mark.parametrize(
+    "op", [operator.add, operator.sub, operator.mul, operator.truediv]
+)
+@given(a=scaled_generator, b=st.integers(min_value=-(10**30), max_value=10**30))
+def test_reflected_binary_ops_with_int(op, a, b):
+    expected = evaluate(op, b, to_decimal_backend(a))
+    actual = evaluate(op, b, to_int_backend(a))
+    assert_same(expected, actual)
+
+
+@pytest.mark.parametrize(
+    "op", [operator.add, operator.sub, operator.mul, operator.truediv]
+)
+@given(
+    a=scaled_generator,
+    b=st.decimals(
+        min_value="-1e20", max_value="1e20", allow_nan=False, allow_infinity=False
+    ),
+)
+def test_binary_ops_with_decimal(op, a, b):
+    expected = evaluate(op, to_decimal_backend(a), b)
+    actual = evaluate(op, to_int_backend(a), b)
+    assert_same(expected, actual)
+
+
+@pytest.mark.parametrize("op", COMPARISONS)
+@given(a=scaled_generator, b=scaled_generator)
+def test_comparisons(op, a, b):
+    assert op(to_decimal_backend(a), to_decimal_backend(b)) == op(
+        to_int_backend(a), to_int_backend(b)
+    )
+
+
+@pytest.mark.parametrize("op", COMPARISONS)
+@given(a=scaled_generator, b=st.integers(min_value=-(10**80), max_value=10**80))
+def test_comparisons_with_int(op, a, b):
+    # Ints that don't fit into the context raise like in arithmetic.
+    assert evaluate(op, to_decimal_backend(a), b) == evaluate(op, to_int_backend(a), b)
+
+
+@given(a=scaled_generator)
+def test_unary_ops(a):
+    expected = to_decimal_backend(a)
+    actual = to_int_backend(a)
+    assert_same(-expected, -actual)
+    assert_same(abs(expected), abs(actual))
+    assert_same(expected.floor(), actual.floor())
+    assert int(expected) == int(actual)
+    assert float(expected) == float(actual)
+    assert hash(expected) == hash(actual)
+
+
+@given(
+    value=st.one_of(
+        st.integers(min_value=-(10**40), max_value=10**40),
+        st.floats(min_value=-1e20, max_value=1e20),
+        st.decimals(
+            min_value="-1e40", max_value="1e40", allow_nan=False, allow_infinity=False
+        ),
+    )
+)
+def test_construction(value):
+    assert_same(
+        evaluate(DecimalQuantizedDecimal, value),
+        evaluate(IntQuantizedDecimal, value),
+    )
+    assert_same(
+        evaluate(DecimalQuantizedDecimal, str(value)),
+        evaluate(IntQuantizedDecimal, str(value)),
+    )
+
+
+@given(a=st.integers(min_value=0, max_value=10**22))
+def test_sqrt(a):
+    assert_same(to_decimal_backend(a).sqrt(), to_int_backend(a).sqrt())
+
+
+@pytest.mark.parametrize("decimals", PRECISIONS)
+@given(
+    a=st.integers(min_value=0, max_value=10**30),
+    b=st.integers(min_value=-(10**19), max_value=10**19),
+)
+def test_exp_ln_pow(decimals, a, b):
+    for op in [
+        lambda x, y: x.pow(y),
+        lambda x, y: y.exp(),
+        lambda x, y: x.ln(),
+    ]:
+        assert_same(
+            evaluate(
+                op, to_decimal_backend(a, decimals), to_decimal_backend(b, decimals)
+            ),
+            evaluate(op, to_int_backend(a, decimals), to_int_backend(b, decimals)),
+        )
+
+
+@pytest.mark.parametrize("decimals", PRECISIONS)
+@pytest.mark.parametrize(
+    "op",
+    [
+        lambda x, y, z: x.mul_div_down(y, z),
+        lambda x, y, z: x.mul_div_up(y, z),
+        lambda x, y, z: x.mul_add(y, z),
+    ],
+)
+@given(a=scaled_generator, b=scaled_generator, c=scaled_generator)
+def test_fused_ops(op, decimals, a, b, c):
+    assert_same(
+        evaluate(op, *[to_decimal_backend(n, decimals) for n in (a, b, c)]),
+        evaluate(op, *[to_int_backend(n, decimals) for n in (a, b, c)]),
+    )
+
+
+def test_rounding_of_intermediate_quotient():
+    # The exact quotient is just below an integer multiple of 1e-18, so close that the 78-digit context rounds it up
+    # before it's quantized down.
+    b = 10**25 + 1
+    a = ((b - 1) * pow(10**18, -1, b)) % b + b * 10**45
+    assert_same(
+        to_decimal_backend(a) / to_decimal_backend(b),
+        to_int_backend(a) / to_int_backend(b),
+    )
+    assert (to_int_backend(a) / to_int_backend(b)).scaled == a * 10**18 // b + 1